@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict
-import zipfile
+from typing import Any, Dict, List
+
+from api.app.core.zip_pack import Entry, pack_zip, tree_entries
 
 PROJECTS = Path("projects")
 EXPORTS = PROJECTS / "_exports"
@@ -15,18 +16,16 @@ def _artifact_root(artifact_id: str) -> Path:
     return root
 
 
+def artifact_entries(artifact_id: str) -> List[Entry]:
+    return tree_entries(_artifact_root(artifact_id))
+
+
 def export_artifact_zip(artifact_id: str) -> Dict[str, Any]:
     root = _artifact_root(artifact_id)
     EXPORTS.mkdir(parents=True, exist_ok=True)
 
     zip_path = EXPORTS / f"{artifact_id}.zip"
-    if zip_path.exists():
-        zip_path.unlink()
-
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for p in root.rglob("*"):
-            if p.is_file():
-                zf.write(p, arcname=str(p.relative_to(root)))
+    pack_zip(zip_path, tree_entries(root))
 
     return {
         "ok": True,
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from email.utils import formatdate
+from typing import Any, Mapping
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    header = header.strip()
+    if header == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the ``(start, end)`` byte range (inclusive) asked for by ``header``.
+
+    ``None`` means the header is absent, malformed or asks for several ranges,
+    and the whole file should be sent with a 200. Raises ``RangeNotSatisfiable``
+    when the range is well formed but lies outside the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    left, sep, right = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if left.strip():
+            start = int(left)
+            end = int(right) if right.strip() else None
+            if start < 0 or (end is not None and end < start):
+                return None
+            if start >= size:
+                raise RangeNotSatisfiable(header)
+            return start, size - 1 if end is None else min(end, size - 1)
+        suffix = int(right)
+    except ValueError:
+        return None
+
+    if suffix < 0:
+        return None
+    if suffix == 0 or size == 0:
+        raise RangeNotSatisfiable(header)
+    return max(0, size - suffix), size - 1
+
+
+def plan_range_response(
+    size: int,
+    etag: str,
+    mtime: float,
+    request_headers: Mapping[str, str],
+    content_type: str,
+) -> dict[str, Any]:
+    """Work out status, headers and byte span for a ``size``-byte body.
+
+    Handles If-None-Match (304), If-Range, single Range requests (206) and
+    unsatisfiable ranges (416), for any body that can be produced from an
+    arbitrary offset (a file, a streamed archive).
+    """
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+    inm = request_headers.get("If-None-Match")
+    if inm and etag_matches(inm, etag):
+        return {"status": 304, "headers": headers, "start": 0, "length": 0}
+
+    rng = request_headers.get("Range")
+    if_range = request_headers.get("If-Range")
+    if rng and if_range and if_range.strip() != etag:
+        # the client's partial copy is stale (or dated, which we do not compare): send it all
+        rng = None
+
+    try:
+        span = parse_range(rng, size)
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{size}"
+        headers["Content-Length"] = "0"
+        return {"status": 416, "headers": headers, "start": 0, "length": 0}
+
+    headers["Content-Type"] = content_type
+    if span is None:
+        headers["Content-Length"] = str(size)
+        return {"status": 200, "headers": headers, "start": 0, "length": size}
+
+    start, end = span
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return {"status": 206, "headers": headers, "start": start, "length": end - start + 1}
@@ -1,22 +1,23 @@
 from __future__ import annotations
 
 from pathlib import Path
-import zipfile
+from typing import List
 
+from api.app.core.zip_pack import Entry, pack_zip, tree_entries
 
-def zip_project_bundle(project_id: str) -> dict:
+
+def project_bundle_entries(project_id: str) -> List[Entry]:
     root = Path("projects") / project_id / "bundle"
     if not root.exists():
         raise FileNotFoundError(f"bundle not found for project_id={project_id}")
+    return tree_entries(root, arc_root=root.parent)
 
-    zip_path = root.parent / f"{project_id}_bundle.zip"
-    if zip_path.exists():
-        zip_path.unlink()
 
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for fp in sorted(root.rglob("*")):
-            if fp.is_file():
-                zf.write(fp, arcname=str(fp.relative_to(root.parent)))
+def zip_project_bundle(project_id: str) -> dict:
+    entries = project_bundle_entries(project_id)
+
+    zip_path = Path("projects") / project_id / f"{project_id}_bundle.zip"
+    pack_zip(zip_path, entries)
 
     return {
         "project_id": project_id,
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import uuid
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# already-compressed formats gain nothing from DEFLATE; store them as-is
+STORED_SUFFIXES = {
+    ".mp4", ".mov", ".m4v", ".mkv", ".webm", ".m4a", ".mp3", ".aac", ".wav", ".ogg",
+    ".png", ".jpg", ".jpeg", ".webp", ".gif",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z",
+}
+DEFLATE_LEVEL = 6
+# text files up to this size are compressed in memory on worker threads (zlib releases the GIL)
+PARALLEL_MAX_BYTES = 64 * 1024 * 1024
+CHUNK = 1024 * 1024
+PACK_WORKERS = int(os.environ.get("MYTHIQ_ZIP_WORKERS", "0") or 0) or min(8, os.cpu_count() or 2)
+# per-archive entry manifests live outside the packed trees so they never end up in an archive
+MANIFEST_DIR = Path(__file__).resolve().parents[3] / "artifacts" / "_cache" / "zip_pack"
+
+Entry = Tuple[Path, str]
+
+
+def compress_type_for(path: Path) -> int:
+    return zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+
+
+def manifest_path_for(zip_path: Path) -> Path:
+    digest = hashlib.sha1(str(Path(zip_path).resolve()).encode("utf-8")).hexdigest()[:20]
+    return MANIFEST_DIR / f"{digest}.json"
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def tree_entries(root: Path, arc_root: Optional[Path] = None, exclude: Iterable[Path] = ()) -> List[Entry]:
+    """Every file under ``root`` as ``(path, arcname)``, arcnames relative to ``arc_root`` (default ``root``).
+
+    Paths in ``exclude`` (typically the archive itself, when it lives inside ``root``) are skipped,
+    along with their in-progress ``<name>.<id>.tmp`` files.
+    """
+    arc_root = arc_root or root
+    skip = set()
+    temps = set()
+    for p in exclude:
+        rp = Path(p).resolve()
+        skip.add(rp)
+        temps.add((rp.parent, rp.name + "."))
+    out = []
+    for fp in sorted(root.rglob("*")):
+        if not fp.is_file():
+            continue
+        rp = fp.resolve()
+        if rp in skip or (rp.name.endswith(".tmp") and any(rp.parent == d and rp.name.startswith(pre) for d, pre in temps)):
+            continue
+        out.append((fp, fp.relative_to(arc_root).as_posix()))
+    return out
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _deflate_file(path: Path) -> Tuple[bytes, int, int, str]:
+    data = path.read_bytes()
+    c = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush(), zlib.crc32(data), len(data), hashlib.sha256(data).hexdigest()
+
+
+def _register(zf: zipfile.ZipFile, zi: zipfile.ZipInfo) -> None:
+    zf.filelist.append(zi)
+    zf.NameToInfo[zi.filename] = zi
+    zf.start_dir = zf.fp.tell()
+    zf._didModify = True
+
+
+def _write_precompressed(zf: zipfile.ZipFile, zi: zipfile.ZipInfo, payload: bytes) -> None:
+    zi.header_offset = zf.fp.tell()
+    zf.fp.write(zi.FileHeader(None))
+    zf.fp.write(payload)
+    _register(zf, zi)
+
+
+def _copy_raw(zf: zipfile.ZipFile, src_fp, old: zipfile.ZipInfo) -> None:
+    # local header + compressed data, byte for byte; only the offset changes
+    src_fp.seek(old.header_offset)
+    header = src_fp.read(zipfile.sizeFileHeader)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    remaining = name_len + extra_len + old.compress_size
+    zi = old
+    zi.header_offset = zf.fp.tell()
+    zf.fp.write(header)
+    while remaining > 0:
+        chunk = src_fp.read(min(CHUNK, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"truncated entry {old.filename}")
+        zf.fp.write(chunk)
+        remaining -= len(chunk)
+    _register(zf, zi)
+
+
+def _write_streamed(zf: zipfile.ZipFile, path: Path, arcname: str, compress_type: int) -> str:
+    zi = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+    zi.compress_type = compress_type
+    if compress_type == zipfile.ZIP_DEFLATED:
+        zi._compresslevel = DEFLATE_LEVEL
+    h = hashlib.sha256()
+    with path.open("rb") as src, zf.open(zi, "w", force_zip64=zi.file_size > zipfile.ZIP64_LIMIT) as dst:
+        for chunk in iter(lambda: src.read(CHUNK), b""):
+            h.update(chunk)
+            dst.write(chunk)
+    return h.hexdigest()
+
+
+def _write_public(zf: zipfile.ZipFile, path: Path, arcname: str, compress_type: int) -> str:
+    zf.write(path, arcname, compress_type=compress_type, compresslevel=DEFLATE_LEVEL)
+    return _sha256(path)
+
+
+def _raw_copy_works() -> bool:
+    # the fast paths above poke at ZipFile internals (fp, NameToInfo, start_dir, _didModify,
+    # _compresslevel); round-trip them once in memory and fall back to the public API if
+    # this Python's zipfile no longer behaves the way they expect
+    if os.environ.get("MYTHIQ_ZIP_RAW_COPY", "1") == "0":
+        return False
+    try:
+        data = b"raw copy probe " * 64
+        c = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+        payload = c.compress(data) + c.flush()
+        first, second = io.BytesIO(), io.BytesIO()
+        with zipfile.ZipFile(first, "w") as zf:
+            zi = zipfile.ZipInfo("a.txt")
+            zi.compress_type = zipfile.ZIP_DEFLATED
+            zi.CRC, zi.file_size, zi.compress_size = zlib.crc32(data), len(data), len(payload)
+            _write_precompressed(zf, zi, payload)
+            zi = zipfile.ZipInfo("b.txt")
+            zi.compress_type = zipfile.ZIP_DEFLATED
+            zi._compresslevel = DEFLATE_LEVEL
+            with zf.open(zi, "w") as dst:
+                dst.write(data)
+        with zipfile.ZipFile(first) as src, zipfile.ZipFile(second, "w") as zf:
+            for old in src.infolist():
+                _copy_raw(zf, src.fp, old)
+        with zipfile.ZipFile(second) as zf:
+            return zf.testzip() is None and zf.namelist() == ["a.txt", "b.txt"] and zf.read("a.txt") == zf.read("b.txt") == data
+    except Exception:
+        return False
+
+
+RAW_COPY = _raw_copy_works()
+
+
+def _archive_sig(zip_path: Path) -> List[int]:
+    st = zip_path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _load_manifest(zip_path: Path) -> Dict[str, Any]:
+    # only trusted while the archive is exactly the one it was written for
+    try:
+        data = json.loads(manifest_path_for(zip_path).read_text(encoding="utf-8"))
+        if data.get("archive") != _archive_sig(zip_path):
+            return {}
+        return data.get("entries") or {}
+    except Exception:
+        return {}
+
+
+def pack_zip(zip_path: Path, entries: List[Entry], workers: Optional[int] = None) -> Dict[str, Any]:
+    """Write ``entries`` (``(path, arcname)`` pairs) to ``zip_path``, reusing what is already there.
+
+    Media is stored, everything else deflated (small files on a thread pool).
+    A manifest under ``MANIFEST_DIR`` remembers size/mtime/sha256 per entry: unchanged entries
+    are copied from the previous archive without recompression, and when the
+    previous archive is an exact prefix of the new one the new entries are
+    simply appended to a copy of it. Either way the archive is built under a
+    unique temp name and swapped in, so readers never see a half-written file.
+    Without ``RAW_COPY`` every entry goes through ``ZipFile.write`` and only the
+    append case still avoids recompressing.
+    """
+    zip_path = Path(zip_path)
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    old_manifest = _load_manifest(zip_path)
+
+    old_zf: Optional[zipfile.ZipFile] = None
+    if zip_path.exists() and old_manifest:
+        try:
+            old_zf = zipfile.ZipFile(zip_path, "r")
+        except (zipfile.BadZipFile, OSError):
+            old_zf = None
+    old_infos = {zi.filename: zi for zi in old_zf.infolist()} if old_zf else {}
+
+    plan = []  # (path, arcname, method, stat, reuse_info)
+    rehash = []
+    for path, arcname in entries:
+        st = path.stat()
+        method = compress_type_for(path)
+        rec = old_manifest.get(arcname)
+        old = old_infos.get(arcname)
+        reuse = None
+        if rec and old and rec.get("method") == method and old.file_size == st.st_size and not old.flag_bits & 0x08:
+            if rec.get("size") == st.st_size and rec.get("mtime_ns") == st.st_mtime_ns:
+                reuse = old
+            else:
+                rehash.append(len(plan))
+        plan.append([path, arcname, method, st, reuse])
+
+    # touched but identical files (same size, new mtime) are confirmed by content hash
+    if rehash:
+        with ThreadPoolExecutor(max_workers=workers or PACK_WORKERS) as pool:
+            hashes = list(pool.map(lambda i: _sha256(plan[i][0]), rehash))
+        for i, digest in zip(rehash, hashes):
+            if digest == old_manifest[plan[i][1]].get("sha256"):
+                plan[i][4] = old_infos[plan[i][1]]
+
+    to_deflate = [i for i, p in enumerate(plan) if RAW_COPY and p[4] is None and p[2] == zipfile.ZIP_DEFLATED and p[3].st_size <= PARALLEL_MAX_BYTES]
+    compressed: Dict[int, Tuple[bytes, int, int, str]] = {}
+    if to_deflate:
+        with ThreadPoolExecutor(max_workers=workers or PACK_WORKERS) as pool:
+            for i, res in zip(to_deflate, pool.map(lambda i: _deflate_file(plan[i][0]), to_deflate)):
+                compressed[i] = res
+
+    old_order = [zi.filename for zi in old_zf.infolist()] if old_zf else []
+    reused_prefix = len(old_order) <= len(plan) and all(
+        plan[i][1] == name and plan[i][4] is not None for i, name in enumerate(old_order)
+    )
+    append = bool(old_zf) and reused_prefix
+    if old_zf and append:
+        old_zf.close()
+        old_zf = None
+
+    new_manifest: Dict[str, Any] = {}
+    stats = {"zip_path": str(zip_path), "entries": len(plan), "reused": 0, "written": 0, "appended": append}
+    target = _temp_path(zip_path)
+    try:
+        if append:
+            shutil.copyfile(zip_path, target)
+        with zipfile.ZipFile(target, "a" if append else "w", strict_timestamps=False) as zf:
+            src_fp = old_zf.fp if old_zf else None
+            for i, (path, arcname, method, st, reuse) in enumerate(plan):
+                rec = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "method": method}
+                if reuse is not None and (append or RAW_COPY):
+                    if not append:
+                        _copy_raw(zf, src_fp, reuse)
+                    rec["sha256"] = old_manifest[arcname].get("sha256")
+                    stats["reused"] += 1
+                elif i in compressed:
+                    payload, crc, size, digest = compressed.pop(i)
+                    zi = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+                    zi.compress_type = zipfile.ZIP_DEFLATED
+                    zi.CRC, zi.file_size, zi.compress_size = crc, size, len(payload)
+                    _write_precompressed(zf, zi, payload)
+                    rec["sha256"] = digest
+                    stats["written"] += 1
+                elif RAW_COPY:
+                    rec["sha256"] = _write_streamed(zf, path, arcname, method)
+                    stats["written"] += 1
+                else:
+                    rec["sha256"] = _write_public(zf, path, arcname, method)
+                    stats["written"] += 1
+                new_manifest[arcname] = rec
+        target.replace(zip_path)
+    except BaseException:
+        target.unlink(missing_ok=True)
+        raise
+    finally:
+        if old_zf:
+            old_zf.close()
+
+    mp = manifest_path_for(zip_path)
+    mp.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(mp)
+    tmp.write_text(json.dumps({"archive": _archive_sig(zip_path), "entries": new_manifest}), encoding="utf-8")
+    tmp.replace(mp)
+    stats["size_bytes"] = zip_path.stat().st_size
+    return stats
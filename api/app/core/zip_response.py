@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Mapping
+
+from starlette.concurrency import iterate_in_threadpool
+from starlette.responses import Response
+
+from api.app.core.zip_stream import ZipStream, content_disposition
+
+
+class ZipStreamResponse(Response):
+    """Download of a ``ZipStream``: exact Content-Length, ETag and single-range 206/416 handling.
+
+    Nothing is written to disk; the archive bytes for the requested span are
+    generated off the event loop as they are sent.
+    """
+
+    def __init__(self, stream: ZipStream, request_headers: Mapping[str, str], filename: str):
+        self.stream = stream
+        plan = stream.plan_response(request_headers)
+        self.start = plan["start"]
+        self.length = plan["length"]
+        headers = dict(plan["headers"])
+        headers["Content-Disposition"] = content_disposition(filename)
+        super().__init__(status_code=plan["status"], headers=headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.length <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # a file changing mid-stream raises here, which aborts the connection short of
+        # Content-Length, so the client sees a failed download rather than a corrupt archive
+        async for chunk in iterate_in_threadpool(self.stream.iter_range(self.start, self.length)):
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
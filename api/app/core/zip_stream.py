@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import uuid
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import quote
+
+from api.app.core.zip_pack import CHUNK, DEFLATE_LEVEL, compress_type_for
+from api.app.core.http_range import plan_range_response
+
+# non-media files up to this size are deflated up front so their compressed size is known;
+# bigger ones are stored, which keeps the archive length computable before a byte is sent
+DEFLATE_MAX_BYTES = 1024 * 1024
+CRC_CACHE_MAX = 4096
+# stored-file CRCs also go to disk, so a resumed download in a fresh process (or after a
+# restart) does not have to read every skipped file again
+CRC_CACHE_DIR = Path(__file__).resolve().parents[3] / "artifacts" / "_cache" / "zip_stream"
+U32 = 0xFFFFFFFF
+
+StreamEntry = Tuple[Union[Path, bytes], str]
+
+# crc32 of stored files by (path, size, mtime_ns), so resumed downloads skip re-reading them
+_CRC_CACHE: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+_CRC_LOCK = threading.Lock()
+
+
+def _crc_file(key: Tuple[str, int, int]) -> Path:
+    return CRC_CACHE_DIR / f"{hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:24]}.crc"
+
+
+def _cached_crc(key: Tuple[str, int, int]) -> Optional[int]:
+    with _CRC_LOCK:
+        crc = _CRC_CACHE.get(key)
+        if crc is not None:
+            _CRC_CACHE.move_to_end(key)
+            return crc
+    try:
+        crc = int(_crc_file(key).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    _remember_crc(key, crc, persist=False)
+    return crc
+
+
+def _remember_crc(key: Tuple[str, int, int], crc: int, persist: bool = True) -> None:
+    with _CRC_LOCK:
+        _CRC_CACHE[key] = crc
+        _CRC_CACHE.move_to_end(key)
+        while len(_CRC_CACHE) > CRC_CACHE_MAX:
+            _CRC_CACHE.popitem(last=False)
+    if persist:
+        disk = _crc_file(key)
+        try:
+            disk.parent.mkdir(parents=True, exist_ok=True)
+            tmp = disk.with_name(f"{disk.name}.{uuid.uuid4().hex[:8]}.tmp")
+            tmp.write_text(str(crc), encoding="utf-8")
+            tmp.replace(disk)
+        except OSError:
+            pass  # the cache is an optimisation; the download itself is unaffected
+
+
+def _dos_datetime(ts: float) -> Tuple[int, int]:
+    t = time.localtime(ts)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def _deflate(data: bytes) -> bytes:
+    c = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+
+class ZipStream:
+    """A ZIP archive of ``entries`` (``(path or bytes, arcname)`` pairs) produced on the fly.
+
+    The byte layout is fixed up front, so the total size is known before
+    streaming and any byte range can be produced on its own (resumable
+    downloads). Media and large files are stored and followed by a data
+    descriptor, so their CRC is computed while they stream; small text
+    entries are deflated in memory at planning time.
+    """
+
+    def __init__(self, entries: Iterable[StreamEntry], content_type: str = "application/zip"):
+        self.content_type = content_type
+        self.members: List[Dict[str, Any]] = []
+        file_mtimes = []
+        for src, arcname in entries:
+            if isinstance(src, (bytes, bytearray)):
+                m = {"arcname": arcname, "path": None, "size": len(src), "mtime": None, "key": None}
+                m["payload"], m["crc"] = _deflate(bytes(src)), zlib.crc32(src)
+            else:
+                path = Path(src)
+                st = path.stat()
+                m = {"arcname": arcname, "path": path, "size": st.st_size, "mtime": st.st_mtime,
+                     "key": (str(path), st.st_size, st.st_mtime_ns), "payload": None, "crc": None}
+                file_mtimes.append(st.st_mtime)
+                if compress_type_for(path) == zipfile.ZIP_DEFLATED and st.st_size <= DEFLATE_MAX_BYTES:
+                    data = path.read_bytes()
+                    if len(data) != st.st_size:
+                        raise RuntimeError(f"zip_stream: {path} changed while planning")
+                    m["payload"], m["crc"] = _deflate(data), zlib.crc32(data)
+                else:
+                    m["crc"] = _cached_crc(m["key"])
+            self.members.append(m)
+
+        # in-memory entries take the newest file's timestamp so the bytes do not change per request
+        self.mtime = max(file_mtimes) if file_mtimes else 315532800.0
+        self._layout()
+
+    def _layout(self) -> None:
+        self.segments: List[Tuple[int, int, str, int]] = []  # (offset, length, kind, member index)
+        offset = 0
+        etag = hashlib.sha1()
+        for i, m in enumerate(self.members):
+            m["method"] = zipfile.ZIP_DEFLATED if m["payload"] is not None else zipfile.ZIP_STORED
+            m["csize"] = len(m["payload"]) if m["payload"] is not None else m["size"]
+            m["descriptor"] = m["payload"] is None
+            m["zip64"] = m["size"] >= U32 or m["csize"] >= U32
+            m["time"], m["date"] = _dos_datetime(m["mtime"] if m["mtime"] is not None else self.mtime)
+            m["name"] = m["arcname"].encode("utf-8")
+            m["flags"] = (0x08 if m["descriptor"] else 0) | (0 if m["name"].isascii() else 0x800)
+            m["offset"] = offset
+            m["local"] = self._local_header(m)
+            etag.update(repr((m["arcname"], m["key"] or m["crc"], m["method"])).encode("utf-8"))
+            for kind, length in (("local", len(m["local"])), ("data", m["csize"]), ("descriptor", (24 if m["zip64"] else 16) if m["descriptor"] else 0)):
+                if length:
+                    self.segments.append((offset, length, kind, i))
+                offset += length
+        self.cd_offset = offset
+        self.cd_size = sum(46 + len(m["name"]) + len(self._cd_extra(m)) for m in self.members)
+        tail = 22
+        if self._needs_zip64_end():
+            tail += 56 + 20
+        self.segments.append((offset, self.cd_size + tail, "central", -1))
+        self.size = offset + self.cd_size + tail
+        self.etag = f'"z{etag.hexdigest()[:24]}-{self.size:x}"'
+
+    def _needs_zip64_end(self) -> bool:
+        return len(self.members) >= 0xFFFF or self.cd_offset >= U32 or self.cd_size >= U32
+
+    def _local_header(self, m: Dict[str, Any]) -> bytes:
+        crc = 0 if m["descriptor"] else m["crc"]
+        extra = b""
+        csize, usize = m["csize"], m["size"]
+        if m["zip64"]:
+            extra = struct.pack("<HHQQ", 1, 16, usize, csize)
+            csize = usize = U32
+        return struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 45 if m["zip64"] else 20, m["flags"], m["method"],
+            m["time"], m["date"], crc, csize, usize, len(m["name"]), len(extra),
+        ) + m["name"] + extra
+
+    def _cd_extra(self, m: Dict[str, Any]) -> bytes:
+        fields = [v for v in (m["size"], m["csize"], m["offset"]) if v >= U32]
+        if not fields:
+            return b""
+        return struct.pack("<HH", 1, 8 * len(fields)) + struct.pack(f"<{len(fields)}Q", *fields)
+
+    def crc(self, i: int) -> int:
+        """CRC-32 of member ``i``. A range that skips a stored file still needs its CRC for the
+        descriptor and central directory, which costs one full read of that file per version
+        (then it is cached in memory and under ``CRC_CACHE_DIR``)."""
+        m = self.members[i]
+        if m["crc"] is None:
+            crc = 0
+            for chunk in self._read(m, 0, m["size"]):
+                crc = zlib.crc32(chunk, crc)
+            m["crc"] = crc
+            _remember_crc(m["key"], crc)
+        return m["crc"]
+
+    def _descriptor(self, i: int) -> bytes:
+        m = self.members[i]
+        fmt = "<IIQQ" if m["zip64"] else "<IIII"
+        return struct.pack(fmt, 0x08074B50, self.crc(i), m["csize"], m["size"])
+
+    def _central(self) -> bytes:
+        out = []
+        for i, m in enumerate(self.members):
+            extra = self._cd_extra(m)
+            out.append(struct.pack(
+                "<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 45, 45 if extra or m["zip64"] else 20,
+                m["flags"], m["method"], m["time"], m["date"], self.crc(i),
+                min(m["csize"], U32), min(m["size"], U32), len(m["name"]), len(extra), 0, 0, 0,
+                0o100644 << 16, min(m["offset"], U32),
+            ) + m["name"] + extra)
+        count = len(self.members)
+        if self._needs_zip64_end():
+            zip64_end = self.cd_offset + self.cd_size
+            out.append(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, self.cd_size, self.cd_offset))
+            out.append(struct.pack("<IIQI", 0x07064B50, 0, zip64_end, 1))
+        out.append(struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+            min(self.cd_size, U32), min(self.cd_offset, U32), 0,
+        ))
+        return b"".join(out)
+
+    def _read(self, m: Dict[str, Any], start: int, length: int) -> Iterator[bytes]:
+        st = m["path"].stat()
+        if (st.st_size, st.st_mtime_ns) != m["key"][1:]:
+            raise RuntimeError(f"zip_stream: {m['path']} changed while streaming")
+        with m["path"].open("rb") as fh:
+            fh.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = fh.read(min(CHUNK, remaining))
+                if not chunk:
+                    raise RuntimeError(f"zip_stream: {m['path']} shrank while streaming")
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_range(self, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the archive bytes ``[start, start + length)``; the whole archive by default."""
+        end = self.size if length is None else min(self.size, start + length)
+        for seg_off, seg_len, kind, i in self.segments:
+            if seg_off + seg_len <= start or seg_off >= end:
+                continue
+            lo, hi = max(start, seg_off) - seg_off, min(end, seg_off + seg_len) - seg_off
+            if kind == "data":
+                m = self.members[i]
+                if m["payload"] is not None:
+                    yield m["payload"][lo:hi]
+                elif lo == 0 and hi == seg_len and m["crc"] is None:
+                    # whole entry goes out: checksum it on the way instead of reading it twice
+                    crc = 0
+                    for chunk in self._read(m, 0, seg_len):
+                        crc = zlib.crc32(chunk, crc)
+                        yield chunk
+                    m["crc"] = crc
+                    _remember_crc(m["key"], crc)
+                else:
+                    yield from self._read(m, lo, hi - lo)
+            elif kind == "local":
+                yield self.members[i]["local"][lo:hi]
+            elif kind == "descriptor":
+                yield self._descriptor(i)[lo:hi]
+            else:
+                yield self._central()[lo:hi]
+
+    def plan_response(self, request_headers: Mapping[str, str]) -> Dict[str, Any]:
+        """Status, headers and byte span for a download request (see ``plan_range_response``)."""
+        return plan_range_response(self.size, self.etag, self.mtime, request_headers, self.content_type)
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
@@ -1,50 +1,126 @@
 from __future__ import annotations
 from dataclasses import asdict
 from pathlib import Path
-import argparse, json, re
+import argparse, bisect, json, random, re, zlib
 from collections import Counter
 
 def norm_words(s: str) -> set[str]:
     return set(re.findall(r"[a-z0-9]+", s.lower()))
 
-def jaccard(a: str, b: str) -> float:
-    aa, bb = norm_words(a), norm_words(b)
-    if not aa or not bb:
-        return 0.0
-    return len(aa & bb) / max(1, len(aa | bb))
-
 def time_overlap(a, b) -> float:
     inter = max(0.0, min(a["end"], b["end"]) - max(a["start"], b["start"]))
     union = max(a["end"], b["end"]) - min(a["start"], b["start"])
     return inter / max(union, 1e-6)
 
-def too_similar(c, selected) -> bool:
-    for s in selected:
-        if time_overlap(c, s) > 0.35:
-            return True
-        if jaccard(c["text"], s["text"]) > 0.35:
-            return True
-        if jaccard(c.get("hook",""), s.get("hook","")) > 0.55:
+def _set_jaccard(aa: set[str], bb: set[str]) -> float:
+    if not aa or not bb:
+        return 0.0
+    return len(aa & bb) / max(1, len(aa | bb))
+
+class MinHashLSH:
+    """Banded MinHash buckets; ``query`` returns keys that may be similar (verify exactly)."""
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, bands: int = 32, rows: int = 2, seed: int = 1):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = rows
+        self.coeffs = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(bands * rows)]
+        self.buckets: list[dict[tuple, list[int]]] = [{} for _ in range(bands)]
+
+    def signature(self, tokens: set[str]) -> list[int]:
+        hs = [zlib.crc32(t.encode("utf-8")) for t in tokens]
+        return [min((a * h + b) % self.PRIME for h in hs) for a, b in self.coeffs]
+
+    def _bands(self, sig: list[int]):
+        for i in range(self.bands):
+            yield i, tuple(sig[i * self.rows:(i + 1) * self.rows])
+
+    def insert(self, key: int, sig: list[int]) -> None:
+        for i, band in self._bands(sig):
+            self.buckets[i].setdefault(band, []).append(key)
+
+    def query(self, sig: list[int]) -> set[int]:
+        out: set[int] = set()
+        for i, band in self._bands(sig):
+            out.update(self.buckets[i].get(band, ()))
+        return out
+
+class SelectedIndex:
+    """Already-selected candidates with cached token sets.
+
+    Time overlap is only checked against selections whose interval can intersect,
+    found by bisecting a start-sorted list. With ``use_lsh`` text and hook
+    near-duplicates are looked up in MinHash buckets instead of compared against
+    every selection; bucket hits are confirmed with the exact Jaccard.
+    """
+
+    def __init__(self, use_lsh: bool = False):
+        self.starts: list[float] = []
+        self.spans: list[dict] = []
+        self.max_len = 0.0
+        self.items: list[tuple[set[str], set[str]]] = []
+        self.lsh = (MinHashLSH(), MinHashLSH(seed=2)) if use_lsh else None
+
+    def _overlaps(self, c) -> bool:
+        lo = bisect.bisect_left(self.starts, c["start"] - self.max_len)
+        hi = bisect.bisect_left(self.starts, c["end"])
+        return any(time_overlap(c, s) > 0.35 for s in self.spans[lo:hi])
+
+    def conflicts(self, c, text: set[str], hook: set[str]) -> bool:
+        if self._overlaps(c):
             return True
-    return False
+        if self.lsh is None:
+            pool = range(len(self.items))
+        else:
+            pool = self.lsh[0].query(self.lsh[0].signature(text)) if text else set()
+            if hook:
+                pool |= self.lsh[1].query(self.lsh[1].signature(hook))
+        for i in pool:
+            st, sh = self.items[i]
+            if _set_jaccard(text, st) > 0.35 or _set_jaccard(hook, sh) > 0.55:
+                return True
+        return False
+
+    def add(self, c, text: set[str], hook: set[str]) -> None:
+        i = bisect.bisect_right(self.starts, c["start"])
+        self.starts.insert(i, c["start"])
+        self.spans.insert(i, c)
+        self.max_len = max(self.max_len, c["end"] - c["start"])
+        if self.lsh is not None:
+            if text:
+                self.lsh[0].insert(len(self.items), self.lsh[0].signature(text))
+            if hook:
+                self.lsh[1].insert(len(self.items), self.lsh[1].signature(hook))
+        self.items.append((text, hook))
 
-def select(candidates: list[dict], target_count: int = 10) -> list[dict]:
+def rank_key(c: dict) -> float:
+    # a learned scorer's prediction outranks the heuristic ``score`` when the ranker set one
+    learned = c.get("learned_score")
+    return c.get("score", 0.0) if learned is None else learned
+
+def select(candidates: list[dict], target_count: int = 10, use_lsh: bool = False) -> list[dict]:
     selected = []
+    index = SelectedIndex(use_lsh)
     angle_counts = Counter()
     region_counts = Counter()
+    region_cap = max(3, target_count // 3 + 1)
 
-    for c in sorted(candidates, key=lambda x: x.get("score", 0.0), reverse=True):
+    for c in sorted(candidates, key=rank_key, reverse=True):
         angle = c.get("angle", "insight")
         region = c.get("region", "mid")
 
-        if too_similar(c, selected):
-            continue
+        # cheap quota checks first; tokens are only built for rows that get this far
         if angle_counts[angle] >= 2:
             continue
-        if region_counts[region] >= max(3, target_count // 3 + 1):
+        if region_counts[region] >= region_cap:
+            continue
+        text, hook = norm_words(c["text"]), norm_words(c.get("hook",""))
+        if index.conflicts(c, text, hook):
             continue
 
         selected.append(c)
+        index.add(c, text, hook)
         angle_counts[angle] += 1
         region_counts[region] += 1
         if len(selected) >= target_count:
@@ -56,10 +132,11 @@ def main():
     ap.add_argument("infile")
     ap.add_argument("--out", required=True)
     ap.add_argument("--target-count", type=int, default=10)
+    ap.add_argument("--lsh", action="store_true", help="MinHash/LSH near-duplicate lookup for large pools")
     args = ap.parse_args()
 
     candidates = json.loads(Path(args.infile).read_text())
-    chosen = select(candidates, args.target_count)
+    chosen = select(candidates, args.target_count, use_lsh=args.lsh)
     Path(args.out).write_text(json.dumps(chosen, indent=2), encoding="utf-8")
     print(args.out)
 
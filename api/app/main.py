@@ -15,6 +15,9 @@ from api.app.core.validator import validate
 from api.app.core.ledger import new_project_id, new_run_id, save_run
 from api.app.core.project_store import ensure_project, append_project_run, update_project_state
 from api.app.core.improve import learn
+from api.app.core.zip_pack import pack_zip, tree_entries
+from api.app.core.zip_response import ZipStreamResponse
+from api.app.core.zip_stream import ZipStream
 import shutil
 import time
 from datetime import datetime, timezone
@@ -48,7 +51,7 @@ import uuid
 from typing import Any, Dict, Optional, List
 
 import httpx
-from fastapi import FastAPI, Body, Response
+from fastapi import FastAPI, Body, Request, Response
 from .db import init_db, connect
 from .router_embed import route as embed_route
 from .exporters import export_outcomes_csv, export_generations_csv
@@ -558,14 +561,7 @@ def build_phaser_game_bundle(title: str, prompt: str) -> dict:
 """, encoding="utf-8")
 
     zip_path = EXPORTS_DIR / f"{gid}_{slug}.zip"
-    if zip_path.exists():
-      zip_path.unlink()
-
-    import zipfile
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
-      for fp in outdir.rglob("*"):
-        if fp.is_file():
-          z.write(fp, arcname=fp.relative_to(outdir))
+    pack_zip(zip_path, tree_entries(outdir))
 
     return {"game_id": gid, "dir": str(outdir), "zip": str(zip_path), "title": title, "prompt": prompt}
 
@@ -1444,13 +1440,18 @@ def game_build(inp: dict):
     return {"ok": True, **b}
 
 @app.get("/v1/game/download/{game_id}")
-def game_download(game_id: str):
-    # Find matching zip in EXPORTS_DIR
+def game_download(game_id: str, request: Request):
+    # Stream the bundle dir in EXPORTS_DIR as a zip; the prebuilt zip only for bundles without one
     try:
         d = EXPORTS_DIR
     except Exception:
         return {"ok": False, "error": "EXPORTS_DIR_missing"}
 
+    dirs = sorted(p for p in d.glob(f"{game_id}_*") if p.is_dir())
+    if dirs:
+        bundle = dirs[-1]
+        return ZipStreamResponse(ZipStream(tree_entries(bundle)), request.headers, filename=f"{bundle.name}.zip")
+
     zips = sorted(d.glob(f"{game_id}_*.zip"))
     if not zips:
         return {"ok": False, "error": "not_found"}
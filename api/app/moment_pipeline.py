@@ -0,0 +1,109 @@
+from __future__ import annotations
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+import argparse, json, sys
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.app.moment_ranker import build_candidates
+from api.app.moment_scorer import add_scorer_args, scorer_from_args
+from api.app.diversity_selector import select
+from api.app.edit_decision_engine import decision_for
+from api.app.shorts_quality_gate import quality_score
+
+Rows = Iterable[dict[str, Any]]
+
+class RankStage:
+    name = "candidates"
+
+    def __init__(self, topic_hint: str = "", scorer: Any = None):
+        self.topic_hint = topic_hint
+        self.scorer = scorer
+
+    def source(self, root: Path) -> Iterator[dict[str, Any]]:
+        for c in build_candidates(root, self.topic_hint, self.scorer):
+            yield asdict(c)
+
+class SelectStage:
+    name = "selected"
+
+    def __init__(self, target_count: int = 10):
+        self.target_count = target_count
+
+    def __call__(self, rows: Rows) -> Iterator[dict[str, Any]]:
+        # selection is greedy over the whole score order, so it has to see every row
+        yield from select(list(rows), self.target_count)
+
+class EditStage:
+    name = "edit_plan"
+
+    def __call__(self, rows: Rows) -> Iterator[dict[str, Any]]:
+        for r in rows:
+            yield decision_for(r)
+
+class GateStage:
+    name = "quality"
+
+    def __call__(self, rows: Rows) -> Iterator[dict[str, Any]]:
+        for r in rows:
+            yield quality_score(r)
+
+class MomentPipeline:
+    """Ranker -> selector -> edit engine -> quality gate in one interpreter.
+
+    Rows flow between stages as iterators of dicts. A stage's output is only
+    materialised and written as ``<out_dir>/<stage.name>.json`` when its name is
+    in ``write``, in the same format the standalone CLIs produce.
+    """
+
+    def __init__(self, source: RankStage, stages: list[Any]):
+        self.source = source
+        self.stages = stages
+
+    def run(self, root: Path, out_dir: Path | None = None, write: Iterable[str] = ()) -> list[dict[str, Any]]:
+        write = set(write)
+        rows: Rows = self.source.source(root)
+        for stage in [self.source, *self.stages]:
+            if stage is not self.source:
+                rows = stage(rows)
+            if out_dir is not None and stage.name in write:
+                rows = list(rows)
+                out_dir.mkdir(parents=True, exist_ok=True)
+                (out_dir / f"{stage.name}.json").write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        return list(rows)
+
+def default_pipeline(topic_hint: str = "", target_count: int = 10, scorer: Any = None) -> MomentPipeline:
+    return MomentPipeline(
+        RankStage(topic_hint, scorer),
+        [SelectStage(target_count), EditStage(), GateStage()],
+    )
+
+STAGE_NAMES = ("candidates", "selected", "edit_plan", "quality")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("root")
+    ap.add_argument("--topic", default="")
+    ap.add_argument("--target-count", type=int, default=10)
+    ap.add_argument("--out-dir", default="", help="default: <root>/meta")
+    ap.add_argument("--write", default="quality", help="comma list of stages to write, or 'all'")
+    add_scorer_args(ap)
+    args = ap.parse_args()
+
+    root = Path(args.root)
+    out_dir = Path(args.out_dir) if args.out_dir else root / "meta"
+    write = STAGE_NAMES if args.write == "all" else [w for w in args.write.split(",") if w]
+    unknown = set(write) - set(STAGE_NAMES)
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    rows = default_pipeline(args.topic, args.target_count, scorer_from_args(ap, args)).run(root, out_dir, write)
+    for name in write:
+        print(out_dir / f"{name}.json")
+    if not write:
+        print(json.dumps(rows, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 from __future__ import annotations
 from dataclasses import dataclass, asdict
 from typing import Any, Iterable
-import json, math, re
+import functools, hashlib, json, math, re, sys, uuid
 from pathlib import Path
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
 STOP = {
     "the","a","an","and","or","but","is","are","was","were","to","of","for","in","on","at",
     "with","this","that","it","its","into","from","up","out","you","your","we","they","he",
@@ -34,6 +42,8 @@ class Candidate:
     hook: str
     payoff: str
     region: str
+    # a learned scorer's prediction (review-rating scale); when set it orders candidates
+    learned_score: float | None = None
 
 def _clean_text(x: Any) -> str:
     return " ".join(str(x).replace("\n", " ").split()).strip()
@@ -54,7 +64,131 @@ def _to_segment(row: Any):
         return None
     return Segment(start=start, end=end, text=text)
 
-def discover_segments(root: Path) -> list[Segment]:
+SEGMENT_KEYS = ("segments", "items", "captions", "subtitles", "words", "results")
+STREAM_MIN_BYTES = 32 * 1024 * 1024
+TRANSCRIPT_INDEX_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "_cache" / "transcript_index"
+
+def _skip_ws(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+def iter_json_rows(path: Path, keys: Iterable[str] = SEGMENT_KEYS, chunk_size: int = 1 << 20) -> Iterable[Any]:
+    """Yield the items of a top-level JSON array, or of the arrays under ``keys`` of a
+    top-level object, without holding the whole document in memory."""
+    keys = set(keys)
+    dec = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        buf, pos, eof = "", 0, False
+
+        def more() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            data = fh.read(chunk_size)
+            buf, pos = buf[pos:] + data, 0
+            eof = not data
+            return bool(data)
+
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                pos = _skip_ws(buf, pos)
+                if pos < len(buf) or not more():
+                    return buf[pos:pos + 1]
+
+        def value() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    obj, end = dec.raw_decode(buf, _skip_ws(buf, pos))
+                except json.JSONDecodeError:
+                    if more():
+                        continue
+                    raise
+                # a number cut at the chunk edge still decodes; only trust it when a delimiter follows
+                if (end == len(buf) or buf[end] not in " \t\r\n,]}:") and more():
+                    continue
+                pos = end
+                return obj
+
+        def items() -> Iterable[Any]:
+            nonlocal pos
+            pos += 1
+            if peek() == "]":
+                pos += 1
+                return
+            while True:
+                yield value()
+                c = peek()
+                pos += 1
+                if c != ",":
+                    return
+
+        c = peek()
+        if c == "[":
+            yield from items()
+            return
+        if c != "{":
+            return
+        pos += 1
+        while peek() not in ("}", ""):
+            key = value()
+            if peek() == ":":
+                pos += 1
+            if key in keys and peek() == "[":
+                yield from items()
+            else:
+                value()
+            if peek() == ",":
+                pos += 1
+
+def read_segments(path: Path) -> list[Segment]:
+    if path.stat().st_size >= STREAM_MIN_BYTES:
+        rows = iter_json_rows(path)
+    else:
+        obj = json.loads(path.read_text(encoding="utf-8", errors="ignore"))
+        if isinstance(obj, list):
+            rows = obj
+        elif isinstance(obj, dict):
+            rows = [row for key in SEGMENT_KEYS if isinstance(obj.get(key), list) for row in obj[key]]
+        else:
+            rows = []
+    return [seg for seg in map(_to_segment, rows) if seg]
+
+def manifest_transcripts(root: Path) -> list[Path]:
+    """Transcript files a project manifest names explicitly (``transcript`` / ``transcripts``)."""
+    mp = root / "manifest.json"
+    if not mp.exists():
+        return []
+    try:
+        data = json.loads(mp.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    if not isinstance(data, dict):
+        return []
+    listed = data.get("transcripts") or ([data["transcript"]] if data.get("transcript") else [])
+    out = []
+    for item in listed:
+        rel = item.get("path") if isinstance(item, dict) else item
+        if rel:
+            p = Path(rel) if Path(rel).is_absolute() else root / rel
+            if p.exists():
+                out.append(p)
+    return out
+
+def _index_path(root: Path) -> Path:
+    digest = hashlib.sha1(str(root.resolve()).encode("utf-8")).hexdigest()[:20]
+    return TRANSCRIPT_INDEX_DIR / f"{digest}.json"
+
+def _scan_segments(root: Path) -> list[Segment]:
+    # every JSON under the project may hold segments; remember (by mtime/size) which do not
+    index_path = _index_path(root)
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except Exception:
+        index = {}
+
     candidates = []
     tjson = root / "transcript" / "transcript.json"
     if tjson.exists():
@@ -64,27 +198,38 @@ def discover_segments(root: Path) -> list[Segment]:
             candidates.append(p)
 
     segs: list[Segment] = []
+    new_index = {}
     for p in candidates:
         try:
-            obj = json.loads(p.read_text(encoding="utf-8", errors="ignore"))
-        except Exception:
+            st = p.stat()
+        except OSError:
             continue
-
-        if isinstance(obj, list):
-            for row in obj:
-                seg = _to_segment(row)
-                if seg:
-                    segs.append(seg)
+        key = str(p.relative_to(root))
+        sig = [st.st_mtime_ns, st.st_size]
+        known = index.get(key)
+        if known and known["sig"] == sig and not known["has_segments"]:
+            new_index[key] = known
             continue
+        try:
+            found = read_segments(p)
+        except Exception:
+            found = []
+        segs.extend(found)
+        new_index[key] = {"sig": sig, "has_segments": bool(found)}
+
+    if new_index != index:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(f"{index_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps(new_index), encoding="utf-8")
+        tmp.replace(index_path)
+    return segs
 
-        if isinstance(obj, dict):
-            for key in ("segments", "items", "captions", "subtitles", "words", "results"):
-                val = obj.get(key)
-                if isinstance(val, list):
-                    for row in val:
-                        seg = _to_segment(row)
-                        if seg:
-                            segs.append(seg)
+def discover_segments(root: Path) -> list[Segment]:
+    listed = manifest_transcripts(root)
+    if listed:
+        segs = [seg for p in listed for seg in read_segments(p)]
+    else:
+        segs = _scan_segments(root)
 
     out: list[Segment] = []
     seen = set()
@@ -129,18 +274,20 @@ def payoff_for_text(text: str) -> str:
 
 def score_segment(seg: Segment, topic_hint: str, total_dur: float) -> float:
     text = seg.text.lower()
+    # lexicon words count as whole words only: "how" must not fire inside "somehow"
+    words = set(re.findall(r"[a-z0-9]+", text))
     toks = set(tokenize(topic_hint))
     score = 0.0
 
     for t in toks:
-        if t and t in text:
+        if t and t in words:
             score += 2.5
 
     for w in HOOK_WORDS:
-        if w in text:
+        if w in words:
             score += 1.25
     for w in PAYOFF_WORDS:
-        if w in text:
+        if w in words:
             score += 1.0
 
     dur = max(0.2, seg.end - seg.start)
@@ -163,36 +310,103 @@ def score_segment(seg: Segment, topic_hint: str, total_dur: float) -> float:
 
     return score
 
-def build_candidates(root: Path, topic_hint: str = "") -> list[Candidate]:
+def duration_bonus(dur: float) -> float:
+    return 1.5 if 1.0 <= dur <= 4.2 else (0.5 if dur <= 6.0 else 0.0)
+
+def position_bonus(pos: float) -> float:
+    return 0.8 if pos <= 0.20 else (0.5 if pos <= 0.55 else 0.0)
+
+def lexicon_weights(topic_hint: str) -> list[tuple[str, float]]:
+    """Topic, hook and payoff words merged into one table, so a word in several lists is searched once."""
+    weights: dict[str, float] = {}
+    for group, value in ((set(tokenize(topic_hint)), 2.5), (HOOK_WORDS, 1.25), (PAYOFF_WORDS, 1.0)):
+        for w in group:
+            if w:
+                weights[w] = weights.get(w, 0.0) + value
+    return sorted(weights.items())
+
+@functools.lru_cache(maxsize=64)
+def lexicon_matcher(topic_hint: str) -> tuple[dict[str, float], re.Pattern]:
+    """The merged lexicon and one compiled whole-word alternation over all of its words."""
+    weights = dict(lexicon_weights(topic_hint))
+    alternation = "|".join(re.escape(w) for w in sorted(weights, key=len, reverse=True))
+    return weights, re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])")
+
+def score_segments(segs: list[Segment], topic_hint: str, total_dur: float) -> list[float]:
+    """``score_segment`` for every segment at once: the lexicons are compiled into one
+    regex per topic, each segment is scanned once, and the duration, position and
+    punctuation terms are computed as arrays when NumPy is available."""
+    if not segs:
+        return []
+    weights, matcher = lexicon_matcher(topic_hint)
+    lex = []
+    for seg in segs:
+        hits = {m.group() for m in matcher.finditer(seg.text.lower())}
+        lex.append(sum((weights[w] for w in hits), 0.0))
+    punct = [0.5 if ("!" in seg.text or "?" in seg.text) else 0.0 for seg in segs]
+    wordy = [0.5 if len(seg.text.split()) >= 6 else 0.0 for seg in segs]
+    denom = max(total_dur, 1.0)
+
+    if np is None:
+        out = []
+        for seg, score, p, w in zip(segs, lex, punct, wordy):
+            score += duration_bonus(max(0.2, seg.end - seg.start))
+            score += position_bonus(seg.start / denom)
+            out.append(score + p + w)
+        return out
+
+    starts = np.fromiter((seg.start for seg in segs), dtype=np.float64, count=len(segs))
+    ends = np.fromiter((seg.end for seg in segs), dtype=np.float64, count=len(segs))
+    dur = np.maximum(0.2, ends - starts)
+    pos = starts / denom
+    # same addition order as score_segment so the float sums match bit for bit
+    score = np.asarray(lex, dtype=np.float64)
+    score = score + np.where((dur >= 1.0) & (dur <= 4.2), 1.5, np.where(dur <= 6.0, 0.5, 0.0))
+    score = score + np.where(pos <= 0.20, 0.8, np.where(pos <= 0.55, 0.5, 0.0))
+    score = score + np.asarray(punct, dtype=np.float64)
+    score = score + np.asarray(wordy, dtype=np.float64)
+    return score.tolist()
+
+def build_candidates(root: Path, topic_hint: str = "", scorer: Any = None) -> list[Candidate]:
+    """``scorer`` is any object with ``score_segments(segs, topic_hint, total_dur)``
+    (see moment_scorer). ``score`` is always the keyword heuristic, which downstream
+    thresholds are tuned for; a non-heuristic scorer's output goes to ``learned_score``."""
     segs = discover_segments(root)
     if not segs:
         return []
     total_dur = max(s.end for s in segs)
+    scores = score_segments(segs, topic_hint, total_dur)
+    learned: list[Any] = [None] * len(segs)
+    if scorer is not None and getattr(scorer, "name", "") != "heuristic":
+        learned = scorer.score_segments(segs, topic_hint, total_dur)
     out = []
-    for seg in segs:
+    for seg, score, learned_score in zip(segs, scores, learned):
         pos = seg.start / max(total_dur, 1.0)
         region = "early" if pos < 0.33 else ("mid" if pos < 0.66 else "late")
         out.append(Candidate(
             start=seg.start,
             end=seg.end,
             text=_clean_text(seg.text),
-            score=score_segment(seg, topic_hint, total_dur),
+            score=score,
             angle=angle_for_text(seg.text),
             hook=hook_for_text(seg.text),
             payoff=payoff_for_text(seg.text),
             region=region,
+            learned_score=learned_score,
         ))
-    return sorted(out, key=lambda x: x.score, reverse=True)
+    return sorted(out, key=lambda x: x.score if x.learned_score is None else x.learned_score, reverse=True)
 
 def main():
     import argparse
+    from api.app.moment_scorer import add_scorer_args, scorer_from_args
     ap = argparse.ArgumentParser()
     ap.add_argument("root")
     ap.add_argument("--topic", default="")
     ap.add_argument("--out", default="")
+    add_scorer_args(ap)
     args = ap.parse_args()
 
-    rows = [asdict(x) for x in build_candidates(Path(args.root), args.topic)]
+    rows = [asdict(x) for x in build_candidates(Path(args.root), args.topic, scorer_from_args(ap, args))]
     if args.out:
         Path(args.out).write_text(json.dumps(rows, indent=2), encoding="utf-8")
         print(args.out)
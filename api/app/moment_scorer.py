@@ -0,0 +1,312 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import argparse, json, math, os, re, sqlite3, sys, uuid, zlib
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.app.moment_ranker import (
+    HOOK_WORDS, PAYOFF_WORDS, Segment, duration_bonus, position_bonus, score_segments, tokenize,
+)
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+ROOT = Path(__file__).resolve().parents[2]
+QUALITY_DB = ROOT / "shortforge" / "data" / "quality.db"
+DEFAULT_MODEL = ROOT / "shortforge" / "data" / "moment_scorer.json"
+
+FEATURES = (
+    "text_heuristic", "duration_bonus", "position_bonus", "words", "hook_hits", "payoff_hits",
+    "topic_hits", "question", "exclaim", "numbers", "second_person", "duration",
+)
+# heuristic points per unit of a feature; a feature the training reviews never vary
+# (e.g. no timings recorded) keeps this share of the learned text_heuristic weight
+HEURISTIC_PRIOR = {"duration_bonus": 1.0, "position_bonus": 1.0, "topic_hits": 2.5}
+# optional clip_reviews columns; without them a review has no topic and no timing
+REVIEW_COLUMNS = ("topic", "start_sec", "end_sec", "source_duration")
+
+def segment_features(segs: list[Segment], topic_hint: str, total_dur: float, timed: bool = True) -> list[list[float]]:
+    """One row of ``FEATURES`` per segment. The heuristic is split into its topic-free
+    text part and its duration/position bonuses; with ``timed=False`` the timing
+    columns are left at 0 because the segment bounds are not real."""
+    base = score_segments(segs, "", total_dur)
+    topic = set(tokenize(topic_hint))
+    denom = max(total_dur, 1.0)
+    rows = []
+    for seg, h in zip(segs, base):
+        text = seg.text.lower()
+        words = text.split()
+        toks = set(re.findall(r"[a-z0-9]+", text))
+        dur = max(0.2, seg.end - seg.start)
+        db, pb = duration_bonus(dur), position_bonus(seg.start / denom)
+        rows.append([
+            h - db - pb,
+            db if timed else 0.0,
+            pb if timed else 0.0,
+            math.log1p(len(words)),
+            float(len(HOOK_WORDS & toks)),
+            float(len(PAYOFF_WORDS & toks)),
+            float(len(topic & toks)),
+            1.0 if "?" in text else 0.0,
+            1.0 if "!" in text else 0.0,
+            1.0 if any(c.isdigit() for c in text) else 0.0,
+            1.0 if toks & {"you", "your", "yourself"} else 0.0,
+            min(60.0, dur) if timed else 0.0,
+        ])
+    return rows
+
+class HeuristicScorer:
+    name = "heuristic"
+
+    def score_segments(self, segs: list[Segment], topic_hint: str, total_dur: float) -> list[float]:
+        return score_segments(segs, topic_hint, total_dur)
+
+class LinearScorer:
+    """Standardized linear model over ``segment_features``, as written by ``train_linear``."""
+    name = "linear"
+
+    def __init__(self, model: dict[str, Any]):
+        if model.get("kind") != "linear" or list(model.get("features") or []) != list(FEATURES):
+            raise ValueError("unsupported moment scorer model")
+        self.model = model
+        self.mean = [float(x) for x in model["mean"]]
+        self.scale = [float(x) or 1.0 for x in model["scale"]]
+        self.weights = [float(x) for x in model["weights"]]
+        self.bias = float(model["bias"])
+        # fold the standardization into the weights so scoring is a single dot product
+        self.coef = [w / s for w, s in zip(self.weights, self.scale)]
+        self.offset = self.bias - sum(c * m for c, m in zip(self.coef, self.mean))
+
+    def score_rows(self, rows: list[list[float]]) -> list[float]:
+        if not rows:
+            return []
+        if np is not None:
+            return (np.asarray(rows, dtype=np.float64) @ np.asarray(self.coef) + self.offset).tolist()
+        return [self.offset + sum(c * x for c, x in zip(self.coef, row)) for row in rows]
+
+    def score_segments(self, segs: list[Segment], topic_hint: str, total_dur: float) -> list[float]:
+        # on the review-rating scale, not in heuristic points: callers keep it apart from ``score``
+        return [round(x, 4) for x in self.score_rows(segment_features(segs, topic_hint, total_dur))]
+
+_LOADED: dict[str, tuple[int, Any]] = {}
+
+SCORERS = ("heuristic", "learned")
+
+def load_scorer(path: str | Path | None = None):
+    """The trained model at ``path`` (or MYTHIQ_MOMENT_SCORER_MODEL, or ``DEFAULT_MODEL``),
+    loaded once per file version. Missing or unreadable models fall back to the heuristic."""
+    p = Path(path or os.environ.get("MYTHIQ_MOMENT_SCORER_MODEL") or DEFAULT_MODEL)
+    try:
+        mtime = p.stat().st_mtime_ns
+    except OSError:
+        return HeuristicScorer()
+    hit = _LOADED.get(str(p))
+    if hit and hit[0] == mtime:
+        return hit[1]
+    try:
+        scorer = LinearScorer(json.loads(p.read_text(encoding="utf-8")))
+    except Exception as e:
+        print(f"moment scorer: ignoring {p}: {e}", file=sys.stderr)
+        scorer = HeuristicScorer()
+    _LOADED[str(p)] = (mtime, scorer)
+    return scorer
+
+def pick_scorer(name: str = "heuristic", model: str | Path | None = None):
+    """``heuristic``, or ``learned`` for the model ``load_scorer`` finds; asking for the
+    learned scorer without a usable model raises ValueError instead of falling back."""
+    if name == "heuristic":
+        return HeuristicScorer()
+    if name != "learned":
+        raise ValueError(f"unknown moment scorer {name!r} (have {', '.join(SCORERS)})")
+    scorer = load_scorer(model)
+    if not isinstance(scorer, LinearScorer):
+        raise ValueError(f"no usable moment scorer model at {model or os.environ.get('MYTHIQ_MOMENT_SCORER_MODEL') or DEFAULT_MODEL}")
+    return scorer
+
+def add_scorer_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--scorer", choices=SCORERS, default=os.environ.get("MYTHIQ_MOMENT_SCORER") or "heuristic",
+                    help="candidate scorer (default: MYTHIQ_MOMENT_SCORER, else heuristic)")
+    ap.add_argument("--model", default="", help="learned scorer model (default: MYTHIQ_MOMENT_SCORER_MODEL, else shortforge/data)")
+
+def scorer_from_args(ap: argparse.ArgumentParser, args: argparse.Namespace):
+    try:
+        scorer = pick_scorer(args.scorer, args.model or None)
+    except ValueError as e:
+        ap.error(str(e))
+    if scorer.name != "heuristic":
+        print(f"moment scorer: {scorer.name} (learned_score orders candidates; score stays heuristic)", file=sys.stderr)
+    return scorer
+
+def load_reviews(db: Path = QUALITY_DB) -> list[dict[str, Any]]:
+    """Reviewed clips that have text to score: run_id, text, relevance (overall_score, else chosen),
+    plus topic and start/end/source_duration when the table has ``REVIEW_COLUMNS``."""
+    if not Path(db).exists():
+        return []
+    conn = sqlite3.connect(db)
+    try:
+        have = {r[1] for r in conn.execute("PRAGMA table_info(clip_reviews)")}
+        extra = [c for c in REVIEW_COLUMNS if c in have]
+        rows = conn.execute(f"""
+        SELECT run_id, COALESCE(NULLIF(transcript, ''), anchor_text, title), overall_score, chosen
+        {"".join(", " + c for c in extra)}
+        FROM clip_reviews
+        """).fetchall()
+    finally:
+        conn.close()
+    out = []
+    for run_id, text, overall, chosen, *rest in rows:
+        if not text or not str(text).strip():
+            continue
+        rel = float(overall or 0.0) or float(chosen or 0)
+        r = {"run_id": str(run_id), "text": " ".join(str(text).split()), "relevance": rel}
+        r.update((c, v) for c, v in zip(extra, rest) if v is not None and v != "")
+        out.append(r)
+    return out
+
+def review_features(reviews: list[dict[str, Any]]) -> list[list[float]]:
+    """``segment_features`` rows for reviews, each with its own topic and timing when known."""
+    rows = []
+    for r in reviews:
+        timed = r.get("start_sec") is not None and r.get("end_sec") is not None
+        if timed:
+            seg = Segment(float(r["start_sec"]), float(r["end_sec"]), r["text"])
+            total = float(r.get("source_duration") or seg.end)
+        else:
+            seg, total = Segment(0.0, 0.0, r["text"]), 0.0
+        rows.extend(segment_features([seg], str(r.get("topic") or ""), total, timed))
+    return rows
+
+def score_reviews(scorer, reviews: list[dict[str, Any]]) -> list[float]:
+    if isinstance(scorer, LinearScorer):
+        return scorer.score_rows(review_features(reviews))
+    # the heuristic rebuilt from its feature split; untimed reviews just lose the timing bonuses
+    return [row[0] + row[1] + row[2] + HEURISTIC_PRIOR["topic_hits"] * row[6] for row in review_features(reviews)]
+
+def _solve(a: list[list[float]], b: list[float]) -> list[float]:
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        piv = max(range(col, n), key=lambda r: abs(m[r][col]))
+        m[col], m[piv] = m[piv], m[col]
+        if abs(m[col][col]) < 1e-12:
+            continue
+        for r in range(n):
+            if r != col and m[r][col]:
+                f = m[r][col] / m[col][col]
+                m[r] = [x - f * y for x, y in zip(m[r], m[col])]
+    return [m[i][n] / m[i][i] if abs(m[i][i]) >= 1e-12 else 0.0 for i in range(n)]
+
+def train_linear(reviews: list[dict[str, Any]], l2: float = 1.0) -> dict[str, Any]:
+    """Ridge regression of review relevance on standardized ``FEATURES``."""
+    if len(reviews) < 2:
+        raise ValueError("need at least 2 reviewed clips to train")
+    x = review_features(reviews)
+    y = [r["relevance"] for r in reviews]
+    n, k = len(x), len(FEATURES)
+    mean = [sum(row[j] for row in x) / n for j in range(k)]
+    std = [math.sqrt(sum((row[j] - mean[j]) ** 2 for row in x) / n) for j in range(k)]
+    scale = [v or 1.0 for v in std]
+    z = [[(row[j] - mean[j]) / scale[j] for j in range(k)] for row in x]
+    y_mean = sum(y) / n
+    a = [[sum(r[i] * r[j] for r in z) + (l2 if i == j else 0.0) for j in range(k)] for i in range(k)]
+    b = [sum(r[i] * (t - y_mean) for r, t in zip(z, y)) for i in range(k)]
+    weights = _solve(a, b)
+    # constant columns learn nothing; score them at the heuristic's rate instead of dropping them
+    unseen = [f for j, f in enumerate(FEATURES) if not std[j] and f in HEURISTIC_PRIOR]
+    per_point = weights[0] / scale[0]
+    for f in unseen:
+        j = FEATURES.index(f)
+        weights[j] = HEURISTIC_PRIOR[f] * per_point * scale[j]
+    return {
+        "kind": "linear",
+        "features": list(FEATURES),
+        "mean": mean,
+        "scale": scale,
+        "weights": weights,
+        "heuristic_prior": unseen,
+        "bias": y_mean,
+        "l2": l2,
+        "trained_on": n,
+    }
+
+def ndcg_at_k(scores: list[float], relevance: list[float], k: int = 10) -> float | None:
+    ideal = sorted(relevance, reverse=True)[:k]
+    idcg = sum(r / math.log2(i + 2) for i, r in enumerate(ideal))
+    if idcg <= 0:
+        return None
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+    return sum(relevance[i] / math.log2(rank + 2) for rank, i in enumerate(order)) / idcg
+
+def mean_ndcg(scorer, reviews: list[dict[str, Any]], k: int = 10) -> tuple[float | None, int]:
+    """Mean NDCG@k over review runs (each run is one ranking), and how many runs counted."""
+    by_run: dict[str, list[dict[str, Any]]] = {}
+    for r in reviews:
+        by_run.setdefault(r["run_id"], []).append(r)
+    vals = []
+    for rows in by_run.values():
+        if len(rows) < 2:
+            continue
+        v = ndcg_at_k(score_reviews(scorer, rows), [r["relevance"] for r in rows], k)
+        if v is not None:
+            vals.append(v)
+    return (round(sum(vals) / len(vals), 4) if vals else None), len(vals)
+
+def _holdout(run_id: str, folds: int) -> bool:
+    return zlib.crc32(run_id.encode("utf-8")) % folds == 0
+
+def ranking_report(reviews: list[dict[str, Any]], model_path: Path | None = None, k: int = 10, folds: int = 5) -> dict[str, Any]:
+    """NDCG@k of the heuristic vs a learned model on held-out review runs.
+
+    The held-out model is trained here on the other runs, so the numbers are not
+    flattered by the deployed model having seen the same reviews; the deployed
+    model (if any) is scored on everything for reference.
+    """
+    train = [r for r in reviews if not _holdout(r["run_id"], folds)]
+    test = [r for r in reviews if _holdout(r["run_id"], folds)]
+    report: dict[str, Any] = {"k": k, "reviews": len(reviews), "train_reviews": len(train), "test_reviews": len(test)}
+    report["heuristic_ndcg"], report["test_runs"] = mean_ndcg(HeuristicScorer(), test, k)
+    try:
+        report["linear_ndcg"], _ = mean_ndcg(LinearScorer(train_linear(train)), test, k)
+    except ValueError as e:
+        report["linear_ndcg"] = None
+        report["linear_error"] = str(e)
+    if model_path is not None and Path(model_path).exists():
+        deployed = load_scorer(model_path)
+        report["deployed_scorer"] = deployed.name
+        report["deployed_ndcg_all"], _ = mean_ndcg(deployed, reviews, k)
+        report["heuristic_ndcg_all"], _ = mean_ndcg(HeuristicScorer(), reviews, k)
+    return report
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    tr = sub.add_parser("train")
+    tr.add_argument("--db", default=str(QUALITY_DB))
+    tr.add_argument("--out", default=str(DEFAULT_MODEL))
+    tr.add_argument("--l2", type=float, default=1.0)
+    rp = sub.add_parser("report")
+    rp.add_argument("--db", default=str(QUALITY_DB))
+    rp.add_argument("--model", default=str(DEFAULT_MODEL))
+    rp.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+
+    reviews = load_reviews(Path(args.db))
+    if args.cmd == "train":
+        model = train_linear(reviews, args.l2)
+        model["report"] = ranking_report(reviews)
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f"{out.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps(model, indent=2), encoding="utf-8")
+        tmp.replace(out)
+        print(out)
+        print(json.dumps(model["report"], indent=2))
+    else:
+        print(json.dumps(ranking_report(reviews, Path(args.model), args.k), indent=2))
+
+if __name__ == "__main__":
+    main()
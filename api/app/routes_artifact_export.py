@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
 
-from api.app.core.artifact_export import export_artifact_zip
+from api.app.core.artifact_export import artifact_entries, export_artifact_zip
+from api.app.core.zip_response import ZipStreamResponse
+from api.app.core.zip_stream import ZipStream
 
 router = APIRouter(tags=["artifacts"])
 
@@ -17,13 +18,9 @@ def artifacts_export_zip(artifact_id: str):
 
 
 @router.get("/v1/artifacts/download_zip/{artifact_id}")
-def artifacts_download_zip(artifact_id: str):
+def artifacts_download_zip(artifact_id: str, request: Request):
     try:
-        out = export_artifact_zip(artifact_id)
-        return FileResponse(
-            out["zip_path"],
-            media_type="application/zip",
-            filename=f"{artifact_id}.zip",
-        )
+        stream = ZipStream(artifact_entries(artifact_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"artifacts_download_zip_failed: {type(e).__name__}: {e}")
+    return ZipStreamResponse(stream, request.headers, filename=f"{artifact_id}.zip")
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
 
-from api.app.core.project_zip import zip_project_bundle
+from api.app.core.project_zip import project_bundle_entries, zip_project_bundle
+from api.app.core.zip_response import ZipStreamResponse
+from api.app.core.zip_stream import ZipStream
 
 router = APIRouter(tags=["export"])
 
@@ -24,14 +25,10 @@ def project_export_zip(project_id: str):
 
 
 @router.get("/v1/project/download_zip")
-def project_download_zip(project_id: str):
+def project_download_zip(project_id: str, request: Request):
     try:
-        out = zip_project_bundle(project_id)
+        entries = project_bundle_entries(project_id)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    return FileResponse(
-        out["zip_path"],
-        media_type="application/zip",
-        filename=f"{project_id}_bundle.zip",
-    )
+    return ZipStreamResponse(ZipStream(entries), request.headers, filename=f"{project_id}_bundle.zip")
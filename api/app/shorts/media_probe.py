@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import hashlib
+import json
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[3]
+PROBE_CACHE = ROOT / "artifacts" / "_cache" / "probe"
+# how far before a cut snap_to_keyframe first looks for a keyframe (typical GOPs are 2-10 s)
+KEYFRAME_WINDOW_SEC = 12.0
+
+_mem: dict[tuple[str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def source_key(path: Path) -> str:
+    st = path.stat()
+    raw = f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def cached_for_source(path: Path, kind: str, compute: Callable[[Path], Any]) -> Any:
+    """JSON-serialisable ``compute(path)``, cached in memory and on disk per source file and ``kind``."""
+    path = Path(path)
+    key = (source_key(path), kind)
+    with _lock:
+        if key in _mem:
+            return _mem[key]
+
+    disk = PROBE_CACHE / f"{key[0]}.{kind}.json"
+    value = None
+    if disk.exists():
+        try:
+            value = json.loads(disk.read_text(encoding="utf-8"))
+        except Exception:
+            value = None
+
+    if value is None:
+        value = compute(path)
+        disk.parent.mkdir(parents=True, exist_ok=True)
+        # threads and processes may compute the same key at once; each writes its own temp file
+        tmp = disk.with_name(f"{disk.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps(value), encoding="utf-8")
+        tmp.replace(disk)
+
+    with _lock:
+        _mem[key] = value
+    return value
+
+
+def existing_file_for_source(path: Path, name: str) -> Path | None:
+    """The ``cached_file_for_source`` file for ``path`` and ``name`` if it has already been made."""
+    disk = PROBE_CACHE / f"{source_key(Path(path))}.{name}"
+    return disk if disk.exists() else None
+
+
+def cached_file_for_source(path: Path, name: str, make: Callable[[Path, Path], None]) -> Path:
+    """A file derived from ``path`` (a proxy, say), made once per source version by ``make(src, out)``.
+
+    ``name`` is the cache file name after the source key, extension included,
+    and should carry every parameter the file depends on.
+    """
+    path = Path(path)
+    disk = PROBE_CACHE / f"{source_key(path)}.{name}"
+    if disk.exists():
+        return disk
+    disk.parent.mkdir(parents=True, exist_ok=True)
+    # keep the extension last so tools that pick a format from the name still can
+    tmp = disk.with_name(f"{disk.stem}.{uuid.uuid4().hex[:8]}.tmp{disk.suffix}")
+    try:
+        make(path, tmp)
+        tmp.replace(disk)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return disk
+
+
+def _probe_streams(path: Path) -> dict[str, Any]:
+    out = subprocess.check_output(
+        [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries",
+            "format=duration,size,bit_rate,format_name"
+            ":stream=index,codec_type,codec_name,width,height,r_frame_rate,sample_rate,channels,duration",
+            "-of", "json",
+            str(path),
+        ],
+        text=True,
+    )
+    data = json.loads(out or "{}")
+    fmt = data.get("format") or {}
+    try:
+        duration = float(fmt.get("duration") or 0.0)
+    except ValueError:
+        duration = 0.0
+    return {
+        "duration": duration,
+        "format": fmt,
+        "streams": data.get("streams") or [],
+    }
+
+
+def probe(path: Path) -> dict[str, Any]:
+    return cached_for_source(path, "probe", _probe_streams)
+
+
+def probe_duration(path: Path) -> float:
+    return float(probe(path)["duration"])
+
+
+def has_stream(path: Path, codec_type: str) -> bool:
+    return any(s.get("codec_type") == codec_type for s in probe(path)["streams"])
+
+
+def _probe_keyframes(path: Path, interval: str | None = None) -> list[float]:
+    # packet flags come straight from the container index, nothing is decoded;
+    # ``interval`` (ffprobe -read_intervals) limits the scan to part of the file
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0"]
+    if interval:
+        cmd += ["-read_intervals", interval]
+    cmd += ["-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(path)]
+    out = subprocess.check_output(cmd, text=True)
+    times = []
+    for line in out.splitlines():
+        pts, _, flags = line.strip().partition(",")
+        if flags.startswith("K") and pts not in ("", "N/A"):
+            times.append(round(float(pts), 3))
+    return sorted(set(times))
+
+
+def keyframe_times(path: Path) -> list[float]:
+    """Every keyframe of the source: one full packet scan, cached. Worth it when many
+    cuts are snapped in the same file; ``snap_to_keyframe`` alone only reads a window."""
+    return cached_for_source(path, "keyframes", _probe_keyframes)
+
+
+def _cached_only(path: Path, kind: str) -> Any:
+    key = (source_key(path), kind)
+    with _lock:
+        if key in _mem:
+            return _mem[key]
+    try:
+        return json.loads((PROBE_CACHE / f"{key[0]}.{kind}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def snap_to_keyframe(path: Path, t: float) -> float:
+    """Return the last keyframe at or before ``t`` (``t`` itself if there is none).
+
+    Uses the full ``keyframe_times`` index when it is already cached. Otherwise
+    only the ``KEYFRAME_WINDOW_SEC`` before ``t`` is scanned (``-read_intervals``),
+    widening the window until it holds a keyframe or reaches the file start.
+    """
+    path, t = Path(path), float(t)
+    kfs = _cached_only(path, "keyframes")
+    if kfs is None:
+        window = KEYFRAME_WINDOW_SEC
+        while True:
+            lo = max(0.0, t - window)
+            kfs = _probe_keyframes(path, f"{lo:.3f}%{t + 0.05:.3f}")
+            if lo == 0.0 or any(k <= t + 1e-3 for k in kfs):
+                break
+            window *= 4
+    if not kfs:
+        return t
+    i = bisect.bisect_right(kfs, t + 1e-3) - 1
+    return kfs[i] if i >= 0 else kfs[0]
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_filters() -> frozenset[str]:
+    try:
+        r = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-filters"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except Exception:
+        return frozenset()
+    names = set()
+    for line in ((r.stdout or "") + "\n" + (r.stderr or "")).splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.add(parts[1])
+    return frozenset(names)
+
+
+def ffmpeg_has_filter(name: str) -> bool:
+    return name in ffmpeg_filters()
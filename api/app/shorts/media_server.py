@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import socket
+from pathlib import Path
+from typing import Any, Mapping
+
+# the range logic lives in core so core.zip_stream can share it; re-exported for older imports
+from api.app.core.http_range import RangeNotSatisfiable, etag_matches, parse_range, plan_range_response
+
+
+def file_etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def plan_file_response(
+    path: Path,
+    request_headers: Mapping[str, str],
+    content_type: str | None = None,
+) -> dict[str, Any]:
+    """``plan_range_response`` for serving ``path``; the body is then sent with ``send_file_range``."""
+    st = os.stat(path)
+    return plan_range_response(
+        st.st_size,
+        file_etag(st),
+        st.st_mtime,
+        request_headers,
+        content_type or mimetypes.guess_type(str(path))[0] or "application/octet-stream",
+    )
+
+
+def send_file_range(sock: socket.socket, path: Path, start: int, length: int) -> None:
+    """Copy ``length`` bytes of ``path`` from ``start`` to ``sock`` without passing through Python.
+
+    ``socket.sendfile`` uses ``os.sendfile`` where the platform has it and falls
+    back to plain reads and sends elsewhere.
+    """
+    if length <= 0:
+        return
+    with open(path, "rb") as fh:
+        sock.sendfile(fh, offset=start, count=length)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+# Every libx264 render path picks one of these instead of hard-coding its own settings.
+# "loudnorm" is an ffmpeg loudnorm option string, or None to leave audio levels alone.
+RENDER_PROFILES: dict[str, dict[str, Any]] = {
+    "tiktok_4k": {
+        "width": 2160, "height": 3840, "fps": 30,
+        "preset": "slow", "crf": 18, "pix_fmt": None,
+        "loudnorm": None, "audio_bitrate": "192k", "faststart": False,
+    },
+    "final_1080": {
+        "width": 1080, "height": 1920, "fps": 30,
+        "preset": "medium", "crf": 20, "pix_fmt": None,
+        "loudnorm": None, "audio_bitrate": "192k", "faststart": False,
+    },
+    "vertical_clip": {
+        "width": 1080, "height": 1920, "fps": 30,
+        "preset": "veryfast", "crf": 23, "pix_fmt": None,
+        "loudnorm": None, "audio_bitrate": "192k", "faststart": False,
+    },
+    "story_segment": {
+        "width": 1080, "height": 1920, "fps": 30,
+        "preset": "medium", "crf": 19, "pix_fmt": None,
+        "loudnorm": "I=-16:TP=-1.5:LRA=9", "audio_bitrate": "192k", "faststart": True,
+    },
+    "fastlane": {
+        "width": 1080, "height": 1920, "fps": 30,
+        "preset": "veryfast", "crf": 21, "pix_fmt": "yuv420p",
+        "loudnorm": "I=-14:TP=-1.5:LRA=11", "audio_bitrate": "192k", "faststart": True,
+    },
+    # review-only: quarter the pixels, fastest preset, no loudness pass
+    "draft": {
+        "width": 540, "height": 960, "fps": 30,
+        "preset": "ultrafast", "crf": 30, "pix_fmt": "yuv420p",
+        "loudnorm": None, "audio_bitrate": "128k", "faststart": True,
+    },
+}
+
+
+def get_profile(name: str) -> dict[str, Any]:
+    try:
+        return RENDER_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"unknown render profile: {name!r} (have {', '.join(RENDER_PROFILES)})")
+
+
+# /final-render modes with a profile of their own; every other mode renders as final_1080
+FINAL_MODE_PROFILES = {"tiktok_4k": "tiktok_4k"}
+
+
+def final_profile_name(mode: str) -> str:
+    return FINAL_MODE_PROFILES.get(mode, "final_1080")
+
+
+def resolve_profile_name(default: str) -> str:
+    """``default``, unless MYTHIQ_RENDER_PROFILE overrides every render path (e.g. ``draft``)."""
+    return os.environ.get("MYTHIQ_RENDER_PROFILE") or default
+
+
+def resolve_profile(default: str) -> dict[str, Any]:
+    return get_profile(resolve_profile_name(default))
+
+
+def geometry_filter(profile: dict[str, Any], fit: str = "crop") -> str:
+    """Scale to the profile frame, filling it (``crop``) or letterboxing (``pad``), then set fps."""
+    w, h = profile["width"], profile["height"]
+    if fit == "pad":
+        chain = f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"
+    else:
+        chain = f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h}"
+    return f"{chain},fps={profile['fps']}"
+
+
+def audio_filter(profile: dict[str, Any]) -> str | None:
+    return f"loudnorm={profile['loudnorm']}" if profile.get("loudnorm") else None
+
+
+def video_args(profile: dict[str, Any]) -> list[str]:
+    args = ["-c:v", "libx264", "-preset", profile["preset"], "-crf", str(profile["crf"])]
+    if profile.get("pix_fmt"):
+        args += ["-pix_fmt", profile["pix_fmt"]]
+    return args
+
+
+def audio_args(profile: dict[str, Any]) -> list[str]:
+    return ["-c:a", "aac", "-b:a", profile["audio_bitrate"]]
+
+
+def container_args(profile: dict[str, Any]) -> list[str]:
+    return ["-movflags", "+faststart"] if profile.get("faststart") else []
+
+
+def encode_args(profile: dict[str, Any]) -> list[str]:
+    return video_args(profile) + audio_args(profile) + container_args(profile)
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import bisect
 import hashlib
 import json
+import os
 import re
 import shutil
 import subprocess
 import time
 import textwrap
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from faster_whisper import WhisperModel
 
+from api.app.core.zip_pack import pack_zip, tree_entries
+from api.app.shorts.media_probe import probe_duration, snap_to_keyframe
+from api.app.shorts.render_profiles import audio_filter, encode_args, geometry_filter, resolve_profile, resolve_profile_name
+from api.app.shorts.transcribe_parallel import append_chunk_segments, transcribe_parallel
+
 ROOT = Path(__file__).resolve().parents[3]
 SHORTS_DEFAULT_TARGET_COUNT = 10
 
@@ -64,6 +72,19 @@ SHORTS_MIN_CLIP_SEC = 18.0
 SHORTS_MAX_CLIP_SEC = 35.0
 SHORTS_STEP_SEC = 10.0
 
+SHORTS_STREAM_CHUNK_SEC = 300.0
+# each chunk's audio runs this far past its cut so speech straddling the cut is heard whole
+SHORTS_STREAM_OVERLAP_SEC = 8.0
+SHORTS_STREAM_MIN_SOURCE_SEC = 900.0
+SHORTS_STREAM_RENDER_MIN_SCORE = 0.55
+SHORTS_STREAM_RENDER_WORKERS = 2
+
+# >1 transcribes silence-split chunks of the source on that many worker processes
+SHORTS_TRANSCRIBE_WORKERS = int(os.environ.get("MYTHIQ_SHORTS_TRANSCRIBE_WORKERS", "1"))
+
+# MYTHIQ_RENDER_PROFILE=draft swaps in fast review renders, cached apart from these
+SHORTS_RENDER_PROFILE = "vertical_clip"
+
 ART = ROOT / "artifacts"
 
 
@@ -92,20 +113,6 @@ def write_json(path: Path, data: Any) -> None:
     path.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
-def probe_duration(path: Path) -> float:
-    out = subprocess.check_output(
-        [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(path),
-        ],
-        text=True,
-    ).strip()
-    return float(out)
-
-
 def cache_dir() -> Path:
     p = ART / "_cache" / "sources"
     p.mkdir(parents=True, exist_ok=True)
@@ -176,27 +183,41 @@ def extract_audio(src: Path, wav: Path) -> None:
     ])
 
 
-def transcribe_audio(wav: Path) -> dict[str, Any]:
-    t0 = time.time()
-    model = WhisperModel("base", compute_type="int8")
-    segments, info = model.transcribe(str(wav), beam_size=5, vad_filter=True)
+_whisper_model: WhisperModel | None = None
 
-    out_segments: list[dict[str, Any]] = []
-    full_text: list[str] = []
 
+def whisper_model() -> WhisperModel:
+    global _whisper_model
+    if _whisper_model is None:
+        _whisper_model = WhisperModel("base", compute_type="int8")
+    return _whisper_model
+
+
+def _transcribe_segments(wav: Path, offset: float = 0.0) -> tuple[list[dict[str, Any]], Any]:
+    segments, info = whisper_model().transcribe(str(wav), beam_size=5, vad_filter=True)
+
+    out_segments: list[dict[str, Any]] = []
     for seg in segments:
         text = (seg.text or "").strip()
         if not text:
             continue
         out_segments.append({
-            "start": round(float(seg.start), 2),
-            "end": round(float(seg.end), 2),
+            "start": round(offset + float(seg.start), 2),
+            "end": round(offset + float(seg.end), 2),
             "text": text,
         })
-        full_text.append(text)
+    return out_segments, info
+
+
+def transcribe_audio(wav: Path, workers: int = 1) -> dict[str, Any]:
+    if workers > 1:
+        return transcribe_parallel(wav, workers)
+
+    t0 = time.time()
+    out_segments, info = _transcribe_segments(wav)
 
     return {
-        "text": " ".join(full_text).strip(),
+        "text": " ".join(s["text"] for s in out_segments).strip(),
         "segments": out_segments,
         "language": getattr(info, "language", None),
         "duration_sec": out_segments[-1]["end"] if out_segments else 0.0,
@@ -204,6 +225,90 @@ def transcribe_audio(wav: Path) -> dict[str, Any]:
     }
 
 
+def extract_audio_chunk(src: Path, wav: Path, start: float, dur: float) -> None:
+    run([
+        "ffmpeg", "-y",
+        "-ss", f"{start:.3f}",
+        "-t", f"{dur:.3f}",
+        "-i", str(src),
+        "-vn",
+        "-ac", "1",
+        "-ar", "16000",
+        str(wav),
+    ])
+
+
+def iter_transcript_chunks(
+    src: Path,
+    workdir: Path,
+    total_duration: float,
+    chunk_sec: float = SHORTS_STREAM_CHUNK_SEC,
+    overlap_sec: float = SHORTS_STREAM_OVERLAP_SEC,
+):
+    """Yield ``(covered_until, segments, info)`` per audio chunk of ``src``.
+
+    Each chunk's audio extends ``overlap_sec`` past its cut, and only segments
+    starting before the cut are yielded, so a segment straddling the cut comes
+    out whole from the earlier chunk; the later chunk's repeat of it is dropped
+    by ``append_chunk_segments``. The next chunk is extracted by ffmpeg while the
+    current one is being transcribed, so audio extraction never blocks Whisper
+    after the first chunk.
+    """
+    total = float(total_duration)
+    offsets: list[float] = []
+    t = 0.0
+    while t < total:
+        offsets.append(t)
+        t += chunk_sec
+    if not offsets:
+        return
+
+    def extract(i: int) -> Path:
+        wav = workdir / f"audio_{i:04d}.wav"
+        extract_audio_chunk(src, wav, offsets[i], min(chunk_sec + overlap_sec, total - offsets[i]))
+        return wav
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(extract, 0)
+        for i, offset in enumerate(offsets):
+            wav = pending.result()
+            last = i + 1 == len(offsets)
+            if not last:
+                pending = pool.submit(extract, i + 1)
+            segments, info = _transcribe_segments(wav, offset=offset)
+            wav.unlink(missing_ok=True)
+            cut = min(total, offset + chunk_sec)
+            if not last:
+                segments = [seg for seg in segments if seg["start"] < cut]
+            yield cut, segments, info
+
+
+def transcribe_streaming(
+    src: Path,
+    workdir: Path,
+    total_duration: float,
+    on_chunk: Callable[[dict[str, Any], float], None] | None = None,
+) -> dict[str, Any]:
+    t0 = time.time()
+    out_segments: list[dict[str, Any]] = []
+    language = None
+
+    for covered_until, segments, info in iter_transcript_chunks(src, workdir, total_duration):
+        append_chunk_segments(out_segments, segments)
+        if language is None:
+            language = getattr(info, "language", None)
+        if on_chunk is not None:
+            on_chunk({"segments": out_segments}, covered_until)
+
+    return {
+        "text": " ".join(s["text"] for s in out_segments).strip(),
+        "segments": out_segments,
+        "language": language,
+        "duration_sec": out_segments[-1]["end"] if out_segments else 0.0,
+        "transcribe_elapsed_sec": round(time.time() - t0, 2),
+    }
+
+
 
 
 def clamp_clip_window(start_sec: float, end_sec: float, total_duration: float) -> tuple[float, float]:
@@ -450,29 +555,78 @@ def write_clip_metadata(job: Path, item: dict[str, Any]) -> Path:
 
 def zip_job_dir(job: Path) -> Path:
     out = job / "exports" / f"{job.name}.zip"
-    out.parent.mkdir(parents=True, exist_ok=True)
+    pack_zip(out, tree_entries(job, exclude=[out]))
+    return out
 
-    import zipfile
+THUMBNAIL_VF = (
+    "scale=1080:1920:force_original_aspect_ratio=increase,"
+    "crop=1080:1920"
+)
+THUMBNAIL_BATCH_SIZE = 16
 
-    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for path in sorted(job.rglob("*")):
-            if not path.is_file():
-                continue
-            if path == out:
-                continue
-            zf.write(path, arcname=str(path.relative_to(job)))
 
-    return out
+def _thumbnail_text_filter(txt: str) -> str:
+    safe = (
+        txt.replace("\\", "\\\\")
+           .replace(":", "\\:")
+           .replace("'", "\\'")
+           .replace("%", "\\%")
+    )
+    return (
+        "drawbox=x=40:y=60:w=1000:h=180:color=black@0.45:t=fill,"
+        f"drawtext=text='{safe}':x=80:y=110:fontsize=72:fontcolor=white"
+    )
+
+
+def render_thumbnails(src: Path, requests: list[tuple[Path, float, str]]) -> list[bool]:
+    """Render ``(out, t, text)`` thumbnails with one ffmpeg process per batch.
+
+    Every timestamp is its own fast-seeked input of the same process and gets
+    its own filter chain and output, so the source is opened once per batch
+    instead of twice per thumbnail. Frames the batch did not produce are
+    retried one by one with render_thumbnail.
+    """
+    results = [False] * len(requests)
+    order = sorted(range(len(requests)), key=lambda i: float(requests[i][1]))
+
+    for b in range(0, len(order), THUMBNAIL_BATCH_SIZE):
+        batch = order[b:b + THUMBNAIL_BATCH_SIZE]
+        cmd = ["ffmpeg", "-y"]
+        chains = []
+        for n, i in enumerate(batch):
+            out, t, text = requests[i]
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.unlink(missing_ok=True)
+            cmd += ["-ss", f"{max(0.0, float(t)):.3f}", "-i", str(src)]
+            vf = THUMBNAIL_VF
+            if (text or "").strip():
+                vf += "," + _thumbnail_text_filter(text.strip())
+            chains.append(f"[{n}:v:0]{vf}[t{n}]")
+        cmd += ["-filter_complex", ";".join(chains)]
+        for n, i in enumerate(batch):
+            cmd += ["-map", f"[t{n}]", "-frames:v", "1", str(requests[i][0])]
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            pass
+
+        for i in batch:
+            out = requests[i][0]
+            results[i] = out.exists() and out.stat().st_size > 0
+
+    for i, (out, t, text) in enumerate(requests):
+        if not results[i]:
+            results[i] = render_thumbnail(src, out, t, text)
+    return results
+
 
 def render_thumbnail(src: Path, out: Path, t: float, text: str = "") -> bool:
     out.parent.mkdir(parents=True, exist_ok=True)
     safe_t = max(0.0, float(t))
 
     # pass 1: always try to create a plain thumbnail frame first
-    vf_plain = (
-        "scale=1080:1920:force_original_aspect_ratio=increase,"
-        "crop=1080:1920"
-    )
+    vf_plain = THUMBNAIL_VF
     cmd_plain = [
         "ffmpeg", "-y",
         "-ss", f"{safe_t:.3f}",
@@ -495,18 +649,8 @@ def render_thumbnail(src: Path, out: Path, t: float, text: str = "") -> bool:
     if not txt:
         return True
 
-    safe = (
-        txt.replace("\\", "\\\\")
-           .replace(":", "\\:")
-           .replace("'", "\\'")
-           .replace("%", "\\%")
-    )
-
     tmp = out.with_name(out.stem + ".tmp" + out.suffix)
-    vf_text = (
-        "drawbox=x=40:y=60:w=1000:h=180:color=black@0.45:t=fill,"
-        f"drawtext=text='{safe}':x=80:y=110:fontsize=72:fontcolor=white"
-    )
+    vf_text = _thumbnail_text_filter(txt)
     cmd_text = [
         "ffmpeg", "-y",
         "-i", str(out),
@@ -664,6 +808,129 @@ def write_shorts_brief(job: Path, source_url: str, moments: list[dict]) -> tuple
     brief_md.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
     return brief_json, brief_md
 
+SHORTS_KEYWORD_BANK = [
+    "big", "danger", "fight", "war", "largest", "strong", "trapped",
+    "lost", "found", "chased", "crazy", "insane", "secret", "legendary",
+    "attack", "final", "escape", "run", "king", "death", "minecraft",
+    "server", "world", "betrayal", "destroyed", "civilization", "revenge"
+]
+
+SHORTS_HOOK_MARKERS = [
+    "this is", "oh my god", "what", "how", "why", "run", "lost",
+    "largest", "biggest", "crazy", "insane", "secret", "legendary",
+    "attack", "final", "trapped", "escape", "found"
+]
+
+# markers containing a space can straddle the " " that joins any number of segments
+_SHORTS_SPANNING_MARKERS = [i for i, h in enumerate(SHORTS_HOOK_MARKERS) if " " in h]
+
+
+def _index_transcript(segments: list[dict[str, Any]]) -> dict[str, Any]:
+    rows = []
+    for seg in segments:
+        seg_start = float(seg.get("start", 0.0))
+        seg_end = float(seg.get("end", seg_start))
+        rows.append((seg_start, seg_end, (seg.get("text") or "").strip()))
+    rows.sort(key=lambda r: r[0])
+
+    starts: list[float] = []
+    ends: list[float] = []
+    texts: list[str] = []
+    keyword_hits: list[list[int]] = []
+    marker_hits: list[list[int]] = []
+    tokens: list[list[str]] = []
+    word_counts: list[int] = []
+
+    for seg_start, seg_end, text in rows:
+        low = text.lower()
+        words = [w for w in re.split(r"\s+", text) if w]
+        starts.append(seg_start)
+        ends.append(seg_end)
+        texts.append(text)
+        keyword_hits.append([k for k, kw in enumerate(SHORTS_KEYWORD_BANK) if kw in low])
+        marker_hits.append([k for k, h in enumerate(SHORTS_HOOK_MARKERS) if h in low])
+        tokens.append([w.lower().strip(".,!?\"'()[]{}") for w in words])
+        word_counts.append(len(words))
+
+    # marker occurrences that only exist once segments first..last are joined, found in the
+    # joined text of the whole transcript; a window joining a contiguous run lo..hi-1 contains
+    # exactly the ones with lo <= first and last < hi
+    joined = " ".join(t.lower() for t in texts)
+    offsets: list[int] = []
+    pos = 0
+    for t in texts:
+        offsets.append(pos)
+        pos += len(t) + 1
+    span_by_first: list[list[tuple[int, int]]] = [[] for _ in texts]
+    span_by_last: list[list[tuple[int, int]]] = [[] for _ in texts]
+    for k in _SHORTS_SPANNING_MARKERS:
+        marker = SHORTS_HOOK_MARKERS[k]
+        at = joined.find(marker)
+        while at >= 0:
+            first = bisect.bisect_right(offsets, at) - 1
+            last = bisect.bisect_right(offsets, at + len(marker)) - 1
+            if first != last:
+                span_by_first[first].append((last, k))
+                span_by_last[last].append((first, k))
+            at = joined.find(marker, at + 1)
+
+    return {
+        "starts": starts,
+        "ends": ends,
+        "by_end": sorted(range(len(rows)), key=lambda i: ends[i]),
+        "texts": texts,
+        "keyword_hits": keyword_hits,
+        "marker_hits": marker_hits,
+        "span_by_first": span_by_first,
+        "span_by_last": span_by_last,
+        "tokens": tokens,
+        "word_counts": word_counts,
+    }
+
+
+def _overlaps_picked(picked_spans: list[tuple[float, float]], start: float, end: float) -> bool:
+    # picked_spans is sorted and non-overlapping, so only the neighbours can collide
+    pos = bisect.bisect_left(picked_spans, (start, end))
+    if pos > 0 and not (end <= picked_spans[pos - 1][0] or start >= picked_spans[pos - 1][1]):
+        return True
+    if pos < len(picked_spans) and not (end <= picked_spans[pos][0] or start >= picked_spans[pos][1]):
+        return True
+    return False
+
+
+def _build_moment_item(window: dict[str, Any], text: str) -> dict[str, Any]:
+    reason_parts = []
+    if window["hook_score"] >= 0.8:
+        reason_parts.append("strong hook words")
+    if window["density_score"] >= 0.7:
+        reason_parts.append("dense speech")
+    if window["clarity_score"] >= 0.7:
+        reason_parts.append("clear spoken content")
+    if window["matched_keywords"]:
+        reason_parts.append("matched high-interest keywords")
+
+    preview = text[:220]
+    item = {
+        "start_sec": window["start_sec"],
+        "end_sec": window["end_sec"],
+        "hook_score": round(window["hook_score"], 3),
+        "payoff_score": round(window["clarity_score"], 3),
+        "clip_score": window["clip_score"],
+        "speech_density": round(window["density_score"], 3),
+        "segment_count": window["segment_count"],
+        "matched_keywords": window["matched_keywords"][:8],
+        "transcript_preview": preview,
+        "reason": ", ".join(reason_parts) if reason_parts else "general transcript strength",
+        "title": (text[:80] + "...") if len(text) > 80 else text,
+    }
+    item["hook_line"] = build_hook_line(preview)
+    item["viral_title"] = build_viral_title(preview, item["matched_keywords"])
+    item["thumbnail_text"] = build_thumbnail_text(preview, item["matched_keywords"])
+    item["editor_notes"] = build_editor_notes(item)
+    item["hashtags"] = build_hashtags(item)
+    return item
+
+
 def rank_moments_from_transcript(
     transcript_data: dict[str, Any],
     total_duration: float,
@@ -673,46 +940,82 @@ def rank_moments_from_transcript(
     if not segments:
         return []
 
+    idx = _index_transcript(segments)
+    starts = idx["starts"]
+    ends = idx["ends"]
+    by_end = idx["by_end"]
+    n = len(starts)
+
+    # a segment enters when it starts before the window end and leaves once it ends at or
+    # before the window start; [lo, hi) spans the members, which are contiguous unless a
+    # segment nested inside a longer one has already left
+    lo = hi = gone = members = 0
+    left = [False] * n
+    keyword_counts = [0] * len(SHORTS_KEYWORD_BANK)
+    marker_counts = [0] * len(SHORTS_HOOK_MARKERS)
+    span_counts = [0] * len(SHORTS_HOOK_MARKERS)
+    token_counts: dict[str, int] = {}
+    word_total = 0
+    text_segments = 0
+
+    def add(i: int, sign: int) -> None:
+        nonlocal word_total, text_segments, members
+        for k in idx["keyword_hits"][i]:
+            keyword_counts[k] += sign
+        for k in idx["marker_hits"][i]:
+            marker_counts[k] += sign
+        for tok in idx["tokens"][i]:
+            c = token_counts.get(tok, 0) + sign
+            if c:
+                token_counts[tok] = c
+            else:
+                del token_counts[tok]
+        word_total += sign * idx["word_counts"][i]
+        members += sign
+        if idx["texts"][i]:
+            text_segments += sign
+
     windows: list[dict[str, Any]] = []
     step = SHORTS_STEP_SEC
     start = 0.0
 
     while start < max(float(total_duration) - SHORTS_MIN_CLIP_SEC, 0.0) + step:
         end = min(float(total_duration), start + SHORTS_MAX_CLIP_SEC)
-        chunk = []
-        for seg in segments:
-            seg_start = float(seg.get("start", 0.0))
-            seg_end = float(seg.get("end", seg_start))
-            if seg_end <= start or seg_start >= end:
-                continue
-            chunk.append(seg)
-
-        text = " ".join((seg.get("text") or "").strip() for seg in chunk).strip()
-        if text:
-            lower_text = text.lower()
-            words = [w for w in re.split(r"\s+", text) if w]
+
+        while hi < n and starts[hi] < end:
+            if not left[hi]:
+                add(hi, 1)
+            for first, k in idx["span_by_last"][hi]:
+                if first >= lo:
+                    span_counts[k] += 1
+            hi += 1
+        while gone < n and ends[by_end[gone]] <= start:
+            i = by_end[gone]
+            left[i] = True
+            if i < hi:
+                add(i, -1)
+            gone += 1
+        while lo < hi and left[lo]:
+            for last, k in idx["span_by_first"][lo]:
+                if last < hi:
+                    span_counts[k] -= 1
+            lo += 1
+
+        if text_segments:
+            contiguous = members == hi - lo
+            if contiguous:
+                hook_hits = sum(1 for m, sp in zip(marker_counts, span_counts) if m or sp)
+            else:
+                text = " ".join(idx["texts"][i] for i in range(lo, hi) if not left[i]).lower()
+                hook_hits = sum(1 for h in SHORTS_HOOK_MARKERS if h in text)
+
             duration = max(1.0, end - start)
+            matched_keywords = [kw for k, kw in enumerate(SHORTS_KEYWORD_BANK) if keyword_counts[k]][:8]
 
-            keyword_bank = [
-                "big", "danger", "fight", "war", "largest", "strong", "trapped",
-                "lost", "found", "chased", "crazy", "insane", "secret", "legendary",
-                "attack", "final", "escape", "run", "king", "death", "minecraft",
-                "server", "world", "betrayal", "destroyed", "civilization", "revenge"
-            ]
-            matched_keywords = [kw for kw in keyword_bank if kw in lower_text][:8]
-
-            hook_markers = [
-                "this is", "oh my god", "what", "how", "why", "run", "lost",
-                "largest", "biggest", "crazy", "insane", "secret", "legendary",
-                "attack", "final", "trapped", "escape", "found"
-            ]
-            hook_hits = sum(1 for h in hook_markers if h in lower_text)
             hook_score = min(1.0, 0.18 * hook_hits + 0.10 * len(matched_keywords))
 
-            density_score = min(1.0, len(words) / max(20.0, duration * 2.7))
-
-            unique_words = len(set(w.lower().strip(".,!?\"'()[]{}") for w in words if w.strip()))
-            clarity_score = min(1.0, unique_words / max(12.0, len(words) * 0.55))
+            density_score = min(1.0, word_total / max(20.0, duration * 2.7))
+            clarity_score = min(1.0, len(token_counts) / max(12.0, word_total * 0.55))
 
             score = (
                 0.45 * hook_score +
@@ -721,52 +1024,30 @@ def rank_moments_from_transcript(
             )
 
             clip_start, clip_end = clamp_clip_window(start, end, float(total_duration))
-
-            reason_parts = []
-            if hook_score >= 0.8:
-                reason_parts.append("strong hook words")
-            if density_score >= 0.7:
-                reason_parts.append("dense speech")
-            if clarity_score >= 0.7:
-                reason_parts.append("clear spoken content")
-            if matched_keywords:
-                reason_parts.append("matched high-interest keywords")
-
-            preview = text[:220]
-            item = {
+            windows.append({
                 "start_sec": clip_start,
                 "end_sec": clip_end,
-                "hook_score": round(hook_score, 3),
-                "payoff_score": round(clarity_score, 3),
                 "clip_score": round(score, 3),
-                "speech_density": round(density_score, 3),
-                "segment_count": len(chunk),
-                "matched_keywords": matched_keywords[:8],
-                "transcript_preview": preview,
-                "reason": ", ".join(reason_parts) if reason_parts else "general transcript strength",
-                "title": (text[:80] + "...") if len(text) > 80 else text,
-            }
-            item["hook_line"] = build_hook_line(preview)
-            item["viral_title"] = build_viral_title(preview, item["matched_keywords"])
-            item["thumbnail_text"] = build_thumbnail_text(preview, item["matched_keywords"])
-            item["editor_notes"] = build_editor_notes(item)
-            item["hashtags"] = build_hashtags(item)
-            windows.append(item)
+                "hook_score": hook_score,
+                "density_score": density_score,
+                "clarity_score": clarity_score,
+                "matched_keywords": matched_keywords,
+                "segment_count": members,
+                "members": range(lo, hi) if contiguous else [i for i in range(lo, hi) if not left[i]],
+            })
 
         start += step
 
     windows.sort(key=lambda x: x["clip_score"], reverse=True)
 
     picked: list[dict[str, Any]] = []
+    picked_spans: list[tuple[float, float]] = []
     for cand in windows:
-        overlaps = False
-        for chosen in picked:
-            if not (cand["end_sec"] <= chosen["start_sec"] or cand["start_sec"] >= chosen["end_sec"]):
-                overlaps = True
-                break
-        if overlaps:
+        if _overlaps_picked(picked_spans, cand["start_sec"], cand["end_sec"]):
             continue
-        picked.append(cand)
+        bisect.insort(picked_spans, (cand["start_sec"], cand["end_sec"]))
+        text = " ".join(idx["texts"][i] for i in cand["members"]).strip()
+        picked.append(_build_moment_item(cand, text))
         if len(picked) >= target_count:
             break
 
@@ -779,22 +1060,48 @@ def rank_moments_from_transcript(
 
 def render_vertical_clip(src: Path, dst: Path, start: float, end: float) -> None:
     dur = max(1.0, end - start)
-    vf = "scale=1080:1920:force_original_aspect_ratio=increase,crop=1080:1920"
-    run([
+    profile = resolve_profile(SHORTS_RENDER_PROFILE)
+    cmd = [
         "ffmpeg", "-y",
         "-ss", str(start),
         "-i", str(src),
         "-t", str(dur),
-        "-vf", vf,
-        "-r", "30",
-        "-c:v", "libx264",
-        "-preset", "veryfast",
-        "-crf", "23",
-        "-c:a", "aac",
-        "-b:a", "192k",
+        "-vf", geometry_filter(profile, fit="crop"),
+    ]
+    af = audio_filter(profile)
+    if af:
+        cmd += ["-af", af]
+    run(cmd + encode_args(profile) + [str(dst)])
+
+
+def render_preview_clip(src: Path, dst: Path, start: float, end: float) -> float:
+    """Stream-copy a review preview starting at the keyframe at or before ``start``.
+
+    Returns the start actually cut so captions can be timed against it. The
+    scaled, captioned encode is left for the clips that are kept; it is also the
+    fallback when the copy fails or comes out empty (e.g. a codec mp4 cannot hold).
+    """
+    try:
+        cut_start = snap_to_keyframe(src, start)
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        render_vertical_clip(src, dst, start, end)
+        return start
+    r = subprocess.run([
+        "ffmpeg", "-y",
+        "-ss", f"{cut_start:.3f}",
+        "-i", str(src),
+        "-t", f"{max(0.1, end - cut_start):.3f}",
+        "-map", "0:v:0",
+        "-map", "0:a?",
+        "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        "-movflags", "+faststart",
         str(dst),
     ])
-
+    if r.returncode != 0 or not dst.exists() or dst.stat().st_size == 0:
+        render_vertical_clip(src, dst, start, end)
+        return start
+    return cut_start
 
 
 def fmt_srt_time(sec: float) -> str:
@@ -892,7 +1199,65 @@ def burn_subtitles(src_mp4: Path, src_srt: Path, out_mp4: Path) -> bool:
     return out_mp4.exists()
 
 
-def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUNT, prompt: str = "") -> dict[str, Any]:
+def early_render_candidates(
+    transcript_data: dict[str, Any],
+    covered_until: float,
+    target_count: int,
+) -> list[dict[str, Any]]:
+    # Full-length windows that end inside the transcribed prefix score the same
+    # once the rest of the source is transcribed, so they are safe to render early.
+    out = []
+    for m in rank_moments_from_transcript(transcript_data, covered_until, target_count):
+        if m["clip_score"] < SHORTS_STREAM_RENDER_MIN_SCORE:
+            continue
+        if round(float(m["end_sec"]) - float(m["start_sec"]), 2) != SHORTS_MAX_CLIP_SEC:
+            continue
+        out.append(m)
+    return out
+
+
+def render_clip_to_cache(src: Path, source_url: str, start_sec: float, end_sec: float) -> Path:
+    cache = cached_clip_path(source_url, start_sec, end_sec)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_name(cache.stem + ".part.mp4")
+    render_vertical_clip(src, tmp, start_sec, end_sec)
+    tmp.replace(cache)
+    return cache
+
+
+def transcribe_with_early_renders(
+    src: Path,
+    workdir: Path,
+    source_url: str,
+    total_duration: float,
+    target_count: int,
+) -> tuple[dict[str, Any], int]:
+    submitted: dict[Path, Future] = {}
+
+    with ThreadPoolExecutor(max_workers=SHORTS_STREAM_RENDER_WORKERS) as render_pool:
+        def on_chunk(partial: dict[str, Any], covered_until: float) -> None:
+            for m in early_render_candidates(partial, covered_until, target_count):
+                if len(submitted) >= target_count:
+                    return
+                start_sec, end_sec = float(m["start_sec"]), float(m["end_sec"])
+                cache = cached_clip_path(source_url, start_sec, end_sec)
+                if cache in submitted or cache.exists():
+                    continue
+                submitted[cache] = render_pool.submit(render_clip_to_cache, src, source_url, start_sec, end_sec)
+
+        transcript_data = transcribe_streaming(src, workdir, total_duration, on_chunk)
+
+    # a failed early render is simply re-rendered by the main clip loop
+    rendered = sum(1 for f in submitted.values() if f.exception() is None)
+    return transcript_data, rendered
+
+
+def build_shorts(
+    source_url: str,
+    target_count: int = SHORTS_DEFAULT_TARGET_COUNT,
+    prompt: str = "",
+    preview: bool = False,
+) -> dict[str, Any]:
     job = job_dir("shorts")
     jid = job.name
 
@@ -910,13 +1275,23 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
 
     cache_hit_transcript = False
     cache_hit_rankings = False
+    stream_transcribe = False
+    early_renders = 0
 
     if transcript_cache.exists():
         transcript_data = json.loads(transcript_cache.read_text(encoding="utf-8"))
         cache_hit_transcript = True
+    elif total_duration >= SHORTS_STREAM_MIN_SOURCE_SEC and SHORTS_TRANSCRIBE_WORKERS <= 1 and not preview:
+        transcript_data, early_renders = transcribe_with_early_renders(
+            src, job / "source", source_url, total_duration, target_count
+        )
+        transcript_data["source_duration_sec"] = total_duration
+        stream_transcribe = True
+        transcript_cache.parent.mkdir(parents=True, exist_ok=True)
+        transcript_cache.write_text(json.dumps(transcript_data, indent=2), encoding="utf-8")
     else:
         extract_audio(src, wav)
-        transcript_data = transcribe_audio(wav)
+        transcript_data = transcribe_audio(wav, workers=SHORTS_TRANSCRIBE_WORKERS)
         transcript_data["source_duration_sec"] = total_duration
         transcript_cache.parent.mkdir(parents=True, exist_ok=True)
         transcript_cache.write_text(json.dumps(transcript_data, indent=2), encoding="utf-8")
@@ -943,6 +1318,12 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
         {"kind": "shorts_brief_md", "path": str(brief_md.relative_to(ROOT))},
     ]
 
+    thumbs = [job / "thumbnails" / f"clip_{i:02d}.png" for i in range(1, len(moments) + 1)]
+    thumb_results = render_thumbnails(src, [
+        (thumb, float(m["start_sec"]) + 0.5, str(m.get("thumbnail_text", "")))
+        for thumb, m in zip(thumbs, moments)
+    ])
+
     clips_generated = 0
     subtitle_files = 0
     for i, m in enumerate(moments, start=1):
@@ -953,16 +1334,21 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
         srt = job / "captions" / f"short_{i:02d}.srt"
         out_captioned = job / "renders" / f"short_{i:02d}.captioned.mp4"
 
-        clip_cache = cached_clip_path(source_url, clip_start, clip_end)
-        if clip_cache.exists():
-            out.parent.mkdir(parents=True, exist_ok=True)
-            out.write_bytes(clip_cache.read_bytes())
+        if preview:
+            cut_start = render_preview_clip(src, out, clip_start, clip_end)
+            m["preview_start_sec"] = round(cut_start, 3)
+            subtitle_count = write_srt_for_clip(transcript_data, cut_start, clip_end, srt)
         else:
-            render_vertical_clip(src, out, clip_start, clip_end)
-            clip_cache.parent.mkdir(parents=True, exist_ok=True)
-            clip_cache.write_bytes(out.read_bytes())
+            clip_cache = cached_clip_path(source_url, clip_start, clip_end)
+            if clip_cache.exists():
+                out.parent.mkdir(parents=True, exist_ok=True)
+                out.write_bytes(clip_cache.read_bytes())
+            else:
+                render_vertical_clip(src, out, clip_start, clip_end)
+                clip_cache.parent.mkdir(parents=True, exist_ok=True)
+                clip_cache.write_bytes(out.read_bytes())
 
-        subtitle_count = write_srt_for_clip(transcript_data, clip_start, clip_end, srt)
+            subtitle_count = write_srt_for_clip(transcript_data, clip_start, clip_end, srt)
 
         artifacts.append({"kind": "short_video", "path": str(out.relative_to(ROOT))})
         artifacts.append({"kind": "subtitle", "path": str(srt.relative_to(ROOT))})
@@ -974,12 +1360,11 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
         clip_meta = write_clip_metadata(job, m)
         artifacts.append({"kind": "clip_metadata", "path": str(clip_meta.relative_to(ROOT))})
 
-        thumb = job / "thumbnails" / f"clip_{i:02d}.png"
-        thumb_ok = render_thumbnail(src, thumb, clip_start + 0.5, str(m.get("thumbnail_text", "")))
-        if thumb_ok and thumb.exists():
+        thumb = thumbs[i - 1]
+        if thumb_results[i - 1] and thumb.exists():
             artifacts.append({"kind": "thumbnail", "path": str(thumb.relative_to(ROOT))})
 
-        if srt.exists() and srt.stat().st_size > 0:
+        if not preview and srt.exists() and srt.stat().st_size > 0:
             burned = burn_subtitles(out, srt, out_captioned)
             if burned and out_captioned.exists():
                 artifacts.append({"kind": "short_video_captioned", "path": str(out_captioned.relative_to(ROOT))})
@@ -990,6 +1375,7 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
     metrics = {
         "prompt": prompt,
         "prompt_keywords": prompt_keywords,
+        "preview_mode": preview,
         "critique_score": 0.0,
         "validation_passed": True,
         "clips_generated": clips_generated,
@@ -1002,6 +1388,8 @@ def build_shorts(source_url: str, target_count: int = SHORTS_DEFAULT_TARGET_COUN
         "cache_hit_transcript": cache_hit_transcript,
         "cache_hit_rankings": cache_hit_rankings,
         "cache_hit_audio_extract": not cache_hit_transcript,
+        "stream_transcribe": stream_transcribe,
+        "early_clip_renders": early_renders,
         "cache_clip_count": sum(
             1 for m in moments
             if cached_clip_path(source_url, float(m["start_sec"]), float(m["end_sec"])).exists()
@@ -1028,4 +1416,9 @@ def clip_cache_key(url: str, start_sec: float, end_sec: float) -> str:
     return f"{url_key(url)}_{int(round(start_sec * 100))}_{int(round(end_sec * 100))}"
 
 def cached_clip_path(url: str, start_sec: float, end_sec: float) -> Path:
-    return cache_dir() / "clips" / f"{clip_cache_key(url, start_sec, end_sec)}.mp4"
+    key = clip_cache_key(url, start_sec, end_sec)
+    profile = resolve_profile_name(SHORTS_RENDER_PROFILE)
+    if profile != SHORTS_RENDER_PROFILE:
+        # renders from other profiles (e.g. draft) must never stand in for the default
+        key = f"{key}_{profile}"
+    return cache_dir() / "clips" / f"{key}.mp4"
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+SAMPLE_RATE = 16000
+CHUNK_TARGET_SEC = 240.0
+CHUNK_MAX_OVERRUN = 1.5
+CHUNK_MIN_SILENCE_MS = 500
+# a segment repeats earlier text only if it mostly overlaps it in time and says the same words
+BOUNDARY_DEDUP_MIN_OVERLAP = 0.5
+BOUNDARY_DEDUP_MIN_SIMILARITY = 0.6
+
+_worker_model = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int) -> None:
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(audio: Any, offset_sec: float) -> tuple[list[dict[str, Any]], str | None]:
+    segments, info = _worker_model.transcribe(audio, beam_size=5, vad_filter=True)
+    out = []
+    for seg in segments:
+        text = (seg.text or "").strip()
+        if not text:
+            continue
+        out.append({
+            "start": round(offset_sec + float(seg.start), 2),
+            "end": round(offset_sec + float(seg.end), 2),
+            "text": text,
+        })
+    return out, getattr(info, "language", None)
+
+
+def speech_regions(audio: Any) -> list[tuple[float, float]]:
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    opts = VadOptions(min_silence_duration_ms=CHUNK_MIN_SILENCE_MS)
+    return [
+        (ts["start"] / SAMPLE_RATE, ts["end"] / SAMPLE_RATE)
+        for ts in get_speech_timestamps(audio, opts)
+    ]
+
+
+def plan_chunks(
+    speech: list[tuple[float, float]],
+    total_sec: float,
+    target_sec: float = CHUNK_TARGET_SEC,
+) -> list[tuple[float, float]]:
+    """Split ``[0, total_sec)`` into roughly ``target_sec`` chunks.
+
+    Cuts are placed in the middle of a silence gap between two speech regions.
+    Only when speech runs on for ``target_sec * CHUNK_MAX_OVERRUN`` without a
+    gap is a chunk cut hard at ``target_sec``.
+    """
+    hard_limit = target_sec * CHUNK_MAX_OVERRUN
+    bounds: list[tuple[float, float]] = []
+    chunk_start = 0.0
+
+    gaps = [(a[1] + b[0]) / 2.0 for a, b in zip(speech, speech[1:])]
+    for cut in gaps + [float(total_sec)]:
+        while cut - chunk_start > hard_limit:
+            bounds.append((chunk_start, chunk_start + target_sec))
+            chunk_start += target_sec
+        if cut - chunk_start >= target_sec and cut < float(total_sec):
+            bounds.append((chunk_start, cut))
+            chunk_start = cut
+
+    if chunk_start < float(total_sec):
+        bounds.append((chunk_start, float(total_sec)))
+    return bounds
+
+
+def _norm_text(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9']+", (text or "").lower()))
+
+
+def _token_containment(kept: str, seg: str) -> float:
+    toks = _norm_text(seg).split()
+    if not toks:
+        return 1.0
+    have = set(_norm_text(kept).split())
+    return sum(1 for t in toks if t in have) / len(toks)
+
+
+def append_chunk_segments(out: list[dict[str, Any]], segs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Append one chunk's segments to the merged, time-ordered ``out``.
+
+    Chunks may overlap (or Whisper may run a segment past a cut), so a segment
+    that mostly overlaps earlier chunks' segments in time and repeats their words
+    is dropped; any other overlap is trimmed off its start. Segments that do not
+    overlap in time are always kept, however short or repetitive.
+    """
+    floor = len(out)
+    for seg in segs:
+        seg = dict(seg)
+        if floor and seg["start"] < out[floor - 1]["end"]:
+            k = floor
+            while k > 0 and out[k - 1]["end"] > seg["start"]:
+                k -= 1
+            overlap = sum(
+                max(0.0, min(seg["end"], o["end"]) - max(seg["start"], o["start"])) for o in out[k:floor]
+            )
+            dur = max(seg["end"] - seg["start"], 1e-6)
+            kept = " ".join(o["text"] for o in out[k:floor])
+            if overlap / dur >= BOUNDARY_DEDUP_MIN_OVERLAP and _token_containment(kept, seg["text"]) >= BOUNDARY_DEDUP_MIN_SIMILARITY:
+                continue
+        if out and seg["start"] < out[-1]["end"]:
+            seg["start"] = out[-1]["end"]
+            if seg["end"] <= seg["start"]:
+                continue
+        out.append(seg)
+    return out
+
+
+def merge_chunk_segments(chunks: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for segs in chunks:
+        append_chunk_segments(out, segs)
+    return out
+
+
+def transcribe_parallel(
+    wav: Path,
+    workers: int,
+    chunk_sec: float = CHUNK_TARGET_SEC,
+    model_size: str = "base",
+    compute_type: str = "int8",
+) -> dict[str, Any]:
+    from faster_whisper.audio import decode_audio
+
+    t0 = time.time()
+    audio = decode_audio(str(wav), sampling_rate=SAMPLE_RATE)
+    total_sec = len(audio) / SAMPLE_RATE
+    bounds = plan_chunks(speech_regions(audio), total_sec, chunk_sec)
+
+    workers = max(1, min(int(workers), len(bounds)))
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # spawn, not fork: CTranslate2 thread pools do not survive a fork
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_size, compute_type, cpu_threads),
+    ) as pool:
+        futures = [
+            pool.submit(
+                _transcribe_chunk,
+                audio[int(a * SAMPLE_RATE):int(b * SAMPLE_RATE)],
+                a,
+            )
+            for a, b in bounds
+        ]
+        results = [f.result() for f in futures]
+
+    out_segments = merge_chunk_segments([segs for segs, _ in results])
+    language = next((lang for _, lang in results if lang), None)
+
+    return {
+        "text": " ".join(s["text"] for s in out_segments).strip(),
+        "segments": out_segments,
+        "language": language,
+        "duration_sec": out_segments[-1]["end"] if out_segments else 0.0,
+        "transcribe_elapsed_sec": round(time.time() - t0, 2),
+        "transcribe_chunks": len(bounds),
+        "transcribe_workers": workers,
+    }
@@ -0,0 +1,62 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+ROOT="$(pwd)"
+
+# usage: scripts/bench_moment_scorer.sh [quality.db]
+# without a db, a throwaway one is filled with synthetic reviews so the train/report path still runs
+# env: N (candidates to score, default 20000)
+TMP="$(mktemp -d)"
+trap 'rm -rf "$TMP"' EXIT
+DB="${1:-}"
+if [ -z "$DB" ]; then
+  (cd "$TMP" && python3 "$ROOT/shortforge/eval/init_eval.py" >/dev/null)
+  DB="$TMP/shortforge/data/quality.db"
+  DB="$DB" python3 - <<'PY'
+import os, random, sqlite3
+rng = random.Random(3)
+lines = [
+    "why nobody found the secret exit until the last minute!",
+    "so we finally won the match after 3 tries",
+    "you will never guess how this ended?",
+    "then we walked back to the base and sorted the chests",
+    "this is the biggest mistake you can make in the nether",
+    "we talked about the settings for a while",
+]
+conn = sqlite3.connect(os.environ["DB"])
+for run in range(40):
+    for i in range(8):
+        text = " ".join(rng.sample(lines, 2))
+        score = 3 + 2 * text.count("!") + 2 * text.count("?") + 1.5 * ("you" in text.split()) + rng.uniform(-1, 1)
+        conn.execute("INSERT INTO clip_reviews (run_id, clip_index, transcript, overall_score) VALUES (?, ?, ?, ?)",
+                     (f"run{run}", i, text, round(score, 2)))
+conn.commit()
+PY
+fi
+
+N="${N:-20000}" DB="$DB" MODEL="$TMP/moment_scorer.json" python3 - <<'PY'
+import json, os, random, time
+from pathlib import Path
+from api.app.moment_ranker import Segment
+from api.app.moment_scorer import HeuristicScorer, LinearScorer, load_reviews, ranking_report, train_linear
+
+reviews = load_reviews(Path(os.environ["DB"]))
+model = train_linear(reviews)
+Path(os.environ["MODEL"]).write_text(json.dumps(model), encoding="utf-8")
+print("ranking:", json.dumps(ranking_report(reviews, Path(os.environ["MODEL"]))))
+
+rng = random.Random(5)
+words = [r["text"] for r in reviews] or ["why this changed everything"]
+segs, t = [], 0.0
+for _ in range(int(os.environ["N"])):
+    dur = rng.uniform(0.5, 9.0)
+    segs.append(Segment(t, t + dur, rng.choice(words)))
+    t += dur
+for scorer in (HeuristicScorer(), LinearScorer(model)):
+    t0 = time.perf_counter()
+    scores = scorer.score_segments(segs, "minecraft nether", t)
+    dt = time.perf_counter() - t0
+    assert len(scores) == len(segs)
+    print(f"{scorer.name}: {len(segs) / dt:,.0f} candidates/sec ({dt:.3f}s for {len(segs)})")
+print("BENCH_MOMENT_SCORER_OK")
+PY
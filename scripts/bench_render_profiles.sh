@@ -0,0 +1,51 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+
+# usage: scripts/bench_render_profiles.sh [source.mp4]
+# env: PROFILES (comma list, default all), BASELINE (default vertical_clip)
+SRC="${1:-tests/fixtures/shorts/sample.mp4}" \
+PROFILES="${PROFILES:-}" \
+BASELINE="${BASELINE:-vertical_clip}" \
+"${PYTHON:-python3}" - <<'PY'
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from api.app.shorts.media_probe import probe_duration
+from api.app.shorts.render_profiles import RENDER_PROFILES, audio_filter, encode_args, geometry_filter, get_profile
+
+src = Path(os.environ["SRC"])
+names = [n for n in os.environ["PROFILES"].split(",") if n] or list(RENDER_PROFILES)
+baseline = os.environ["BASELINE"]
+if baseline not in names:
+    names.insert(0, baseline)
+
+dur = probe_duration(src)
+results = {}
+with tempfile.TemporaryDirectory(prefix="bench_render_") as td:
+    for name in names:
+        profile = get_profile(name)
+        out = Path(td) / f"{name}.mp4"
+        cmd = ["ffmpeg", "-y", "-v", "error", "-i", str(src), "-vf", geometry_filter(profile, fit="crop")]
+        if audio_filter(profile):
+            cmd += ["-af", audio_filter(profile)]
+        cmd += encode_args(profile) + [str(out)]
+
+        t0 = time.time()
+        subprocess.run(cmd, check=True)
+        sec = time.time() - t0
+        results[name] = (sec, dur * profile["fps"] / sec, out.stat().st_size)
+
+print(f"source  {src}  ({dur:.1f}s)")
+print(f"{'profile':<14} {'frame':>10} {'wall_s':>8} {'enc_fps':>8} {'vs_' + baseline:>18} {'MB':>6}")
+base_sec = results[baseline][0]
+for name in names:
+    sec, fps, size = results[name]
+    p = get_profile(name)
+    frame = f"{p['width']}x{p['height']}"
+    print(f"{name:<14} {frame:>10} {sec:>8.2f} {fps:>8.1f} {base_sec / sec:>17.2f}x {size / 1e6:>6.2f}")
+print("BENCH_RENDER_PROFILES_OK")
+PY
@@ -0,0 +1,65 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+
+# usage: scripts/bench_shorts_transcribe.sh [source.mp4]
+# env: WORKERS (default 2), CHUNK_SEC (default 4 so the 12s fixture still splits)
+SRC="${1:-tests/fixtures/shorts/sample.mp4}" \
+WORKERS="${WORKERS:-2}" \
+CHUNK_SEC="${CHUNK_SEC:-4}" \
+"${PYTHON:-python3}" - <<'PY'
+import difflib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from api.app.shorts.service import extract_audio, transcribe_audio
+from api.app.shorts.transcribe_parallel import transcribe_parallel
+
+src = Path(os.environ["SRC"])
+workers = int(os.environ["WORKERS"])
+chunk_sec = float(os.environ["CHUNK_SEC"])
+
+with tempfile.TemporaryDirectory(prefix="bench_transcribe_") as td:
+    wav = Path(td) / "audio.wav"
+    extract_audio(src, wav)
+
+    t0 = time.time()
+    single = transcribe_audio(wav)
+    single_sec = time.time() - t0
+
+    t0 = time.time()
+    chunked = transcribe_parallel(wav, workers, chunk_sec=chunk_sec)
+    chunked_sec = time.time() - t0
+
+def iou(a, b):
+    inter = max(0.0, min(a["end"], b["end"]) - max(a["start"], b["start"]))
+    union = max(a["end"], b["end"]) - min(a["start"], b["start"])
+    return inter / union if union > 0 else 0.0
+
+matched = 0
+ious = []
+for ref in single["segments"]:
+    best = max(chunked["segments"], key=lambda c: iou(ref, c), default=None)
+    if best is None:
+        ious.append(0.0)
+        continue
+    ious.append(iou(ref, best))
+    ratio = difflib.SequenceMatcher(None, ref["text"].lower(), best["text"].lower()).ratio()
+    if ious[-1] >= 0.5 and ratio >= 0.8:
+        matched += 1
+
+ref_words = single["text"].lower().split()
+got_words = chunked["text"].lower().split()
+word_agreement = difflib.SequenceMatcher(None, ref_words, got_words).ratio() if ref_words else 1.0
+
+print(f"source            {src}")
+print(f"single_pass_sec   {single_sec:.2f}  segments={len(single['segments'])}")
+print(f"chunked_sec       {chunked_sec:.2f}  segments={len(chunked['segments'])} chunks={chunked['transcribe_chunks']} workers={chunked['transcribe_workers']}")
+print(f"speedup           {single_sec / max(chunked_sec, 1e-6):.2f}x")
+print(f"segment_match     {matched}/{len(single['segments'])}")
+print(f"mean_segment_iou  {sum(ious) / max(1, len(ious)):.3f}")
+print(f"word_agreement    {word_agreement:.3f}")
+print("BENCH_SHORTS_TRANSCRIBE_OK")
+PY
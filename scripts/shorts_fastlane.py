@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
 import json
 import os
 import re
 import subprocess
 import sys
+import urllib.parse
 import urllib.request
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.app.shorts.media_probe import probe_duration
+from api.app.shorts.render_profiles import audio_filter, encode_args, geometry_filter, resolve_profile, resolve_profile_name
+
 API_LATEST = os.environ.get("MYTHIQ_REVIEW_API", "http://127.0.0.1:8788/api/latest")
+API_BASE = os.environ.get("MYTHIQ_REVIEW_API_BASE", API_LATEST.rsplit("/", 1)[0])
+# global cap on concurrent ffmpeg renders across every job in a batch
+FASTLANE_WORKERS = int(os.environ.get("MYTHIQ_FASTLANE_WORKERS", "0") or 0)
 BASE_MEDIA = os.environ.get("MYTHIQ_REVIEW_BASE", "http://127.0.0.1:8788")
 DEFAULT_CREATORS = [x.strip() for x in os.environ.get(
     "MYTHIQ_CREATORS",
@@ -42,10 +55,19 @@ def sh(cmd: list[str]) -> None:
     print("+", " ".join(cmd))
     subprocess.run(cmd, check=True)
 
-def load_latest() -> dict[str, Any]:
-    with urllib.request.urlopen(API_LATEST) as r:
+def _get_json(url: str) -> dict[str, Any]:
+    with urllib.request.urlopen(url) as r:
         return json.loads(r.read().decode("utf-8"))
 
+def load_latest() -> dict[str, Any]:
+    return _get_json(API_LATEST)
+
+def load_job(job_id: str) -> dict[str, Any]:
+    return _get_json(f"{API_BASE}/job/{urllib.parse.quote(job_id)}")
+
+def list_jobs() -> list[dict[str, Any]]:
+    return _get_json(f"{API_BASE}/jobs").get("jobs") or []
+
 def url_to_local_path(url_or_path: str) -> Path:
     s = url_or_path
     if s.startswith("http://") or s.startswith("https://"):
@@ -62,36 +84,27 @@ def safe_text(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "")).strip()
 
 def ffprobe_duration(path: Path) -> float:
-    out = subprocess.check_output([
-        "ffprobe", "-v", "error", "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1", str(path)
-    ]).decode("utf-8", errors="ignore").strip()
-    return float(out or "0")
+    return probe_duration(path)
 
 def build_fast_clip(src: Path, dst: Path, speed: float = 1.05, max_len: float = 18.0) -> None:
     dur = ffprobe_duration(src)
     keep = min(dur, max_len)
+    profile = resolve_profile("fastlane")
     vf = (
         f"trim=0:{keep},"
         f"setpts=PTS/{speed},"
-        f"scale=1080:1920:force_original_aspect_ratio=increase,"
-        f"crop=1080:1920,"
-        f"unsharp=5:5:0.8:3:3:0.4,"
-        f"fps=30"
+        f"{geometry_filter(profile, fit='crop')},"
+        f"unsharp=5:5:0.8:3:3:0.4"
     )
-    af = f"atrim=0:{keep},atempo={speed},loudnorm=I=-14:TP=-1.5:LRA=11"
+    af = f"atrim=0:{keep},atempo={speed}"
+    if audio_filter(profile):
+        af += "," + audio_filter(profile)
     sh([
         "ffmpeg", "-y",
         "-i", str(src),
         "-vf", vf,
         "-af", af,
-        "-movflags", "+faststart",
-        "-pix_fmt", "yuv420p",
-        "-c:v", "libx264",
-        "-preset", "veryfast",
-        "-crf", "21",
-        "-c:a", "aac",
-        "-b:a", "192k",
+        *encode_args(profile),
         str(dst),
     ])
 
@@ -233,29 +246,61 @@ def score_clip(title: str, topic: str, creator: str) -> float:
         score += 4
     return round(score, 2)
 
-def main() -> int:
-    data = load_latest()
-    if not data.get("ok"):
-        print("latest payload not ok", file=sys.stderr)
-        return 1
+def job_out_root(job_id: str) -> Path:
+    return Path.cwd() / "artifacts" / job_id / "fastlane"
 
+def pending_job_ids() -> list[str]:
+    """Jobs whose fastlane ranking is missing or older than the job's package manifest."""
+    out = []
+    for job in list_jobs():
+        ranking = job_out_root(job["job_id"]) / "meta" / "ranking.json"
+        if not ranking.exists() or ranking.stat().st_mtime < float(job.get("updated_at") or 0):
+            out.append(job["job_id"])
+    return out
+
+def render_stamp() -> str:
+    """What a fast clip was rendered with; a render made under another profile is stale."""
+    name = resolve_profile_name("fastlane")
+    return json.dumps({"profile": name, "settings": resolve_profile("fastlane")}, sort_keys=True)
+
+def stamp_path(dst: Path) -> Path:
+    return dst.with_name(dst.name + ".stamp")
+
+def is_fresh(src: Path, dst: Path, stamp: str) -> bool:
+    try:
+        if dst.stat().st_mtime < src.stat().st_mtime:
+            return False
+        return stamp_path(dst).read_text(encoding="utf-8") == stamp
+    except OSError:
+        return False
+
+def render_task(src: str, dst: str, stamp: str) -> str:
+    """Pool entry point: render into a temp name so an interrupted run never looks fresh.
+
+    The stamp is written last, so a clip only counts as fresh once it is in place.
+    """
+    final = Path(dst)
+    part = final.with_name(final.stem + ".part" + final.suffix)
+    stamp_path(final).unlink(missing_ok=True)
+    build_fast_clip(Path(src), part, speed=1.05, max_len=18.0)
+    part.replace(final)
+    stamp_path(final).write_text(stamp, encoding="utf-8")
+    return dst
+
+def prepare_job(data: dict[str, Any]) -> tuple[Path, list[dict[str, Any]]]:
+    """Titles, captions and scores for every clip of one review payload (no rendering)."""
     job_id = data.get("job_id", "unknown_job")
-    clips = data.get("clips") or []
-    if not clips:
-        print("no clips in latest payload", file=sys.stderr)
-        return 1
-
-    out_root = Path.cwd() / "artifacts" / job_id / "fastlane"
+    out_root = job_out_root(job_id)
     renders = out_root / "renders"
     meta = out_root / "meta"
     renders.mkdir(parents=True, exist_ok=True)
     meta.mkdir(parents=True, exist_ok=True)
 
-    ranking = []
+    rows = []
     creators = DEFAULT_CREATORS[:]
     series = SERIES_DEFAULT
 
-    for i, clip in enumerate(clips, start=1):
+    for i, clip in enumerate(data.get("clips") or [], start=1):
         source_url = clip.get("captioned_video_url") or clip.get("video_url")
         if not source_url:
             continue
@@ -281,7 +326,6 @@ def main() -> int:
         score = score_clip(new_title, topic, creator)
 
         dst = renders / f"short_{i:02d}_fast.mp4"
-        build_fast_clip(src, dst, speed=1.05, max_len=18.0)
 
         (meta / f"short_{i:02d}.title.txt").write_text(new_title + "\n", encoding="utf-8")
         (meta / f"short_{i:02d}.caption.txt").write_text(caption + "\n", encoding="utf-8")
@@ -291,7 +335,8 @@ def main() -> int:
             encoding="utf-8"
         )
 
-        ranking.append({
+        rows.append({
+            "job_id": job_id,
             "index": i,
             "creator": creator,
             "topic": topic,
@@ -301,13 +346,18 @@ def main() -> int:
             "source_video": str(src),
             "fast_video": str(dst),
         })
+    return out_root, rows
 
+def write_ranking(meta: Path, ranking: list[dict[str, Any]], heading: str = "Fastlane Shorts Pack", show_job: bool = False) -> None:
     ranking.sort(key=lambda x: x["score"], reverse=True)
+    meta.mkdir(parents=True, exist_ok=True)
     write_json(meta / "ranking.json", ranking)
 
-    md = ["# Fastlane Shorts Pack", ""]
+    md = [f"# {heading}", ""]
     for r in ranking:
         md.append(f"## {r['index']:02d} — {r['title']}")
+        if show_job:
+            md.append(f"- job: {r['job_id']}")
         md.append(f"- creator: {r['creator']}")
         md.append(f"- topic: {r['topic']}")
         md.append(f"- score: {r['score']}")
@@ -315,6 +365,82 @@ def main() -> int:
         md.append("")
     (meta / "ranking.md").write_text("\n".join(md) + "\n", encoding="utf-8")
 
+def render_all(rows: list[dict[str, Any]], workers: int, force: bool = False) -> list[dict[str, Any]]:
+    """Render every row's clip across one process pool; returns the rows whose render succeeded.
+
+    Clips whose output is already newer than the source and was rendered with the
+    current profile (MYTHIQ_RENDER_PROFILE) are skipped unless ``force``.
+    """
+    stamp = render_stamp()
+    todo = [r for r in rows if force or not is_fresh(Path(r["source_video"]), Path(r["fast_video"]), stamp)]
+    skipped = len(rows) - len(todo)
+    if skipped:
+        print(f"skip {skipped} up-to-date clip(s)")
+    failed = set()
+    if todo:
+        workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = {pool.submit(render_task, r["source_video"], r["fast_video"], stamp): r for r in todo}
+            for f, r in futures.items():
+                try:
+                    f.result()
+                except Exception as e:
+                    print(f"render failed: {r['source_video']}: {e}", file=sys.stderr)
+                    failed.add(r["fast_video"])
+    return [r for r in rows if r["fast_video"] not in failed]
+
+def run_batch(job_ids: list[str], workers: int, force: bool, out_dir: Path) -> int:
+    prepared = []
+    for job_id in job_ids:
+        data = load_job(job_id)
+        if not data.get("ok") or not data.get("clips"):
+            print(f"skip job {job_id}: no clips", file=sys.stderr)
+            continue
+        prepared.append(prepare_job(data))
+
+    all_rows = [r for _, rows in prepared for r in rows]
+    done = {r["fast_video"] for r in render_all(all_rows, workers, force)}
+
+    consolidated = []
+    for out_root, rows in prepared:
+        ok = [r for r in rows if r["fast_video"] in done]
+        write_ranking(out_root / "meta", ok)
+        consolidated.extend(ok)
+    write_ranking(out_dir, consolidated, heading="Fastlane Batch Ranking", show_job=True)
+
+    print(f"FASTLANE_BATCH_OK jobs={len(prepared)} clips={len(consolidated)} out={out_dir}")
+    return 0
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Re-title and fast-cut review clips (latest job by default).")
+    ap.add_argument("job_ids", nargs="*", help="batch mode: job ids to process")
+    ap.add_argument("--all-pending", action="store_true", help="batch mode: every job without an up-to-date ranking")
+    ap.add_argument("--workers", type=int, default=FASTLANE_WORKERS, help="concurrent renders across all jobs")
+    ap.add_argument("--force", action="store_true", help="re-render clips even when the output is up to date")
+    ap.add_argument("--out", default="artifacts/fastlane_batch", help="batch mode: consolidated ranking dir")
+    args = ap.parse_args()
+
+    if args.job_ids or args.all_pending:
+        job_ids = list(dict.fromkeys(args.job_ids + (pending_job_ids() if args.all_pending else [])))
+        if not job_ids:
+            print("no pending jobs")
+            return 0
+        return run_batch(job_ids, args.workers, args.force, Path(args.out))
+
+    data = load_latest()
+    if not data.get("ok"):
+        print("latest payload not ok", file=sys.stderr)
+        return 1
+
+    job_id = data.get("job_id", "unknown_job")
+    if not data.get("clips"):
+        print("no clips in latest payload", file=sys.stderr)
+        return 1
+
+    out_root, rows = prepare_job(data)
+    ranking = render_all(rows, args.workers, args.force)
+    write_ranking(out_root / "meta", ranking)
+
     print(f"FASTLANE_OK job_id={job_id} clips={len(ranking)} out={out_root}")
     return 0
 
@@ -5,22 +5,37 @@ import json
 import mimetypes
 import os
 import re
+import sys
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 
 ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
+from api.app.shorts.media_server import plan_file_response, send_file_range
 
-def latest_job_dir() -> Path | None:
+
+def job_dirs() -> list[Path]:
     base = ROOT / "artifacts"
     if not base.exists():
-        return None
+        return []
     jobs = [p for p in base.iterdir() if p.is_dir() and p.name.startswith("shorts_")]
-    if not jobs:
-        return None
     jobs.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return jobs[0]
+    return jobs
+
+
+def latest_job_dir() -> Path | None:
+    jobs = job_dirs()
+    return jobs[0] if jobs else None
+
+
+def job_dir(job_id: str) -> Path | None:
+    if not re.fullmatch(r"shorts_[A-Za-z0-9_.-]+", job_id or ""):
+        return None
+    p = ROOT / "artifacts" / job_id
+    return p if p.is_dir() else None
 
 
 def _read_json(path: Path, default):
@@ -95,8 +110,22 @@ def _build_clips_from_manifest(manifest: dict) -> list[dict]:
     return clips
 
 
-def build_payload():
-    latest = latest_job_dir()
+def list_jobs() -> list[dict]:
+    out = []
+    for job in job_dirs():
+        manifest_path = job / "brief" / "package_manifest.json"
+        if not manifest_path.exists():
+            continue
+        out.append({
+            "job_id": job.name,
+            "job_path": str(job.relative_to(ROOT)),
+            "updated_at": manifest_path.stat().st_mtime,
+        })
+    return out
+
+
+def build_payload(latest: Path | None = None):
+    latest = latest or latest_job_dir()
     if not latest:
         return {"ok": False, "clips": []}
 
@@ -277,75 +306,28 @@ class Handler(BaseHTTPRequestHandler):
         self.send_header("Content-Length", str(len(body)))
         self.send_header("Cache-Control", "no-store")
         self.end_headers()
+        if self.command == "HEAD":
+            return
         try:
             self.wfile.write(body)
         except (BrokenPipeError, ConnectionResetError, OSError):
             return
 
     def _send_file(self, fpath, content_type="application/octet-stream"):
-        size = fpath.stat().st_size
-        range_header = self.headers.get("Range", "").strip()
-
-        start = 0
-        end = size - 1
-        status = 200
-
-        if range_header.startswith("bytes="):
-            spec = range_header.split("=", 1)[1].strip()
-            if "," not in spec:
-                left, _, right = spec.partition("-")
-                try:
-                    if left and right:
-                        start = int(left)
-                        end = int(right)
-                    elif left:
-                        start = int(left)
-                        end = size - 1
-                    elif right:
-                        suffix = int(right)
-                        start = max(0, size - suffix)
-                        end = size - 1
-
-                    if start < 0:
-                        start = 0
-                    if end >= size:
-                        end = size - 1
-
-                    if start > end or start >= size:
-                        self.send_response(416)
-                        self.send_header("Content-Range", f"bytes */{size}")
-                        self.send_header("Accept-Ranges", "bytes")
-                        self.end_headers()
-                        return
-
-                    status = 206
-                except Exception:
-                    start = 0
-                    end = size - 1
-                    status = 200
-
-        length = end - start + 1
+        plan = plan_file_response(fpath, self.headers, content_type)
 
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(length))
-        self.send_header("Accept-Ranges", "bytes")
-        self.send_header("Cache-Control", "no-store")
-        if status == 206:
-            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_response(plan["status"])
+        for k, v in plan["headers"].items():
+            self.send_header(k, v)
+        # revalidate with If-None-Match instead of refetching every clip
+        self.send_header("Cache-Control", "no-cache")
         self.end_headers()
 
+        if self.command == "HEAD":
+            return
         try:
-            with open(fpath, "rb") as fh:
-                fh.seek(start)
-                remaining = length
-                chunk_size = 256 * 1024
-                while remaining > 0:
-                    chunk = fh.read(min(chunk_size, remaining))
-                    if not chunk:
-                        break
-                    self.wfile.write(chunk)
-                    remaining -= len(chunk)
+            self.wfile.flush()
+            send_file_range(self.connection, fpath, plan["start"], plan["length"])
         except (BrokenPipeError, ConnectionResetError, OSError):
             return
 
@@ -362,6 +344,20 @@ class Handler(BaseHTTPRequestHandler):
             self._send(200, "application/json; charset=utf-8", payload)
             return
 
+        if path == "/api/jobs":
+            payload = json.dumps({"ok": True, "jobs": list_jobs()}, indent=2).encode("utf-8")
+            self._send(200, "application/json; charset=utf-8", payload)
+            return
+
+        if path.startswith("/api/job/"):
+            job = job_dir(unquote(path[len("/api/job/"):]))
+            if job is None:
+                self._send(404, body=b"not found")
+                return
+            payload = json.dumps(build_payload(job), indent=2).encode("utf-8")
+            self._send(200, "application/json; charset=utf-8", payload)
+            return
+
         if path.startswith("/files/"):
             relpath = unquote(path[len("/files/"):]).lstrip("/")
             fpath = (ROOT / relpath).resolve()
@@ -384,6 +380,9 @@ class Handler(BaseHTTPRequestHandler):
 
         self._send(404, body=b"not found")
 
+    # same routes and headers; _send and _send_file skip the body
+    do_HEAD = do_GET
+
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8788"))
@@ -7,11 +7,20 @@ import os
 import re
 import shutil
 import subprocess
+import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.app.shorts.media_probe import probe_duration
+from api.app.shorts.render_profiles import audio_filter, encode_args, geometry_filter, resolve_profile
+
 # ---------- helpers ----------
 
 def run(cmd: list[str]) -> None:
@@ -39,13 +48,7 @@ def find_latest_final_metadata() -> Path:
     return max(cands, key=lambda p: p.stat().st_mtime)
 
 def ffprobe_duration(path: Path) -> float:
-    out = subprocess.check_output([
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(path)
-    ], text=True).strip()
-    return float(out)
+    return probe_duration(path)
 
 # ---------- transcript discovery ----------
 
@@ -281,36 +284,100 @@ def build_srt(beats: list[dict[str, Any]], out_path: Path) -> None:
 
 # ---------- ffmpeg rendering ----------
 
-def make_segment(src: Path, dst: Path, start: float, end: float) -> None:
+SUBTITLE_STYLE = "FontName=Arial,FontSize=14,PrimaryColour=&H00FFFFFF,OutlineColour=&H00000000,BorderStyle=3,Outline=2,Shadow=0,MarginV=110,Alignment=2"
+BEAT_WORKERS = int(os.environ.get("MYTHIQ_STORY_BEAT_WORKERS", "0") or 0)
+
+def subtitles_filter(srt_path: Path) -> str:
+    path = str(srt_path).replace(":", "\\:")
+    return f"subtitles={path}:force_style='{SUBTITLE_STYLE}'"
+
+def measure_loudnorm(src: Path, ranges: list[tuple[float, float]], target: str) -> dict[str, str] | None:
+    """First loudnorm pass over the beats' source audio joined in story order.
+
+    Returns the measured_* values loudnorm prints, or None when the measurement
+    fails (e.g. no audio stream).
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+    for start, end in ranges:
+        cmd += ["-ss", f"{start:.3f}", "-t", f"{max(0.3, end - start):.3f}", "-i", str(src)]
+    joined = "".join(f"[{i}:a:0]" for i in range(len(ranges)))
+    cmd += [
+        "-filter_complex", f"{joined}concat=n={len(ranges)}:v=0:a=1,loudnorm={target}:print_format=json",
+        "-vn", "-f", "null", "-",
+    ]
+    print("+", " ".join(cmd))
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    m = re.search(r"\{[^{}]*\"input_i\"[^{}]*\}", proc.stderr)
+    if proc.returncode != 0 or not m:
+        return None
+    try:
+        stats = json.loads(m.group(0))
+        for k in ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset"):
+            if not math.isfinite(float(stats[k])):
+                return None
+    except Exception:
+        return None
+    return stats
+
+def loudnorm_second_pass(target: str, stats: dict[str, str]) -> str:
+    # linear mode with the story-wide measurement is a constant gain, so applying it
+    # beat by beat gives the same levels as normalizing the concatenated audio
+    return (
+        f"loudnorm={target}"
+        f":measured_I={stats['input_i']}:measured_TP={stats['input_tp']}"
+        f":measured_LRA={stats['input_lra']}:measured_thresh={stats['input_thresh']}"
+        f":offset={stats['target_offset']}:linear=true,aresample=48000"
+    )
+
+def make_segment(
+    src: Path,
+    dst: Path,
+    start: float,
+    end: float,
+    srt_path: Path | None = None,
+    af: str | None = None,
+) -> None:
+    """Encode one beat, burning ``srt_path`` (timed from the beat start) into it.
+
+    ``af`` replaces the profile's single-pass loudnorm, e.g. with the second
+    pass of a story-wide measurement.
+    """
     dur = max(0.3, end - start)
+    profile = resolve_profile("story_segment")
 
     vf = (
-        "scale=1080:1920:force_original_aspect_ratio=increase,"
-        "crop=1080:1920,"
+        geometry_filter(profile, fit="crop") + ","
         "eq=contrast=1.06:saturation=1.10:brightness=0.01,"
         "unsharp=5:5:0.6:5:5:0.0"
     )
+    if srt_path is not None:
+        vf += "," + subtitles_filter(srt_path)
 
-    af = "loudnorm=I=-16:TP=-1.5:LRA=9"
-
-    run([
+    cmd = [
         "ffmpeg", "-y",
         "-ss", f"{start:.3f}",
         "-t", f"{dur:.3f}",
         "-i", str(src),
         "-vf", vf,
-        "-af", af,
-        "-r", "30",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "19",
-        "-c:a", "aac",
-        "-b:a", "192k",
-        "-movflags", "+faststart",
-        str(dst),
-    ])
+    ]
+    af = af or audio_filter(profile)
+    if af:
+        cmd += ["-af", af]
+    run(cmd + encode_args(profile) + [str(dst)])
+
+def render_beats(src: Path, jobs: list[dict[str, Any]], af: str | None) -> None:
+    """Encode every beat in parallel; each ffmpeg gets an equal share of the cores."""
+    workers = BEAT_WORKERS or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(make_segment, src, job["piece"], job["start"], job["end"], job.get("srt"), af)
+            for job in jobs
+        ]
+        for f in futures:
+            f.result()
 
 def concat_mp4s(inputs: list[Path], out_path: Path, workdir: Path) -> None:
+    """Join beats encoded with identical settings; a pure stream copy, nothing is re-encoded."""
     list_file = workdir / "concat.txt"
     list_file.write_text("".join(f"file '{p.resolve()}'\n" for p in inputs), encoding="utf-8")
     run([
@@ -318,20 +385,6 @@ def concat_mp4s(inputs: list[Path], out_path: Path, workdir: Path) -> None:
         "-f", "concat", "-safe", "0",
         "-i", str(list_file),
         "-c", "copy",
-        str(out_path),
-    ])
-
-def burn_subtitles(src: Path, srt_path: Path, out_path: Path) -> None:
-    style = "FontName=Arial,FontSize=14,PrimaryColour=&H00FFFFFF,OutlineColour=&H00000000,BorderStyle=3,Outline=2,Shadow=0,MarginV=110,Alignment=2"
-    vf = f"subtitles={str(srt_path).replace(':', '\\:')}:force_style='{style}'"
-    run([
-        "ffmpeg", "-y",
-        "-i", str(src),
-        "-vf", vf,
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "18",
-        "-c:a", "copy",
         "-movflags", "+faststart",
         str(out_path),
     ])
@@ -393,7 +446,7 @@ def main() -> int:
 
         with tempfile.TemporaryDirectory(prefix=f"shorts_upgrade_{idx:02d}_") as td:
             td_path = Path(td)
-            pieces = []
+            jobs = []
             beat_rows = []
             out_cursor = 0.0
 
@@ -406,28 +459,40 @@ def main() -> int:
                 if e - s < 1.0:
                     e = min(total_dur, s + 1.0)
 
-                piece = td_path / f"piece_{n:02d}.mp4"
-                make_segment(original, piece, s, e)
-                pieces.append(piece)
-
-                beat_rows.append({
+                beat = {
                     "beat": n,
                     "src_start": s,
                     "src_end": e,
                     "out_start": out_cursor,
                     "out_end": out_cursor + (e - s),
                     "text": seg.text,
-                })
+                }
+                beat_rows.append(beat)
                 out_cursor += (e - s)
 
-            concat_path = td_path / "concat.mp4"
-            concat_mp4s(pieces, concat_path, td_path)
+                # captions for this beat alone, timed from the beat start
+                srt = td_path / f"piece_{n:02d}.srt"
+                build_srt([{**beat, "out_start": 0.0, "out_end": e - s}], srt)
+                jobs.append({
+                    "piece": td_path / f"piece_{n:02d}.mp4",
+                    "start": s,
+                    "end": e,
+                    "srt": srt if clean_text(seg.text) else None,
+                })
+
+            af = None
+            target = resolve_profile("story_segment").get("loudnorm")
+            if target:
+                stats = measure_loudnorm(original, [(j["start"], j["end"]) for j in jobs], target)
+                if stats:
+                    af = loudnorm_second_pass(target, stats)
+                else:
+                    print(f"WARN {idx:02d}: loudness measurement failed; using single-pass loudnorm per beat")
 
-            srt_path = td_path / "subs.srt"
-            build_srt(beat_rows, srt_path)
+            render_beats(original, jobs, af)
 
             polished = renders_dir / f"short_{idx:02d}_ultimate.mp4"
-            burn_subtitles(concat_path, srt_path, polished)
+            concat_mp4s([j["piece"] for j in jobs], polished, td_path)
 
             plan_rows.append({
                 "index": idx,
@@ -0,0 +1,59 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+
+TMP="$(mktemp -d)"
+mkdir -p "$TMP/job/transcript" "$TMP/cli"
+cp tests/fixtures/shorts/sample_transcript.json "$TMP/job/transcript/transcript.json"
+
+python3 api/app/moment_ranker.py "$TMP/job" --topic "secret" --out "$TMP/cli/candidates.json" >/dev/null
+python3 api/app/diversity_selector.py "$TMP/cli/candidates.json" --out "$TMP/cli/selected.json" --target-count 3 >/dev/null
+python3 api/app/edit_decision_engine.py "$TMP/cli/selected.json" --out "$TMP/cli/edit_plan.json" >/dev/null
+python3 api/app/shorts_quality_gate.py "$TMP/cli/edit_plan.json" --out "$TMP/cli/quality.json" >/dev/null
+
+python3 api/app/moment_pipeline.py "$TMP/job" --topic "secret" --target-count 3 --out-dir "$TMP/pipe" --write all >/dev/null
+
+python3 - <<'PY' "$TMP"
+import json, sys
+from pathlib import Path
+tmp = Path(sys.argv[1])
+for name in ("candidates", "selected", "edit_plan", "quality"):
+    a = json.loads((tmp / "cli" / f"{name}.json").read_text())
+    b = json.loads((tmp / "pipe" / f"{name}.json").read_text())
+    assert a == b, name
+rows = json.loads((tmp / "pipe" / "quality.json").read_text())
+assert rows and all("quality_score" in r and "edit" in r for r in rows), rows
+print("SMOKE_MOMENT_PIPELINE_OK", len(rows))
+PY
+
+# the learned scorer is opt-in, leaves the heuristic ``score`` alone, and a missing model is an error
+python3 - <<'PY' "$TMP"
+import json, random, sys
+from pathlib import Path
+from api.app.moment_scorer import train_linear
+rng = random.Random(3)
+lines = ["why nobody found the secret exit!", "so we finally won the match", "then we sorted the chests", "you will never guess?"]
+reviews = [{"run_id": f"r{i % 6}", "text": " ".join(rng.sample(lines, 2)), "relevance": rng.uniform(1, 10)} for i in range(48)]
+Path(sys.argv[1], "model.json").write_text(json.dumps(train_linear(reviews)), encoding="utf-8")
+PY
+python3 api/app/moment_ranker.py "$TMP/job" --topic "secret" --scorer learned --model "$TMP/model.json" --out "$TMP/cli/learned.json" 2>"$TMP/learned.err" >/dev/null
+grep -q "moment scorer: linear" "$TMP/learned.err"
+python3 api/app/moment_pipeline.py "$TMP/job" --topic "secret" --scorer learned --model "$TMP/model.json" --out-dir "$TMP/pipe_learned" --write candidates 2>/dev/null >/dev/null
+if python3 api/app/moment_ranker.py "$TMP/job" --scorer learned --model "$TMP/missing.json" >/dev/null 2>&1; then
+  echo "expected --scorer learned without a model to fail" >&2
+  exit 1
+fi
+python3 - <<'PY' "$TMP"
+import json, sys
+from pathlib import Path
+tmp = Path(sys.argv[1])
+heur = json.loads((tmp / "cli" / "candidates.json").read_text())
+learned = json.loads((tmp / "cli" / "learned.json").read_text())
+assert learned == json.loads((tmp / "pipe_learned" / "candidates.json").read_text())
+assert all(r["learned_score"] is None for r in heur)
+assert all(isinstance(r["learned_score"], float) for r in learned)
+key = lambda r: (r["start"], r["text"])
+assert {key(r): r["score"] for r in heur} == {key(r): r["score"] for r in learned}
+assert [r["learned_score"] for r in learned] == sorted((r["learned_score"] for r in learned), reverse=True)
+print("SMOKE_MOMENT_SCORER_CLI_OK", len(learned))
+PY
@@ -0,0 +1,88 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+
+# golden check: the batch scorer must give exactly the scores of score_segment,
+# on the pure-Python path and (when NumPy is installed) on the vectorized one
+python3 - <<'PY'
+import json, random, re
+from pathlib import Path
+from api.app import moment_ranker
+from api.app.moment_ranker import HOOK_WORDS, PAYOFF_WORDS, Segment, read_segments, score_segment, score_segments, tokenize
+
+fixtures = [read_segments(Path("tests/fixtures/shorts/sample_transcript.json"))]
+
+# lexicon words hidden inside other words (which must not count), punctuation, edge durations/positions
+tricky = [
+    "Somehow nobody understood the secret!",
+    "However the showdown was unfounded, so what?",
+    "Nevertheless they lost it because of a warning",
+    "finally revealed after the result was proved",
+    "minecraft speedrun world record diamonds",
+    "the end",
+    "a",
+]
+rng = random.Random(7)
+segs, t = [], 0.0
+for i in range(400):
+    dur = rng.choice([0.1, 0.2, 1.0, 2.5, 4.2, 4.3, 6.0, 6.5, 12.0])
+    words = rng.choice(tricky).split() + rng.sample(tricky[rng.randrange(len(tricky))].split(), 1)
+    segs.append(Segment(start=round(t, 3), end=round(t + dur, 3), text=" ".join(words)))
+    t += rng.choice([0.0, 0.7, 3.3])
+fixtures.append(segs)
+
+def run_all():
+    out = []
+    for segs in fixtures:
+        total = max(s.end for s in segs)
+        for topic in ("", "minecraft speedrun", "the secret end", "so how", "world-record diamonds!"):
+            want = [score_segment(s, topic, total) for s in segs]
+            got = score_segments(segs, topic, total)
+            assert got == want, (topic, [(w, g) for w, g in zip(want, got) if w != g][:5])
+            out.append(got)
+    return out
+
+real_np = moment_ranker.np
+moment_ranker.np = None
+try:
+    pure = run_all()
+finally:
+    moment_ranker.np = real_np
+
+if real_np is None:
+    print("SMOKE_MOMENT_SCORING_NUMPY_SKIP numpy not installed")
+else:
+    vec = run_all()
+    assert vec == pure, "numpy and pure-Python scores differ"
+# the old substring scorer: its scores still hold wherever no lexicon word sat inside another word
+def old_score_segment(seg, topic_hint, total_dur):
+    text = seg.text.lower()
+    score = 0.0
+    for t in set(tokenize(topic_hint)):
+        if t and t in text:
+            score += 2.5
+    score += sum(1.25 for w in HOOK_WORDS if w in text) + sum(1.0 for w in PAYOFF_WORDS if w in text)
+    dur = max(0.2, seg.end - seg.start)
+    score += 1.5 if 1.0 <= dur <= 4.2 else (0.5 if dur <= 6.0 else 0.0)
+    pos = seg.start / max(total_dur, 1.0)
+    score += 0.8 if pos <= 0.20 else (0.5 if pos <= 0.55 else 0.0)
+    score += 0.5 if ("!" in seg.text or "?" in seg.text) else 0.0
+    return score + (0.5 if len(seg.text.split()) >= 6 else 0.0)
+
+same = differ = 0
+for segs in fixtures:
+    total = max(s.end for s in segs)
+    for topic in ("", "minecraft speedrun", "so how"):
+        lexicon = set(tokenize(topic)) | HOOK_WORDS | PAYOFF_WORDS
+        for seg, got in zip(segs, score_segments(segs, topic, total)):
+            text = seg.text.lower()
+            words = set(re.findall(r"[a-z0-9]+", text))
+            if all((w in text) == (w in words) for w in lexicon):
+                assert got == old_score_segment(seg, topic, total), (seg, topic)
+                same += 1
+            else:
+                differ += 1
+assert same and differ, (same, differ)
+assert score_segments([Segment(0.0, 2.0, "somehow showdown")], "", 10.0) == [2.3]  # no "how"/"so"/"won"
+print("SMOKE_MOMENT_SCORING_OK", sum(len(s) for s in fixtures), "legacy_matches", same)
+PY
@@ -0,0 +1,73 @@
+#!/usr/bin/env bash
+set -euo pipefail
+cd "$(dirname "$0")/.."
+
+# the indexed sliding-window ranker must pick exactly what the original per-window rescan picked
+python3 - <<'PY'
+import random, re
+from api.app.shorts import service
+from api.app.shorts.service import (
+    SHORTS_HOOK_MARKERS, SHORTS_KEYWORD_BANK, SHORTS_MAX_CLIP_SEC, SHORTS_MIN_CLIP_SEC, SHORTS_STEP_SEC,
+    clamp_clip_window, rank_moments_from_transcript,
+)
+
+def reference(transcript_data, total_duration, target_count):
+    segments = transcript_data.get("segments") or []
+    windows, start = [], 0.0
+    while start < max(float(total_duration) - SHORTS_MIN_CLIP_SEC, 0.0) + SHORTS_STEP_SEC:
+        end = min(float(total_duration), start + SHORTS_MAX_CLIP_SEC)
+        chunk = [
+            seg for seg in segments
+            if not (float(seg.get("end", seg.get("start", 0.0))) <= start or float(seg.get("start", 0.0)) >= end)
+        ]
+        text = " ".join((seg.get("text") or "").strip() for seg in chunk).strip()
+        if text:
+            lower_text = text.lower()
+            words = [w for w in re.split(r"\s+", text) if w]
+            duration = max(1.0, end - start)
+            matched_keywords = [kw for kw in SHORTS_KEYWORD_BANK if kw in lower_text][:8]
+            hook_hits = sum(1 for h in SHORTS_HOOK_MARKERS if h in lower_text)
+            hook_score = min(1.0, 0.18 * hook_hits + 0.10 * len(matched_keywords))
+            density_score = min(1.0, len(words) / max(20.0, duration * 2.7))
+            unique_words = len(set(w.lower().strip(".,!?\"'()[]{}") for w in words if w.strip()))
+            clarity_score = min(1.0, unique_words / max(12.0, len(words) * 0.55))
+            score = 0.45 * hook_score + 0.30 * density_score + 0.25 * clarity_score
+            clip_start, clip_end = clamp_clip_window(start, end, float(total_duration))
+            windows.append({
+                "start_sec": clip_start, "end_sec": clip_end, "clip_score": round(score, 3),
+                "hook_score": round(hook_score, 3), "segment_count": len(chunk),
+                "matched_keywords": matched_keywords, "transcript_preview": text[:220],
+            })
+        start += SHORTS_STEP_SEC
+    windows.sort(key=lambda x: x["clip_score"], reverse=True)
+    picked = []
+    for cand in windows:
+        if any(not (cand["end_sec"] <= c["start_sec"] or cand["start_sec"] >= c["end_sec"]) for c in picked):
+            continue
+        picked.append(cand)
+        if len(picked) >= target_count:
+            break
+    return picked
+
+# words chosen so hook markers ("oh my god", "this is") straddle one, two or three segment joins
+vocab = ["oh", "my", "god", "this", "is", "what", "the", "secret", "run", "world", "we", "found", "it", "",
+         "oh my", "my god", "this is insane", "king", "lost", "and", "then", "escape!"]
+rng = random.Random(26)
+keys = ("start_sec", "end_sec", "clip_score", "hook_score", "segment_count", "matched_keywords", "transcript_preview")
+cases = 0
+for trial in range(120):
+    total = rng.choice([40.0, 95.0, 180.0, 400.0])
+    segs, t = [], 0.0
+    while t < total:
+        dur = rng.choice([0.0, 0.4, 1.5, 3.0, 7.0, 30.0])
+        segs.append({"start": round(t, 2), "end": round(t + dur, 2),
+                     "text": " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 4)))})
+        # mostly time-ordered speech, with some overlapping and nested segments
+        t += rng.choice([0.0, 0.3, 1.5, 3.0, dur])
+    for target in (3, 10):
+        want = [{k: w[k] for k in keys} for w in reference({"segments": segs}, total, target)]
+        got = [{k: g[k] for k in keys} for g in rank_moments_from_transcript({"segments": segs}, total, target)]
+        assert got == want, (trial, target, next((w, g) for w, g in zip(want, got) if w != g) if got and want else (want, got))
+        cases += 1
+print("SMOKE_SHORTS_RANKER_OK", cases)
+PY
@@ -49,20 +49,8 @@ else
 fi
 
 echo
-echo "== 3) rank moments =="
-python3 api/app/moment_ranker.py "$JOB" --topic "$TOPIC" --out "$JOB/meta/candidates.json"
-
-echo
-echo "== 4) select diverse top moments =="
-python3 api/app/diversity_selector.py "$JOB/meta/candidates.json" --out "$JOB/meta/selected.json" --target-count "$TARGET_COUNT"
-
-echo
-echo "== 5) build edit decisions =="
-python3 api/app/edit_decision_engine.py "$JOB/meta/selected.json" --out "$JOB/meta/edit_plan.json"
-
-echo
-echo "== 6) quality gate =="
-python3 api/app/shorts_quality_gate.py "$JOB/meta/edit_plan.json" --out "$JOB/meta/quality.json"
+echo "== 3-6) rank, select, edit decisions, quality gate =="
+python3 api/app/moment_pipeline.py "$JOB" --topic "$TOPIC" --target-count "$TARGET_COUNT" --out-dir "$JOB/meta" --write all
 
 echo
 echo "== 7) render actual shorts using existing local pipeline if available =="
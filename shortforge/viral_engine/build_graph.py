@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Union
+
+STATE_NAME = ".build_state.json"
+MISSING = "missing"
+
+@dataclass
+class Step:
+    """One build step of a moment project.
+
+    ``inputs``/``outputs`` are paths or glob patterns, relative to the project
+    dir unless absolute. The step is skipped while its command, the content of
+    every input and every recorded output are unchanged; an output glob that
+    matches nothing counts as missing. ``after`` names steps whose run (in the
+    same build) forces this one to run too, for upstream steps whose outputs
+    are not declared.
+    """
+    name: str
+    run: Union[list[str], Callable[[], object]]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    after: list[str] = field(default_factory=list)
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+class BuildGraph:
+    def __init__(self, base: Path, cwd: Path, env: dict[str, str] | None = None):
+        self.base = base
+        self.cwd = cwd
+        self.env = env
+        self.state_path = base / STATE_NAME
+        try:
+            self.state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except Exception:
+            self.state = {}
+        self.state.setdefault("steps", {})
+        self.state.setdefault("files", {})
+
+    def _key(self, p: Path) -> str:
+        try:
+            return str(p.relative_to(self.base))
+        except ValueError:
+            return str(p)
+
+    def expand(self, patterns: list[str]) -> list[Path]:
+        out: list[Path] = []
+        for pattern in patterns:
+            p = Path(pattern)
+            if not p.is_absolute():
+                p = self.base / p
+            if _is_glob(pattern):
+                out.extend(x for x in sorted(Path(p.anchor).glob(str(p.relative_to(p.anchor)))) if x.is_file())
+            else:
+                out.append(p)
+        return out
+
+    def file_hash(self, p: Path) -> str:
+        # content hash, reused while size and mtime match what was hashed last time
+        try:
+            st = p.stat()
+        except OSError:
+            return MISSING
+        key = self._key(p)
+        known = self.state["files"].get(key)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        h = hashlib.sha256()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.state["files"][key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, patterns: list[str]) -> dict[str, str]:
+        return {self._key(p): self.file_hash(p) for p in self.expand(patterns)}
+
+    def _command_id(self, step: Step) -> str:
+        return json.dumps(step.run) if isinstance(step.run, list) else f"{step.run.__module__}.{step.run.__qualname__}"
+
+    def stale_reason(self, step: Step, ran: list[str]) -> str | None:
+        rec = self.state["steps"].get(step.name)
+        if rec is None:
+            return "never built"
+        if rec.get("command") != self._command_id(step):
+            return "command changed"
+        if any(name in ran for name in step.after):
+            return "upstream step ran"
+        if rec.get("inputs") != self.fingerprint(step.inputs):
+            return "inputs changed"
+        if any(_is_glob(p) and not self.expand([p]) for p in step.outputs):
+            return "outputs missing"
+        outputs = self.fingerprint(step.outputs)
+        if MISSING in outputs.values() or rec.get("outputs") != outputs:
+            return "outputs changed or missing"
+        return None
+
+    def _check_scripts(self, step: Step) -> None:
+        # a stale step whose script is not on disk fails here, not with an opaque interpreter error
+        missing = [a for a in step.run if a.endswith(".py") and not (self.cwd / a).exists()]
+        if missing:
+            raise FileNotFoundError(f"step {step.name}: script not found: {', '.join(missing)}")
+
+    def _save(self) -> None:
+        tmp = self.state_path.with_name(f"{self.state_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def build(self, steps: list[Step], force: bool = False) -> list[str]:
+        """Run the steps in order, skipping the up-to-date ones; returns the names that ran."""
+        ran: list[str] = []
+        for step in steps:
+            reason = "forced" if force else self.stale_reason(step, ran)
+            if reason is None:
+                print(f"SKIP: {step.name} (up to date)")
+                continue
+            inputs = self.fingerprint(step.inputs)
+            # a failed step must not look built next time
+            self.state["steps"].pop(step.name, None)
+            self._save()
+            print(f"BUILD: {step.name} ({reason})")
+            if isinstance(step.run, list):
+                self._check_scripts(step)
+                print("RUN:", " ".join(step.run))
+                subprocess.run(step.run, cwd=self.cwd, env=self.env or os.environ.copy(), check=True)
+            else:
+                step.run()
+            self.state["steps"][step.name] = {
+                "command": self._command_id(step),
+                "inputs": inputs,
+                "outputs": self.fingerprint(step.outputs),
+            }
+            self._save()
+            ran.append(step.name)
+        return ran
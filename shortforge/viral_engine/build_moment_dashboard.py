@@ -1,9 +1,15 @@
 import json
 import os
 import shutil
-import zipfile
+import sys
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.app.core.zip_pack import pack_zip
+
 run_id = os.environ["RUN_ID"]
 base = Path.cwd() / "shortforge" / "projects" / run_id
 report = base / "reports" / "moment_proof_report.json"
@@ -35,14 +41,9 @@ for i, row in enumerate(top5, 1):
     dst = final_dir / f"{i:02d}_{row['name']}"
     shutil.copy2(src, dst)
 
-# build zip of top 5
+# build zip of top 5 (copy2 keeps mtimes, so unchanged clips are reused from the last zip)
 zip_path = base / "reports" / "sidemen_top5.zip"
-if zip_path.exists():
-    zip_path.unlink()
-
-with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-    for p in sorted(final_dir.glob("*.mp4")):
-        zf.write(p, arcname=p.name)
+pack_zip(zip_path, [(p, p.name) for p in sorted(final_dir.glob("*.mp4"))])
 
 cards = []
 for i, row in enumerate(rows, 1):
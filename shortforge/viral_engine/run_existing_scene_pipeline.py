@@ -2,25 +2,27 @@ from __future__ import annotations
 
 import argparse
 import os
-import subprocess
 import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from shortforge.viral_engine.build_graph import BuildGraph, Step
+
 PYTHON = ROOT / ".venv" / "bin" / "python"
+ENGINE = ROOT / "shortforge" / "viral_engine"
 
 def pyexe() -> str:
     if PYTHON.exists():
         return str(PYTHON)
     return sys.executable
 
-def run(cmd: list[str], env: dict[str, str]) -> None:
-    print("RUN:", " ".join(cmd))
-    subprocess.run(cmd, cwd=ROOT, env=env, check=True)
-
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--run-id", required=True)
+    ap.add_argument("--force", action="store_true", help="re-run every step even if its inputs are unchanged")
     args = ap.parse_args()
 
     env = os.environ.copy()
@@ -42,17 +44,39 @@ def main() -> int:
         print("SCENE:", p.name)
 
     py = pyexe()
-    cmds = [
-        [py, "shortforge/viral_engine/transcribe_moment_candidates.py"],
-        [py, "shortforge/viral_engine/build_moment_proof_plan.py"],
-        [py, "shortforge/viral_engine/build_moment_dashboard.py"],
-    ]
-
-    for cmd in cmds:
-        run(cmd, env)
-
     base = ROOT / "shortforge" / "projects" / args.run_id
     reports = base / "reports"
+    web = ROOT / "web" / "shorts_review"
+    steps = [
+        # transcribe_moment_candidates.py and build_moment_proof_plan.py are not in this
+        # tree, so where transcription writes is unknown: nothing is declared for it and the
+        # proof plan re-runs after it. Either step fails loudly if it has to run without its script.
+        Step(
+            "transcribe",
+            [py, "shortforge/viral_engine/transcribe_moment_candidates.py"],
+            inputs=[str(ENGINE / "transcribe_moment_candidates.py"), "scene_renders/*.mp4"],
+        ),
+        Step(
+            "proof_plan",
+            [py, "shortforge/viral_engine/build_moment_proof_plan.py"],
+            inputs=[str(ENGINE / "build_moment_proof_plan.py"), "scene_renders/*.mp4"],
+            outputs=["reports/moment_proof_report.json"],
+            after=["transcribe"],
+        ),
+        Step(
+            "dashboard",
+            [py, "shortforge/viral_engine/build_moment_dashboard.py"],
+            inputs=[str(ENGINE / "build_moment_dashboard.py"), "reports/moment_proof_report.json", "scene_renders/*.mp4"],
+            outputs=[
+                "final_selects/*.mp4",
+                "reports/sidemen_top5.zip",
+                "reports/top5_summary.csv",
+                str(web / "sidemen_moments.html"),
+                str(web / "sidemen_top5.html"),
+            ],
+        ),
+    ]
+    BuildGraph(base, ROOT, env).build(steps, force=args.force)
 
     expected = [
         reports / "moment_proof_report.json",
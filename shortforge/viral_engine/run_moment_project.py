@@ -3,15 +3,19 @@ from __future__ import annotations
 import argparse
 import json
 import shutil
-import subprocess
+import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
-PY = ROOT / ".venv" / "bin" / "python"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.app.core.zip_pack import pack_zip, tree_entries
+from shortforge.viral_engine.build_graph import BuildGraph, Step
 
-def run(cmd: list[str]) -> None:
-    print("RUN:", " ".join(cmd))
-    subprocess.run(cmd, cwd=ROOT, check=True)
+PY = ROOT / ".venv" / "bin" / "python"
+ENGINE = ROOT / "shortforge" / "viral_engine"
+MEDIA_DIRS = ("clips", "moment_renders", "top_ranked", "scene_renders", "final_selects")
 
 def count_files(p: Path, pattern: str) -> int:
     if not p.exists():
@@ -73,16 +77,42 @@ def package_moment_render_project(base: Path) -> Path:
         encoding="utf-8",
     )
 
-    zip_base = base / "exports" / f"{base.name}_moment_bundle"
-    zip_path = shutil.make_archive(str(zip_base), "zip", root_dir=out_dir)
+    zip_path = base / "exports" / f"{base.name}_moment_bundle.zip"
+    pack_zip(zip_path, tree_entries(out_dir))
 
     print("✅ packaged:", zip_path)
     return Path(zip_path)
 
+def moment_render_steps(base: Path, run_id: str, package: bool) -> list[Step]:
+    steps = [
+        Step(
+            "manifest",
+            [str(PY), "shortforge/viral_engine/write_moment_manifest.py", "--run-id", run_id],
+            inputs=[str(ENGINE / "write_moment_manifest.py")]
+            + [f"{d}/*.mp4" for d in MEDIA_DIRS]
+            + ["reports/*.json", "reports/*.csv", "transcript/*.json"],
+            outputs=["manifest.json"],
+        ),
+        Step(
+            "validate",
+            [str(PY), "shortforge/viral_engine/validate_moment_manifest.py", "--run-id", run_id],
+            inputs=[str(ENGINE / "validate_moment_manifest.py"), "manifest.json"],
+        ),
+    ]
+    if package:
+        steps.append(Step(
+            "package",
+            lambda: package_moment_render_project(base),
+            inputs=[str(Path(__file__).resolve()), "top_ranked/*.mp4", "reports/*.json", "reports/*.csv", "reports/*.html", "manifest.json"],
+            outputs=[f"exports/{base.name}_moment_bundle.zip"],
+        ))
+    return steps
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--run-id", required=True)
     ap.add_argument("--package", action="store_true")
+    ap.add_argument("--force", action="store_true", help="re-run every step even if its inputs are unchanged")
     args = ap.parse_args()
 
     base = ROOT / "shortforge" / "projects" / args.run_id
@@ -99,11 +129,8 @@ def main() -> int:
         raise SystemExit("❌ archive-only project: review/package only, not runnable")
 
     if mode == "moment_render_pipeline":
-        run([str(PY), "shortforge/viral_engine/write_moment_manifest.py", "--run-id", args.run_id])
-        run([str(PY), "shortforge/viral_engine/validate_moment_manifest.py", "--run-id", args.run_id])
+        BuildGraph(base, ROOT).build(moment_render_steps(base, args.run_id, args.package), force=args.force)
         print("✅ project is reusable moment-render pipeline")
-        if args.package:
-            package_moment_render_project(base)
         return 0
 
     if mode == "candidate_pipeline":
@@ -38,6 +38,11 @@ def main() -> int:
             "final_selects": files_with_sizes(base / "final_selects", "*.mp4") if (base / "final_selects").exists() else [],
         },
         "reports": files_with_sizes(base / "reports", "*.json") + files_with_sizes(base / "reports", "*.csv"),
+        # read first by moment_ranker.discover_segments, instead of scanning every JSON
+        "transcripts": [
+            str(f.relative_to(base))
+            for f in sorted((base / "transcript").glob("*.json"))
+        ] if (base / "transcript").exists() else [],
     }
 
     out = base / "manifest.json"
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable
+
+from api.app.shorts.media_probe import keyframe_times
+from shorts_studio_backend.core.candidates import build_candidates
+from shorts_studio_backend.core.render import render_preview
+from shorts_studio_backend.core.scenes import detect_scenes
+from shorts_studio_backend.core.transcribe import load_or_transcribe, transcribe
+
+PREVIEW_WORKERS = int(os.environ.get("MYTHIQ_SHORTS_PREVIEW_WORKERS", "3"))
+
+
+def run_analysis(
+    video: str,
+    preview_dir: Path,
+    preview_mode: str,
+    on_update: Callable[[dict[str, Any]], None],
+    transcript_cache: Path | None = None,
+    merge_target_sec: float | None = None,
+) -> dict[str, Any]:
+    """Transcribe and detect scenes side by side, then render previews in a pool.
+
+    ``on_update`` receives the partial result after every stage and every finished
+    preview, so callers can persist it while the rest is still running. With
+    ``transcript_cache`` set, a transcript stored there is reused instead of
+    transcribing again.
+    """
+    t0 = time.time()
+    state: dict[str, Any] = {"status": "analyzing", "clips": []}
+    lock = threading.Lock()
+
+    def publish(**changes: Any) -> None:
+        with lock:
+            state.update(changes)
+            on_update(state)
+
+    publish()
+
+    try:
+        # both stages spend their time in native code (CTranslate2, PyAV) with the GIL released
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            if transcript_cache is None:
+                t_fut = pool.submit(transcribe, video)
+            else:
+                t_fut = pool.submit(load_or_transcribe, transcript_cache, lambda: transcribe(video))
+            s_fut = pool.submit(detect_scenes, video)
+            transcript = t_fut.result()
+            scenes = s_fut.result()
+
+        clips = build_candidates(transcript, scenes, merge_target_sec=merge_target_sec)
+    except Exception as e:
+        # leave a terminal state behind, or the project would read "analyzing" forever
+        publish(status="failed", error=f"{type(e).__name__}: {e}", elapsed_sec=round(time.time() - t0, 2))
+        raise
+    for c in clips:
+        c["preview_status"] = "pending"
+    publish(status="rendering_previews", clips=clips, analyze_sec=round(time.time() - t0, 2))
+
+    def render_one(c: dict[str, Any]) -> dict[str, Any]:
+        # work on a copy; render_preview fills in preview_mode/preview_start
+        out = dict(c)
+        out["path"] = render_preview(video, out, preview_dir, mode=preview_mode)
+        return out
+
+    preview_dir.mkdir(parents=True, exist_ok=True)
+    if preview_mode == "copy" and clips:
+        # build the keyframe index once up front; otherwise every worker scans the source itself
+        try:
+            keyframe_times(Path(video))
+        except Exception:
+            pass  # _copy_preview falls back to encoding when the index is unavailable
+    with ThreadPoolExecutor(max_workers=max(1, PREVIEW_WORKERS)) as pool:
+        futures = {pool.submit(render_one, c): c for c in clips}
+        for fut in as_completed(futures):
+            c = futures[fut]
+            with lock:
+                try:
+                    c.update(fut.result())
+                    c["preview_status"] = "ready"
+                except Exception as e:
+                    c["preview_status"] = "failed"
+                    c["preview_error"] = str(e)
+            publish()
+
+    publish(status="done", elapsed_sec=round(time.time() - t0, 2))
+    return {"transcript": transcript, "scenes": scenes, "clips": clips}
@@ -9,11 +9,57 @@ def score_text(text):
         score += 10
     return score
 
-def build_candidates(transcript, scenes):
-    clips = []
+def merge_short_scenes(scenes, target_sec):
+    """Merge runs of adjacent scenes as long as the merged scene stays within ``target_sec``."""
+    out = []
+    for sc in scenes:
+        if out and sc["end"] - out[-1]["start"] <= target_sec:
+            out[-1] = {"start": out[-1]["start"], "end": sc["end"]}
+        else:
+            out.append({"start": sc["start"], "end": sc["end"]})
+    return out
+
+def assign_segments(transcript, scenes):
+    """Bucket transcript segments by scene, keeping transcript order within each bucket.
+
+    A segment lying inside scenes goes to every scene that contains it (a
+    zero-length segment on a cut lands in both neighbours); one straddling a cut
+    goes to the scene it overlaps most. ``scenes`` must be sorted and
+    non-overlapping. Both lists are walked once, so this is linear apart from
+    segments that span several scenes.
+    """
+    buckets = [[] for _ in scenes]
+    j = 0
+    order = sorted(range(len(transcript)), key=lambda i: (transcript[i]["start"], transcript[i]["end"]))
+    for i in order:
+        seg = transcript[i]
+        s, e = float(seg["start"]), float(seg["end"])
+        while j < len(scenes) and scenes[j]["end"] < s:
+            j += 1
 
-    for i, sc in enumerate(scenes):
-        segs = [t for t in transcript if t["start"] >= sc["start"] and t["end"] <= sc["end"]]
+        best, best_ov, inside = None, -1.0, []
+        k = j
+        while k < len(scenes) and scenes[k]["start"] <= e:
+            if scenes[k]["start"] <= s and e <= scenes[k]["end"]:
+                inside.append(k)
+            ov = min(e, scenes[k]["end"]) - max(s, scenes[k]["start"])
+            if ov > best_ov:
+                best, best_ov = k, ov
+            k += 1
+        if inside:
+            for k in inside:
+                buckets[k].append((i, seg))
+        elif best is not None and best_ov >= 0:
+            buckets[best].append((i, seg))
+    return [[seg for _, seg in sorted(b, key=lambda x: x[0])] for b in buckets]
+
+def build_candidates(transcript, scenes, merge_target_sec=None):
+    scenes = sorted(scenes, key=lambda sc: sc["start"])
+    if merge_target_sec:
+        scenes = merge_short_scenes(scenes, merge_target_sec)
+
+    clips = []
+    for i, (sc, segs) in enumerate(zip(scenes, assign_segments(transcript, scenes))):
         if not segs:
             continue
 
@@ -14,6 +14,40 @@ def build_caption_segments(transcript: list[dict], start: float, end: float) ->
         })
     return out
 
+def build_word_caption_segments(
+    transcript: list[dict],
+    start: float,
+    end: float,
+    max_words: int = 3,
+    max_gap: float = 0.6,
+) -> list[dict]:
+    """Short captions of up to ``max_words`` words, timed from word timestamps."""
+    words = [
+        w
+        for seg in transcript
+        for w in seg.get("words") or []
+        if float(w["end"]) >= start and float(w["start"]) <= end and w.get("word")
+    ]
+
+    out: list[dict] = []
+    group: list[dict] = []
+    for w in words:
+        if group and (len(group) >= max_words or float(w["start"]) - float(group[-1]["end"]) > max_gap):
+            out.append(group)
+            group = []
+        group.append(w)
+    if group:
+        out.append(group)
+
+    return [
+        {
+            "start": max(0.0, float(g[0]["start"]) - start),
+            "end": max(0.0, min(float(g[-1]["end"]), end) - start),
+            "text": " ".join(w["word"] for w in g),
+        }
+        for g in out
+    ]
+
 def hook_words(text: str) -> list[str]:
     hits = []
     for w in ["wait", "what", "no way", "secret", "imagine", "crazy", "why", "how"]:
@@ -2,19 +2,13 @@ from __future__ import annotations
 
 import subprocess
 
+from api.app.shorts.media_probe import ffmpeg_has_filter
+from api.app.shorts.render_profiles import audio_filter, encode_args, final_profile_name, geometry_filter, resolve_profile
+
 
 def _ffmpeg_supports_subtitles_filter() -> bool:
-    try:
-        r = subprocess.run(
-            ["ffmpeg", "-hide_banner", "-filters"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        out = (r.stdout or "") + "\n" + (r.stderr or "")
-        return (" subtitles " in out) or (" ass " in out)
-    except Exception:
-        return False
+    # filter list is read from ffmpeg once per process
+    return ffmpeg_has_filter("subtitles") or ffmpeg_has_filter("ass")
 
 from pathlib import Path
 
@@ -69,14 +63,9 @@ def render_final(src: str, start: float, end: float, out_path: str, mode: str =
     out = Path(out_path)
     out.parent.mkdir(parents=True, exist_ok=True)
 
-    if mode == "tiktok_4k":
-        scale_chain = "scale=2160:3840:force_original_aspect_ratio=decrease,pad=2160:3840:(ow-iw)/2:(oh-ih)/2,fps=30"
-        crf = "18"
-        preset = "slow"
-    else:
-        scale_chain = "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2,fps=30"
-        crf = "20"
-        preset = "medium"
+    # tiktok_4k has its own profile, any other mode is the 1080p final; MYTHIQ_RENDER_PROFILE still wins
+    profile = resolve_profile(final_profile_name(mode))
+    scale_chain = geometry_filter(profile, fit="pad")
 
     use_burned_subs = bool(ass_path) and _ffmpeg_supports_subtitles_filter()
 
@@ -91,12 +80,6 @@ def render_final(src: str, start: float, end: float, out_path: str, mode: str =
             "-vf", filter_chain,
             "-map", "0:v:0",
             "-map", "0:a?",
-            "-c:v", "libx264",
-            "-preset", preset,
-            "-crf", crf,
-            "-c:a", "aac",
-            "-b:a", "192k",
-            str(out),
         ]
     else:
         cmd = [
@@ -105,14 +88,13 @@ def render_final(src: str, start: float, end: float, out_path: str, mode: str =
             "-to", str(end),
             "-i", str(src),
             "-vf", scale_chain,
-            "-c:v", "libx264",
-            "-preset", preset,
-            "-crf", crf,
-            "-c:a", "aac",
-            "-b:a", "192k",
-            str(out),
         ]
 
+    af = audio_filter(profile)
+    if af:
+        cmd += ["-af", af]
+    cmd += encode_args(profile) + [str(out)]
+
     subprocess.run(cmd, check=True)
     return {
         "final_path": str(out),
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class ManifestNotFound(KeyError):
+    pass
+
+
+class ClipNotFound(KeyError):
+    pass
+
+
+class ManifestStore:
+    """Project manifests as JSON files, with locked read-modify-write updates.
+
+    Writes go to a temp file and are renamed into place, so readers never see a
+    partial manifest. ``update`` holds a per-project thread lock plus an flock on
+    ``<pid>.lock``, which also serialises updates across server worker processes.
+    Thread locks are dropped once nobody holds or waits for them, and lock files
+    are only created for projects whose manifest exists.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._locks: dict[str, list] = {}  # pid -> [lock, holders + waiters]
+        self._locks_guard = threading.Lock()
+
+    def path(self, pid: str) -> Path:
+        return self.root / f"{pid}.json"
+
+    def load(self, pid: str) -> dict[str, Any]:
+        p = self.path(pid)
+        if not p.exists():
+            raise ManifestNotFound(pid)
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def save(self, pid: str, data: dict[str, Any]) -> None:
+        p = self.path(pid)
+        tmp = p.with_name(f"{p.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(p)
+
+    @contextmanager
+    def locked(self, pid: str) -> Iterator[None]:
+        if not self.path(pid).exists():
+            raise ManifestNotFound(pid)
+        with self._locks_guard:
+            entry = self._locks.setdefault(pid, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0], open(self.root / f"{pid}.lock", "a+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[pid]
+
+    @contextmanager
+    def update(self, pid: str) -> Iterator[dict[str, Any]]:
+        """Yield the current manifest under the project lock and save it on exit."""
+        with self.locked(pid):
+            data = self.load(pid)
+            yield data
+            self.save(pid, data)
+
+
+def apply_clip_status(data: dict[str, Any], clip_name: str, status: str) -> dict[str, Any]:
+    clip = find_clip(data, clip_name)
+    clip["status"] = status
+    for key in ("kept", "discarded"):
+        # ordered set: stays a JSON list without duplicates; O(len) like the JSON load before it
+        names = dict.fromkeys(data.get(key) or [])
+        if key == status:
+            names[clip_name] = None
+        else:
+            names.pop(clip_name, None)
+        data[key] = list(names)
+    return clip
+
+
+def find_clip(data: dict[str, Any], clip_name: str) -> dict[str, Any]:
+    # a linear scan: the manifest was just parsed from JSON, which already cost O(clips)
+    clip = next((c for c in data.get("clips") or [] if c.get("name") == clip_name), None)
+    if clip is None:
+        raise ClipNotFound(clip_name)
+    return clip
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Mapping
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from api.app.shorts.media_server import plan_file_response
+
+SEND_CHUNK_BYTES = 1024 * 1024
+
+
+class MediaFileResponse(Response):
+    """File response with ETag, If-None-Match and single-range 206/416 handling.
+
+    ASGI hides the socket, so the body goes out through the
+    ``http.response.zerocopysend`` extension (``os.sendfile`` in the server)
+    when the server offers it, and in bounded chunks read off the event loop
+    otherwise. uvicorn, which runs the studio, does not offer the extension,
+    so ``/download`` is not zero-copy there: bytes still pass through Python,
+    one ``SEND_CHUNK_BYTES`` read at a time. Only the standalone review server
+    (scripts/shorts_review.py, ``send_file_range``) really uses ``os.sendfile``.
+    """
+
+    def __init__(self, path: Path, request_headers: Mapping[str, str], media_type: str | None = None):
+        self.path = Path(path)
+        plan = plan_file_response(self.path, request_headers, media_type)
+        self.start = plan["start"]
+        self.length = plan["length"]
+        super().__init__(status_code=plan["status"], headers=plan["headers"])
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.length <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with open(self.path, "rb") as fh:
+            if "http.response.zerocopysend" in (scope.get("extensions") or {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fh,
+                    "offset": self.start,
+                    "count": self.length,
+                })
+                return
+
+            fh.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await run_in_threadpool(fh.read, min(SEND_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # file shrank under us; close the body rather than hang the client
+                await send({"type": "http.response.body", "body": b""})
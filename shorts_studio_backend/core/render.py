@@ -1,10 +1,9 @@
 import subprocess
 from pathlib import Path
 
-def render_preview(src, clip, out_dir):
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out = out_dir / f"{clip['name']}.mp4"
+from api.app.shorts.media_probe import snap_to_keyframe
 
+def _encode_preview(src, clip, out):
     cmd = [
         "ffmpeg","-y",
         "-ss", str(clip["start"]),
@@ -16,5 +15,46 @@ def render_preview(src, clip, out_dir):
         str(out)
     ]
 
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if r.returncode != 0 or not out.exists() or out.stat().st_size == 0:
+        tail = (r.stderr or "").strip().splitlines()[-1:] or [f"exit {r.returncode}"]
+        raise RuntimeError(f"preview encode failed: {tail[0]}")
+
+def _copy_preview(src, clip, out):
+    # cut on the keyframe at or before the clip start so the copy needs no re-encode
+    try:
+        start = snap_to_keyframe(Path(src), float(clip["start"]))
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+    cmd = [
+        "ffmpeg","-y",
+        "-ss", f"{start:.3f}",
+        "-to", str(clip["end"]),
+        "-i", src,
+        "-map","0:v:0",
+        "-c","copy",
+        "-an",
+        "-avoid_negative_ts","make_zero",
+        "-movflags","+faststart",
+        str(out)
+    ]
+
+    r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if r.returncode != 0 or not out.exists() or out.stat().st_size == 0:
+        return None
+    return start
+
+def render_preview(src, clip, out_dir, mode="copy"):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out = out_dir / f"{clip['name']}.mp4"
+
+    # "copy" falls back to the scaled encode for codecs that cannot be muxed into mp4
+    start = _copy_preview(src, clip, out) if mode == "copy" else None
+    if start is None:
+        _encode_preview(src, clip, out)
+        clip["preview_mode"] = "encode"
+        clip["preview_start"] = float(clip["start"])
+    else:
+        clip["preview_mode"] = "copy"
+        clip["preview_start"] = start
     return str(out)
@@ -1,16 +1,125 @@
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
 from scenedetect import open_video, SceneManager
 from scenedetect.detectors import ContentDetector
 
-def detect_scenes(video_path):
-    video = open_video(video_path, backend="pyav")
+from api.app.shorts.media_probe import cached_file_for_source, cached_for_source, existing_file_for_source, probe
+
+SCENE_THRESHOLD = 27.0
+SCENE_MODE = os.environ.get("MYTHIQ_SHORTS_SCENE_MODE", "proxy")
+SCENE_PROXY_WIDTH = int(os.environ.get("MYTHIQ_SHORTS_SCENE_PROXY_WIDTH", "320"))
+SCENE_DOWNSCALE = int(os.environ.get("MYTHIQ_SHORTS_SCENE_DOWNSCALE", "0"))
+SCENE_FRAME_SKIP = int(os.environ.get("MYTHIQ_SHORTS_SCENE_FRAME_SKIP", "0"))
+SCENE_WORKERS = int(os.environ.get("MYTHIQ_SHORTS_SCENE_WORKERS", "1"))
+# below both of these, making a proxy costs about as much as detecting on the source
+SCENE_PROXY_MIN_WIDTH = int(os.environ.get("MYTHIQ_SHORTS_SCENE_PROXY_MIN_WIDTH", "1280"))
+SCENE_PROXY_MIN_SEC = float(os.environ.get("MYTHIQ_SHORTS_SCENE_PROXY_MIN_SEC", "600"))
+SCENE_SLICE_OVERLAP_SEC = 2.0
+SCENE_CUT_MERGE_SEC = 0.25
+
+def _scene_list(video_path, start=None, end=None, frame_skip=0, downscale=None):
+    video = open_video(str(video_path), backend="pyav")
+    if start:
+        video.seek(start)
     sm = SceneManager()
-    sm.add_detector(ContentDetector(threshold=27.0))
-    sm.detect_scenes(video)
+    if downscale is not None:
+        sm.auto_downscale = False
+        sm.downscale = downscale
+    sm.add_detector(ContentDetector(threshold=SCENE_THRESHOLD))
+    sm.detect_scenes(video, end_time=end, frame_skip=frame_skip)
+    return [(s[0].get_seconds(), s[1].get_seconds()) for s in sm.get_scene_list()]
+
+def _slice_cuts(video_path, start, end, frame_skip, downscale=1):
+    # decoding starts a little early so a cut right at ``start`` still has a previous frame
+    scenes = _scene_list(video_path, max(0.0, start - SCENE_SLICE_OVERLAP_SEC), end, frame_skip, downscale=downscale)
+    return [a for a, _ in scenes[1:] if start <= a < end]
+
+def merge_slice_cuts(cuts, duration):
+    """Turn per-slice cut times into one scene list, dropping cuts the overlap found twice."""
+    merged = []
+    for t in sorted(cuts):
+        if merged and t - merged[-1] < SCENE_CUT_MERGE_SEC:
+            continue
+        merged.append(t)
+    if not merged:
+        return []
+    bounds = [0.0] + merged + [float(duration)]
+    return [{"start": a, "end": b} for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def _make_proxy(src, out, width):
+    subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-i", str(src),
+            "-map", "0:v:0", "-an",
+            "-vf", f"scale={width}:-2",
+            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "30",
+            str(out),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+
+def _source_width(video_path):
+    return next(
+        (int(s.get("width") or 0) for s in probe(Path(video_path))["streams"] if s.get("codec_type") == "video"),
+        0,
+    )
+
+def _proxy_width(video_path):
+    width = _source_width(video_path)
+    w = width // SCENE_DOWNSCALE if SCENE_DOWNSCALE > 0 else SCENE_PROXY_WIDTH
+    w -= w % 2
+    return w if 0 < w < width else 0
+
+def _detect_proxy(video_path):
+    duration = probe(Path(video_path))["duration"]
+    width = _proxy_width(video_path)
+
+    src = str(video_path)
+    downscale = None
+    if width:
+        name = f"proxy.{width}.mp4"
+        proxy = existing_file_for_source(Path(video_path), name)
+        if proxy is None and (_source_width(video_path) > SCENE_PROXY_MIN_WIDTH or duration >= SCENE_PROXY_MIN_SEC):
+            # the proxy outlives this call, so other thresholds/frame skips re-detect without re-decoding the source
+            proxy = cached_file_for_source(Path(video_path), name, lambda s, out: _make_proxy(s, out, width))
+        if proxy is not None:
+            src, downscale = str(proxy), 1
+
+    workers = max(1, SCENE_WORKERS)
+    if workers == 1 or duration <= 0:
+        scenes = _scene_list(src, frame_skip=SCENE_FRAME_SKIP, downscale=downscale)
+        return [{"start": a, "end": b} for a, b in scenes]
+
+    step = duration / workers
+    # spawn: this runs next to the Whisper model's native thread pools
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_slice_cuts, src, i * step, duration if i == workers - 1 else (i + 1) * step, SCENE_FRAME_SKIP, downscale)
+            for i in range(workers)
+        ]
+        cuts = [t for f in futures for t in f.result()]
+    return merge_slice_cuts(cuts, duration)
+
+def detect_scenes(video_path, mode=None):
+    mode = mode or SCENE_MODE
+    if mode == "proxy":
+        kind = f"scenes.proxy.{SCENE_PROXY_WIDTH}.{SCENE_DOWNSCALE}.{SCENE_FRAME_SKIP}.{SCENE_THRESHOLD}"
+        try:
+            return cached_for_source(Path(video_path), kind, _detect_proxy)
+        except (subprocess.CalledProcessError, OSError):
+            pass
 
     scenes = []
-    for s in sm.get_scene_list():
+    for a, b in _scene_list(video_path):
         scenes.append({
-            "start": s[0].get_seconds(),
-            "end": s[1].get_seconds()
+            "start": a,
+            "end": b
         })
     return scenes
@@ -1,6 +1,20 @@
 from __future__ import annotations
+import json
+import os
+import shutil
+import threading
 import time
+import uuid
 from pathlib import Path
+from typing import Any
+
+LEDGER_SAVE_INTERVAL_SEC = 2.0
+GC_INTERVAL_SEC = int(os.environ.get("MYTHIQ_SHORTS_GC_INTERVAL_SEC", "600"))
+GC_RESCAN_EVERY = 12
+TRASH_TTL_HOURS = 24
+
+def tier_quota(tier: str) -> int:
+    return int(os.environ.get(f"MYTHIQ_SHORTS_QUOTA_{tier.upper()}_BYTES", "0"))
 
 def cleanup_trash(trash_dir: str, ttl_hours: int = 24) -> list[str]:
     now = time.time()
@@ -36,3 +50,180 @@ def dir_size_bytes(path: str) -> int:
         if p.is_file():
             total += p.stat().st_size
     return total
+
+class StorageLedger:
+    """Per-tier byte/file totals, kept up to date by the code that writes, moves and deletes.
+
+    Every tracked file's size and mtime is remembered, so re-adding an overwritten
+    file replaces its old size instead of double counting, and GC can pick victims
+    without walking the tree. ``rescan`` rebuilds everything from disk to correct drift.
+    """
+
+    def __init__(self, tiers: dict[str, str], state_path: str):
+        self.tiers = {name: Path(p).resolve() for name, p in tiers.items()}
+        self.state_path = Path(state_path)
+        self._files: dict[str, tuple[str, int, float]] = {}
+        self._bytes = {name: 0 for name in self.tiers}
+        self._count = {name: 0 for name in self.tiers}
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._dirty = False
+        self._timer: threading.Timer | None = None
+
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            with self._lock:
+                for p, (tier, size, mtime) in state["files"].items():
+                    if tier in self.tiers:
+                        self._put(p, tier, int(size), float(mtime))
+        except Exception:
+            self.rescan()
+
+    def tier_of(self, path: str) -> str | None:
+        p = Path(path).resolve()
+        for name, root in self.tiers.items():
+            if p == root or root in p.parents:
+                return name
+        return None
+
+    def _put(self, key: str, tier: str, size: int, mtime: float) -> None:
+        self._drop(key)
+        self._files[key] = (tier, size, mtime)
+        self._bytes[tier] += size
+        self._count[tier] += 1
+
+    def _drop(self, key: str) -> None:
+        old = self._files.pop(key, None)
+        if old:
+            self._bytes[old[0]] -= old[1]
+            self._count[old[0]] -= 1
+
+    def add(self, path: str) -> None:
+        tier = self.tier_of(path)
+        p = Path(path)
+        if tier is None or not p.is_file():
+            return
+        st = p.stat()
+        with self._lock:
+            self._put(str(p.resolve()), tier, st.st_size, st.st_mtime)
+            self._touch()
+
+    def add_tree(self, path: str) -> None:
+        for p in Path(path).rglob("*"):
+            if p.is_file():
+                self.add(str(p))
+
+    def move(self, src: str, dst: str) -> None:
+        shutil.move(src, dst)
+        with self._lock:
+            self._drop(str(Path(src).resolve()))
+        self.add(dst)
+
+    def delete(self, path: str) -> None:
+        Path(path).unlink(missing_ok=True)
+        with self._lock:
+            self._drop(str(Path(path).resolve()))
+            self._touch()
+
+    def files(self, tier: str) -> list[tuple[str, int, float]]:
+        with self._lock:
+            return [(p, size, mtime) for p, (t, size, mtime) in self._files.items() if t == tier]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"bytes": dict(self._bytes), "files": dict(self._count)}
+
+    def rescan(self) -> None:
+        found = {}
+        for name, root in self.tiers.items():
+            if not root.exists():
+                continue
+            for p in root.rglob("*"):
+                if p.is_file():
+                    st = p.stat()
+                    found[str(p.resolve())] = (name, st.st_size, st.st_mtime)
+        with self._lock:
+            self._files.clear()
+            self._bytes = {name: 0 for name in self.tiers}
+            self._count = {name: 0 for name in self.tiers}
+            for key, (tier, size, mtime) in found.items():
+                self._put(key, tier, size, mtime)
+            self._save()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _touch(self) -> None:
+        # the state file holds every tracked file, so writes are batched; a trailing
+        # save picks up the tail of a burst instead of leaving it for the next GC run
+        self._dirty = True
+        wait = LEDGER_SAVE_INTERVAL_SEC - (time.time() - self._saved_at)
+        if wait <= 0:
+            self._save()
+        elif self._timer is None:
+            self._timer = threading.Timer(wait, self._flush_later)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_later(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._dirty:
+                self._save()
+
+    def _save(self) -> None:
+        # callers hold self._lock; the unique name also keeps other worker processes' saves apart
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(f"{self.state_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(json.dumps({"files": self._files}), encoding="utf-8")
+        tmp.replace(self.state_path)
+        self._saved_at = time.time()
+        self._dirty = False
+
+
+def run_gc(ledger: StorageLedger, policy: list[dict[str, Any]]) -> list[str]:
+    """Apply GC rules in order and return the removed paths.
+
+    A rule names a ``tier`` and either ``max_age_sec`` (delete anything older) or
+    ``quota`` bytes (delete until the tier fits). Optional ``protect(path)`` skips
+    files, and ``rank(path, mtime)`` orders quota victims (default: oldest first).
+    """
+    now = time.time()
+    removed: list[str] = []
+
+    for rule in policy:
+        tier = rule["tier"]
+        protect = rule.get("protect") or (lambda p: False)
+        files = [f for f in ledger.files(tier) if not protect(f[0])]
+
+        if rule.get("max_age_sec"):
+            for p, _, mtime in files:
+                if now - mtime >= rule["max_age_sec"]:
+                    ledger.delete(p)
+                    removed.append(p)
+            continue
+
+        quota = int(rule.get("quota") or 0)
+        if quota <= 0:
+            continue
+        rank = rule.get("rank") or (lambda p, mtime: mtime)
+        used = ledger.stats()["bytes"][tier]
+        for p, size, mtime in sorted(files, key=lambda f: rank(f[0], f[2])):
+            if used <= quota:
+                break
+            ledger.delete(p)
+            removed.append(p)
+            used -= size
+
+    ledger.flush()
+    for p in removed:
+        # tidy now-empty project folders
+        parent = Path(p).parent
+        if ledger.tier_of(str(parent)) and parent.resolve() not in ledger.tiers.values():
+            try:
+                parent.rmdir()
+            except OSError:
+                pass
+    return removed
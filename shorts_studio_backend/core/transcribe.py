@@ -1,3 +1,9 @@
+import json
+import subprocess
+import tempfile
+import uuid
+from pathlib import Path
+
 from faster_whisper import WhisperModel
 
 _model = None
@@ -20,3 +26,55 @@ def transcribe(video_path):
             "text": s.text.strip()
         })
     return out
+
+def transcribe_range(video_path, start, end, pad=0.5):
+    """Word-timed transcript of ``[start, end]`` only, with times in source seconds."""
+    a = max(0.0, float(start) - pad)
+    dur = float(end) + pad - a
+
+    with tempfile.TemporaryDirectory() as td:
+        wav = Path(td) / "range.wav"
+        subprocess.run(
+            [
+                "ffmpeg", "-y",
+                "-ss", f"{a:.3f}",
+                "-t", f"{dur:.3f}",
+                "-i", str(video_path),
+                "-vn", "-ac", "1", "-ar", "16000",
+                str(wav),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        segments, _ = get_model().transcribe(str(wav), word_timestamps=True)
+
+        out = []
+        for s in segments:
+            out.append({
+                "start": a + float(s.start),
+                "end": a + float(s.end),
+                "text": s.text.strip(),
+                "words": [
+                    {"start": a + float(w.start), "end": a + float(w.end), "word": w.word.strip()}
+                    for w in (s.words or [])
+                ],
+            })
+    return out
+
+def load_or_transcribe(cache_path, compute):
+    """Return the transcript stored at ``cache_path``, computing and storing it on a miss."""
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+
+    out = compute()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # concurrent renders of one project may both miss; each writes its own temp file
+    tmp = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(out), encoding="utf-8")
+    tmp.replace(cache_path)
+    return out
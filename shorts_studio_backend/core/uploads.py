@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_BYTES = int(os.environ.get("MYTHIQ_SHORTS_UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.environ.get("MYTHIQ_SHORTS_UPLOAD_MAX_BYTES", str(16 * 1024 ** 3)))
+# request bodies arrive in small pieces; batch them so each hop to a worker thread writes a useful amount
+UPLOAD_WRITE_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"expected offset {offset}")
+        self.offset = offset
+
+
+class UploadSession:
+    def __init__(self, upload_id: str, part: Path, filename: str, size: int | None):
+        self.upload_id = upload_id
+        self.part = part
+        self.filename = filename
+        self.size = size
+        self.offset = 0
+        self.hasher = hashlib.sha256()
+        self.lock = threading.Lock()
+
+    def as_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "offset": self.offset,
+            "chunk_size": UPLOAD_CHUNK_BYTES,
+        }
+
+
+_sessions: dict[str, UploadSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _write_hashed(f, hasher, data: bytes) -> None:
+    hasher.update(data)
+    f.write(data)
+
+
+async def stream_into(
+    part: Path,
+    chunks: AsyncIterator[bytes],
+    hasher,
+    offset: int = 0,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> int:
+    """Append ``chunks`` to ``part`` at ``offset``, hashing as it goes; returns the new size.
+
+    Hashing and disk writes run on worker threads, never on the event loop.
+    """
+    f = await run_in_threadpool(open, part, "r+b" if offset else "wb")
+    try:
+        await run_in_threadpool(f.seek, offset)
+        await run_in_threadpool(f.truncate)
+        buf = bytearray()
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            offset += len(chunk)
+            if offset > max_bytes:
+                raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+            buf += chunk
+            if len(buf) >= UPLOAD_WRITE_BYTES:
+                await run_in_threadpool(_write_hashed, f, hasher, bytes(buf))
+                buf.clear()
+        if buf:
+            await run_in_threadpool(_write_hashed, f, hasher, bytes(buf))
+    finally:
+        await run_in_threadpool(f.close)
+    return offset
+
+
+def find_source(uploads: Path, sha256: str) -> Path | None:
+    for p in uploads.glob(f"{sha256[:24]}.*"):
+        if p.is_file():
+            return p
+    return None
+
+
+def finalize_source(part: Path, uploads: Path, sha256: str, filename: str) -> tuple[Path, bool]:
+    """Move a finished upload to its content-addressed name; reuse an identical earlier upload."""
+    existing = find_source(uploads, sha256)
+    if existing:
+        part.unlink(missing_ok=True)
+        return existing, True
+    dest = uploads / f"{sha256[:24]}{Path(filename).suffix.lower() or '.mp4'}"
+    part.replace(dest)
+    return dest, False
+
+
+def _meta_path(parts_dir: Path, upload_id: str) -> Path:
+    return parts_dir / f"{upload_id}.json"
+
+
+def open_session(parts_dir: Path, filename: str, size: int | None) -> UploadSession:
+    if size is not None and size > UPLOAD_MAX_BYTES:
+        raise UploadTooLarge(f"upload exceeds {UPLOAD_MAX_BYTES} bytes")
+    upload_id = uuid.uuid4().hex
+    s = UploadSession(upload_id, parts_dir / f"{upload_id}.part", filename, size)
+    s.part.touch()
+    _meta_path(parts_dir, upload_id).write_text(
+        json.dumps({"filename": filename, "size": size}), encoding="utf-8"
+    )
+    with _sessions_lock:
+        _sessions[upload_id] = s
+    return s
+
+
+def get_session(parts_dir: Path, upload_id: str) -> UploadSession | None:
+    """The live session, or one rebuilt from the part on disk after a restart.
+
+    Rebuilding re-hashes the whole part, so it happens outside ``_sessions_lock``
+    and callers on the event loop must run this on a worker thread.
+    """
+    with _sessions_lock:
+        s = _sessions.get(upload_id)
+    if s is not None:
+        return s
+
+    meta = _meta_path(parts_dir, upload_id)
+    part = parts_dir / f"{upload_id}.part"
+    if not meta.exists() or not part.exists():
+        return None
+    info = json.loads(meta.read_text(encoding="utf-8"))
+    s = UploadSession(upload_id, part, info.get("filename") or "upload.mp4", info.get("size"))
+    with open(part, "rb") as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            s.hasher.update(chunk)
+            s.offset += len(chunk)
+    with _sessions_lock:
+        # a concurrent request may have rebuilt it first; keep that one
+        return _sessions.setdefault(upload_id, s)
+
+
+async def append_chunk(s: UploadSession, offset: int, chunks: AsyncIterator[bytes]) -> int:
+    if not s.lock.acquire(blocking=False):
+        raise UploadOffsetMismatch(s.offset)
+    try:
+        if offset != s.offset:
+            raise UploadOffsetMismatch(s.offset)
+        limit = UPLOAD_MAX_BYTES if s.size is None else min(UPLOAD_MAX_BYTES, s.size)
+        hasher = s.hasher.copy()
+        try:
+            new_offset = await stream_into(s.part, chunks, hasher, s.offset, limit)
+        except Exception:
+            # drop the partial chunk so the client can resend it from s.offset
+            await run_in_threadpool(os.truncate, s.part, s.offset)
+            raise
+        s.hasher = hasher
+        s.offset = new_offset
+        return new_offset
+    finally:
+        s.lock.release()
+
+
+def close_session(parts_dir: Path, s: UploadSession) -> None:
+    with _sessions_lock:
+        _sessions.pop(s.upload_id, None)
+    _meta_path(parts_dir, s.upload_id).unlink(missing_ok=True)
+    s.part.unlink(missing_ok=True)
@@ -1,75 +1,137 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import shutil
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from fastapi import FastAPI, UploadFile, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, HTTPException, Request
 from pydantic import BaseModel
-
-from shorts_studio_backend.core.transcribe import transcribe
-from shorts_studio_backend.core.scenes import detect_scenes
-from shorts_studio_backend.core.candidates import build_candidates
-from shorts_studio_backend.core.render import render_preview
-from shorts_studio_backend.core.storage_gc import dir_size_bytes, cleanup_trash
+from starlette.concurrency import run_in_threadpool
+
+from shorts_studio_backend.core.transcribe import load_or_transcribe, transcribe, transcribe_range
+from shorts_studio_backend.core.analyze import run_analysis
+from shorts_studio_backend.core.storage_gc import (
+    GC_INTERVAL_SEC,
+    GC_RESCAN_EVERY,
+    TRASH_TTL_HOURS,
+    StorageLedger,
+    run_gc,
+    tier_quota,
+)
 from shorts_studio_backend.core.final_render import render_final, write_ass
-from shorts_studio_backend.core.captions import build_caption_segments, hook_words
+from shorts_studio_backend.core.media import MediaFileResponse
+from api.app.core.zip_response import ZipStreamResponse
+from api.app.core.zip_stream import ZipStream
+from shorts_studio_backend.core.manifest_store import (
+    ClipNotFound,
+    ManifestNotFound,
+    ManifestStore,
+    apply_clip_status,
+    find_clip,
+)
+from api.app.shorts.media_probe import source_key
+from shorts_studio_backend.core.captions import build_caption_segments, build_word_caption_segments, hook_words
+from shorts_studio_backend.core.uploads import (
+    UPLOAD_CHUNK_BYTES,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    append_chunk,
+    close_session,
+    finalize_source,
+    get_session,
+    open_session,
+    stream_into,
+)
 
 ROOT = Path.home() / "mythiq_ultimate"
 STORAGE = ROOT / "shorts_studio" / "storage"
 UPLOADS = STORAGE / "uploads"
 PREVIEWS = STORAGE / "previews"
-EXPORTS = STORAGE / "exports"
 TRASH = STORAGE / "trash"
 MANIFESTS = STORAGE / "manifests"
 FINAL = STORAGE / "final"
+UPLOAD_PARTS = STORAGE / "upload_parts"
+TRANSCRIPTS = STORAGE / "transcripts"
 
-for d in [UPLOADS, PREVIEWS, EXPORTS, TRASH, MANIFESTS, FINAL]:
+for d in [UPLOADS, PREVIEWS, TRASH, MANIFESTS, FINAL, UPLOAD_PARTS, TRANSCRIPTS]:
     d.mkdir(parents=True, exist_ok=True)
 
 app = FastAPI(title="Shorts Studio Backend")
 
+ledger = StorageLedger(
+    {
+        "uploads": str(UPLOADS),
+        "previews": str(PREVIEWS),
+        "trash": str(TRASH),
+        "final": str(FINAL),
+    },
+    str(STORAGE / "ledger.json"),
+)
+
 class DecisionReq(BaseModel):
     project_id: str
     clip_name: str
 
+class UploadInitReq(BaseModel):
+    filename: str = "upload.mp4"
+    size: int | None = None
+
 class FinalRenderReq(BaseModel):
     project_id: str
     clip_name: str
     mode: str = "tiktok_4k"
     burn_captions: bool = True
+    word_captions: bool = False
+
+store = ManifestStore(MANIFESTS)
 
 def manifest_path(pid: str) -> Path:
-    return MANIFESTS / f"{pid}.json"
+    return store.path(pid)
 
 def save_manifest(pid: str, data: dict[str, Any]) -> None:
-    manifest_path(pid).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    store.save(pid, data)
 
 def load_manifest(pid: str) -> dict[str, Any]:
-    p = manifest_path(pid)
-    if not p.exists():
+    try:
+        return store.load(pid)
+    except ManifestNotFound:
         raise HTTPException(status_code=404, detail="project not found")
-    return json.loads(p.read_text(encoding="utf-8"))
+
+@contextmanager
+def update_manifest(pid: str) -> Iterator[dict[str, Any]]:
+    try:
+        with store.update(pid) as data:
+            yield data
+    except ManifestNotFound:
+        raise HTTPException(status_code=404, detail="project not found")
+    except ClipNotFound:
+        raise HTTPException(status_code=404, detail="clip not found")
+
+def source_hash(data: dict[str, Any]) -> str:
+    # projects uploaded before content hashing fall back to the path/size/mtime key
+    return data.get("source_sha256") or source_key(Path(data["video"]))
+
+def transcript_path(data: dict[str, Any]) -> Path:
+    return TRANSCRIPTS / f"{source_hash(data)[:24]}.json"
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
-@app.post("/upload")
-async def upload(file: UploadFile):
+def new_project(path: Path, filename: str, sha256: str, size: int, deduped: bool) -> dict[str, Any]:
     pid = str(uuid.uuid4())[:8]
-    filename = file.filename or "upload.mp4"
-    path = UPLOADS / f"{pid}_{filename}"
-
-    with open(path, "wb") as f:
-        f.write(await file.read())
-
     data = {
         "project_id": pid,
         "video": str(path),
+        "filename": filename,
+        "source_sha256": sha256,
+        "source_bytes": size,
+        "source_reused": deduped,
         "clips": [],
         "kept": [],
         "discarded": [],
@@ -77,22 +139,115 @@ async def upload(file: UploadFile):
     save_manifest(pid, data)
     return data
 
-@app.post("/analyze")
-def analyze(req: dict[str, Any]):
-    pid = req["project_id"]
-    data = load_manifest(pid)
+async def _read_upload(file: UploadFile):
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
+
+@app.post("/upload")
+async def upload(file: UploadFile):
+    filename = file.filename or "upload.mp4"
+    part = UPLOAD_PARTS / f"{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
 
-    video = data["video"]
-    transcript = transcribe(video)
-    scenes = detect_scenes(video)
-    clips = build_candidates(transcript, scenes)
+    try:
+        size = await stream_into(part, _read_upload(file), hasher)
+    except UploadTooLarge as e:
+        part.unlink(missing_ok=True)
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception:
+        part.unlink(missing_ok=True)
+        raise
+
+    sha256 = hasher.hexdigest()
+    path, deduped = finalize_source(part, UPLOADS, sha256, filename)
+    ledger.add(str(path))
+    return new_project(path, filename, sha256, size, deduped)
+
+@app.post("/upload/init")
+def upload_init(req: UploadInitReq) -> dict[str, Any]:
+    try:
+        s = open_session(UPLOAD_PARTS, req.filename, req.size)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return s.as_dict()
+
+@app.get("/upload/{upload_id}")
+def upload_status(upload_id: str) -> dict[str, Any]:
+    s = get_session(UPLOAD_PARTS, upload_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="upload not found")
+    return s.as_dict()
+
+@app.put("/upload/{upload_id}")
+async def upload_chunk(upload_id: str, offset: int, request: Request) -> dict[str, Any]:
+    s = await run_in_threadpool(get_session, UPLOAD_PARTS, upload_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="upload not found")
+    try:
+        await append_chunk(s, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail={"error": "offset_mismatch", "offset": e.offset})
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return s.as_dict()
+
+@app.post("/upload/{upload_id}/complete")
+def upload_complete(upload_id: str) -> dict[str, Any]:
+    s = get_session(UPLOAD_PARTS, upload_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="upload not found")
+    # a chunk still being appended would change both the hash and the part we are about to move
+    if not s.lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail={"error": "chunk_in_progress", "offset": s.offset})
+    try:
+        if s.size is not None and s.offset != s.size:
+            raise HTTPException(status_code=409, detail={"error": "incomplete", "offset": s.offset, "size": s.size})
 
-    preview_dir = PREVIEWS / pid
-    for c in clips:
-        c["path"] = render_preview(video, c, preview_dir)
+        sha256 = s.hasher.hexdigest()
+        path, deduped = finalize_source(s.part, UPLOADS, sha256, s.filename)
+        close_session(UPLOAD_PARTS, s)
+    finally:
+        s.lock.release()
+    ledger.add(str(path))
+    return new_project(path, s.filename, sha256, s.offset, deduped)
 
-    data["clips"] = clips
-    save_manifest(pid, data)
+@app.post("/analyze")
+def analyze(req: dict[str, Any]):
+    pid = req["project_id"]
+    with update_manifest(pid) as data:
+        data["transcript_path"] = str(transcript_path(data))
+
+    def on_update(state: dict[str, Any]) -> None:
+        # merge into the stored manifest so keep/discard clicks made meanwhile survive
+        with update_manifest(pid) as cur:
+            decided = {n: "kept" for n in cur.get("kept") or []}
+            decided.update({n: "discarded" for n in cur.get("discarded") or []})
+            clips = []
+            for c in state["clips"]:
+                c = dict(c)
+                if c["name"] in decided:
+                    c["status"] = decided[c["name"]]
+                clips.append(c)
+            cur["analysis_status"] = state["status"]
+            if state.get("error"):
+                cur["analysis_error"] = state["error"]
+            cur["clips"] = clips
+            data.update(cur)
+        for c in clips:
+            if c.get("preview_status") == "ready":
+                ledger.add(c["path"])
+
+    run_analysis(
+        data["video"],
+        PREVIEWS / pid,
+        req.get("preview_mode", "copy"),
+        on_update,
+        transcript_cache=Path(data["transcript_path"]),
+        merge_target_sec=req.get("merge_target_sec"),
+    )
     return data
 
 @app.get("/project/{pid}")
@@ -101,95 +256,139 @@ def get_project(pid: str):
 
 @app.post("/keep")
 def keep_clip(req: DecisionReq) -> dict[str, Any]:
-    data = load_manifest(req.project_id)
-    found = next((c for c in data["clips"] if c["name"] == req.clip_name), None)
-    if not found:
-        raise HTTPException(status_code=404, detail="clip not found")
-
-    found["status"] = "kept"
-    if req.clip_name not in data["kept"]:
-        data["kept"].append(req.clip_name)
-    if req.clip_name in data["discarded"]:
-        data["discarded"].remove(req.clip_name)
-
-    save_manifest(req.project_id, data)
+    with update_manifest(req.project_id) as data:
+        apply_clip_status(data, req.clip_name, "kept")
     return data
 
 @app.post("/discard")
 def discard_clip(req: DecisionReq) -> dict[str, Any]:
-    data = load_manifest(req.project_id)
-    found = next((c for c in data["clips"] if c["name"] == req.clip_name), None)
-    if not found:
-        raise HTTPException(status_code=404, detail="clip not found")
-
-    src = Path(found["path"])
-    trash_dir = TRASH / req.project_id
-    trash_dir.mkdir(parents=True, exist_ok=True)
-
-    if src.exists():
-        shutil.move(str(src), str(trash_dir / src.name))
-
-    found["status"] = "discarded"
-    if req.clip_name not in data["discarded"]:
-        data["discarded"].append(req.clip_name)
-    if req.clip_name in data["kept"]:
-        data["kept"].remove(req.clip_name)
-
-    save_manifest(req.project_id, data)
+    with update_manifest(req.project_id) as data:
+        found = apply_clip_status(data, req.clip_name, "discarded")
+
+        if found.get("path"):
+            src = Path(found["path"])
+            trash_dir = TRASH / req.project_id
+            trash_dir.mkdir(parents=True, exist_ok=True)
+            if src.exists():
+                ledger.move(str(src), str(trash_dir / src.name))
     return data
 
-@app.post("/export/{project_id}")
-def export_project(project_id: str) -> dict[str, Any]:
+EXPORT_README = b"Shorts Studio export bundle\nOnly kept clips are included.\n"
+
+def export_stream(project_id: str) -> ZipStream:
     data = load_manifest(project_id)
     kept = [c for c in data["clips"] if c.get("status") == "kept"]
     if not kept:
         raise HTTPException(status_code=400, detail="no kept clips")
 
-    out_dir = EXPORTS / project_id
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    (out_dir / "README.txt").write_text(
-        "Shorts Studio export bundle\nOnly kept clips are included.\n",
-        encoding="utf-8",
-    )
-    (out_dir / "manifest.json").write_text(
-        json.dumps(data, indent=2),
-        encoding="utf-8",
-    )
-
+    # the kept clips go into the archive straight from where they are; nothing is copied or zipped on disk
+    entries: list[tuple[Path | bytes, str]] = [
+        (EXPORT_README, "README.txt"),
+        (json.dumps(data, indent=2).encode("utf-8"), "manifest.json"),
+    ]
     for clip in kept:
         src = Path(clip["path"])
         if src.exists():
-            shutil.copy2(src, out_dir / src.name)
+            entries.append((src, src.name))
+    return ZipStream(entries)
+
+@app.post("/export/{project_id}")
+def export_project(project_id: str) -> dict[str, Any]:
+    stream = export_stream(project_id)
+    return {
+        "ok": True,
+        "download": f"/export/{project_id}",
+        "files": len(stream.members),
+        "size_bytes": stream.size,
+    }
 
-    zip_base = EXPORTS / f"{project_id}_bundle"
-    zip_path = shutil.make_archive(str(zip_base), "zip", root_dir=out_dir)
-    return {"ok": True, "zip": zip_path}
+@app.get("/export/{project_id}")
+def download_export(project_id: str, request: Request) -> ZipStreamResponse:
+    return ZipStreamResponse(export_stream(project_id), request.headers, filename=f"{project_id}_bundle.zip")
 
 @app.get("/download")
-def download(path: str) -> FileResponse:
+def download(path: str, request: Request) -> MediaFileResponse:
     p = Path(path)
-    if not p.exists():
+    if not p.is_file():
         raise HTTPException(status_code=404, detail="file missing")
-    return FileResponse(p)
+    return MediaFileResponse(p, request.headers)
 
 
 @app.get("/storage/stats")
 def storage_stats():
-    roots = {
-        "uploads": str(UPLOADS),
-        "previews": str(PREVIEWS),
-        "exports": str(EXPORTS),
-        "trash": str(TRASH),
-    }
+    stats = ledger.stats()
     return {
         "ok": True,
-        "bytes": {k: dir_size_bytes(v) for k, v in roots.items()}
+        "bytes": stats["bytes"],
+        "files": stats["files"],
+        "quotas": {k: tier_quota(k) for k in stats["bytes"]},
     }
 
+def _kept_names(pid: str, cache: dict[str, set[str]]) -> set[str]:
+    if pid not in cache:
+        try:
+            cache[pid] = set(store.load(pid).get("kept") or [])
+        except Exception:
+            cache[pid] = set()
+    return cache[pid]
+
+def gc_policy() -> list[dict[str, Any]]:
+    kept: dict[str, set[str]] = {}
+
+    def is_kept_preview(p: str) -> bool:
+        # kept previews are what /export bundles, never evict them
+        return Path(p).stem in _kept_names(Path(p).parent.name, kept)
+
+    def preview_rank(p: str, mtime: float) -> tuple[int, float]:
+        # projects nobody kept anything from go first, then oldest first
+        return (1 if _kept_names(Path(p).parent.name, kept) else 0, mtime)
+
+    return [
+        {"tier": "trash", "max_age_sec": TRASH_TTL_HOURS * 3600},
+        {"tier": "trash", "quota": tier_quota("trash")},
+        {"tier": "previews", "quota": tier_quota("previews"), "protect": is_kept_preview, "rank": preview_rank},
+        {"tier": "final", "quota": tier_quota("final")},
+    ]
+
+def run_storage_gc() -> list[str]:
+    removed = run_gc(ledger, gc_policy())
+
+    evicted: dict[str, set[str]] = {}
+    for p in removed:
+        if ledger.tier_of(p) == "previews":
+            evicted.setdefault(Path(p).parent.name, set()).add(str(Path(p).resolve()))
+    for pid, paths in evicted.items():
+        try:
+            with store.update(pid) as data:
+                for c in data.get("clips") or []:
+                    if c.get("path") and str(Path(c["path"]).resolve()) in paths:
+                        c["preview_status"] = "evicted"
+        except ManifestNotFound:
+            pass
+    return removed
+
+@app.on_event("startup")
+def _startup_storage_gc():
+    if GC_INTERVAL_SEC <= 0:
+        return
+
+    def loop():
+        n = 0
+        while True:
+            time.sleep(GC_INTERVAL_SEC)
+            n += 1
+            try:
+                if n % GC_RESCAN_EVERY == 0:
+                    ledger.rescan()
+                run_storage_gc()
+            except Exception:
+                pass
+
+    threading.Thread(target=loop, daemon=True).start()
+
 @app.post("/storage/cleanup")
 def storage_cleanup():
-    removed = cleanup_trash(str(TRASH), ttl_hours=24)
+    removed = run_storage_gc()
     return {"ok": True, "removed": removed, "count": len(removed)}
 
 
@@ -207,8 +406,15 @@ def final_render_endpoint(req: FinalRenderReq):
 
     ass_path = None
     if req.burn_captions:
-        transcript = transcribe(src)
-        subs = build_caption_segments(transcript, clip["start"], clip["end"])
+        start, end = float(clip["start"]), float(clip["end"])
+        if req.word_captions:
+            # only the clip range is re-run, with word timestamps for tight caption timing
+            words_path = TRANSCRIPTS / f"{source_hash(data)[:24]}_{start:.2f}_{end:.2f}.words.json"
+            transcript = load_or_transcribe(words_path, lambda: transcribe_range(src, start, end))
+            subs = build_word_caption_segments(transcript, start, end)
+        else:
+            transcript = load_or_transcribe(transcript_path(data), lambda: transcribe(src))
+            subs = build_caption_segments(transcript, start, end)
         ass_path = str(out_dir / f"{req.clip_name}.ass")
         write_ass(subs, ass_path)
 
@@ -233,10 +439,14 @@ def final_render_endpoint(req: FinalRenderReq):
             },
         )
 
-    clip["final_path"] = rendered["final_path"]
+    ledger.add(rendered["final_path"])
+    if ass_path:
+        ledger.add(ass_path)
     clip_hook_words = hook_words(clip.get("text", ""))
-    clip["hook_words"] = clip_hook_words
-    save_manifest(req.project_id, data)
+    with update_manifest(req.project_id) as cur:
+        stored = find_clip(cur, req.clip_name)
+        stored["final_path"] = rendered["final_path"]
+        stored["hook_words"] = clip_hook_words
 
     return {
         "ok": True,
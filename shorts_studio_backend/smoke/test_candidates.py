@@ -0,0 +1,48 @@
+import random
+
+from shorts_studio_backend.core.candidates import assign_segments, build_candidates, score_text
+
+
+def old_build_candidates(transcript, scenes):
+    clips = []
+    for i, sc in enumerate(scenes):
+        segs = [t for t in transcript if t["start"] >= sc["start"] and t["end"] <= sc["end"]]
+        if not segs:
+            continue
+        text = " ".join([s["text"] for s in segs])
+        clips.append({"name": f"clip_{i}", "start": sc["start"], "end": sc["end"], "text": text,
+                      "score": score_text(text), "status": "candidate"})
+    clips.sort(key=lambda x: x["score"], reverse=True)
+    return clips[:15]
+
+
+rng = random.Random(36)
+words = ["wait", "what", "no way", "secret", "we", "go", "again!", "imagine that"]
+for trial in range(300):
+    cuts = sorted({round(rng.uniform(0, 120), 1) for _ in range(rng.randint(0, 12))})
+    bounds = [0.0] + cuts + [120.0]
+    scenes = [{"start": a, "end": b} for a, b in zip(bounds, bounds[1:]) if b > a]
+    transcript = []
+    for _ in range(rng.randint(0, 40)):
+        if cuts and rng.random() < 0.15:
+            a = b = rng.choice(cuts)  # zero-length segment exactly on a cut
+        else:
+            sc = rng.choice(scenes)
+            a = round(rng.uniform(sc["start"], sc["end"]), 1)
+            b = round(rng.uniform(a, sc["end"]), 1)
+        transcript.append({"start": a, "end": b, "text": " ".join(rng.sample(words, 2))})
+    rng.shuffle(transcript)
+
+    # every segment lies inside a scene: same clips as the per-scene filter, boundary ties included
+    assert build_candidates(transcript, scenes) == old_build_candidates(transcript, scenes), trial
+
+    # a segment straddling a cut is kept, in the scene it overlaps most
+    if cuts:
+        c = rng.choice(cuts)
+        straddler = {"start": c - 0.4, "end": c + 1.0, "text": "straddles"}
+        buckets = assign_segments(transcript + [straddler], scenes)
+        homes = [k for k, b in enumerate(buckets) if straddler in b]
+        ov = [min(straddler["end"], sc["end"]) - max(straddler["start"], sc["start"]) for sc in scenes]
+        assert len(homes) == 1 and ov[homes[0]] == max(ov), (trial, homes)
+
+print("CANDIDATES_OK", trial + 1)
@@ -12,3 +12,26 @@ print("SIZE_BEFORE", dir_size_bytes(str(root)))
 removed = cleanup_trash(str(trash), ttl_hours=999999)
 print("REMOVED_NOW", removed)
 print("SIZE_AFTER", dir_size_bytes(str(root)))
+
+from shorts_studio_backend.core.storage_gc import StorageLedger, run_gc
+
+previews = root / "previews" / "p1"
+previews.mkdir(parents=True, exist_ok=True)
+(previews / "clip_0.mp4").write_bytes(b"x" * 300)
+(root / "ledger.json").unlink(missing_ok=True)
+ledger = StorageLedger({"previews": str(root / "previews"), "trash": str(trash)}, str(root / "ledger.json"))
+print("LEDGER", ledger.stats())
+ledger.move(str(previews / "clip_0.mp4"), str(trash / "clip_0.mp4"))
+print("LEDGER_AFTER_MOVE", ledger.stats())
+print("GC_REMOVED", run_gc(ledger, [{"tier": "trash", "quota": 1}]))
+print("LEDGER_AFTER_GC", ledger.stats())
+
+import json, time
+from shorts_studio_backend.core import storage_gc
+
+(trash / "late.bin").write_bytes(b"x" * 50)
+ledger.add(str(trash / "late.bin"))
+time.sleep(storage_gc.LEDGER_SAVE_INTERVAL_SEC + 0.5)
+saved = json.loads((root / "ledger.json").read_text(encoding="utf-8"))["files"]
+assert str((trash / "late.bin").resolve()) in saved, saved
+print("LEDGER_FLUSHED_WITHOUT_GC", len(saved))